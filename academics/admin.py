@@ -1,9 +1,12 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import (
     Class, Section, Subject, ClassSubject, Timetable,
-    Attendance, Examination, ExamSchedule, Grade,
+    Attendance, SectionAttendanceSummary, StudentAttendanceSummary,
+    Examination, ExamSchedule, Grade, ExamResult, ExamSeat, GradingScheme, GradeBoundary,
     Homework, HomeworkSubmission
 )
+from .tasks import queue_publish
+from .timetabling import find_clashes, load_slots
 
 
 @admin.register(Class)
@@ -29,7 +32,7 @@ class SubjectAdmin(admin.ModelAdmin):
 
 @admin.register(ClassSubject)
 class ClassSubjectAdmin(admin.ModelAdmin):
-    list_display = ('class_name', 'subject', 'teacher', 'academic_year', 'theory_marks', 'practical_marks')
+    list_display = ('class_name', 'subject', 'teacher', 'academic_year', 'theory_marks', 'practical_marks', 'periods_per_week')
     list_filter = ('class_name', 'academic_year')
     search_fields = ('subject__name', 'teacher__first_name', 'teacher__last_name')
 
@@ -39,6 +42,18 @@ class TimetableAdmin(admin.ModelAdmin):
     list_display = ('class_name', 'section', 'subject', 'teacher', 'day_of_week', 'start_time', 'end_time')
     list_filter = ('class_name', 'day_of_week', 'academic_year')
     search_fields = ('subject__name', 'teacher__first_name')
+    actions = ['check_clashes']
+    
+    @admin.action(description='Check clashes in the selected academic years')
+    def check_clashes(self, request, queryset):
+        slots = list(load_slots(Timetable.objects.filter(
+            academic_year__in=queryset.values('academic_year'), is_active=True
+        )))
+        clashes = find_clashes(slots)
+        for clash in clashes[:20]:
+            self.message_user(request, clash.describe(), messages.WARNING)
+        level = messages.ERROR if clashes else messages.SUCCESS
+        self.message_user(request, f"{len(slots)} slots checked, {len(clashes)} clashes", level)
 
 
 @admin.register(Attendance)
@@ -49,12 +64,33 @@ class AttendanceAdmin(admin.ModelAdmin):
     date_hierarchy = 'date'
 
 
+@admin.register(SectionAttendanceSummary)
+class SectionAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ('date', 'class_name', 'section', 'present', 'absent', 'late', 'half_day', 'leave')
+    list_filter = ('campus', 'class_name')
+    date_hierarchy = 'date'
+
+
+@admin.register(StudentAttendanceSummary)
+class StudentAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ('student', 'month', 'present', 'absent', 'late', 'half_day', 'leave')
+    search_fields = ('student__admission_number',)
+    date_hierarchy = 'month'
+
+
 @admin.register(Examination)
 class ExaminationAdmin(admin.ModelAdmin):
     list_display = ('name', 'exam_type', 'academic_year', 'start_date', 'end_date', 'is_published')
     list_filter = ('exam_type', 'academic_year', 'is_published')
     search_fields = ('name',)
     date_hierarchy = 'start_date'
+    actions = ['publish']
+    
+    @admin.action(description='Publish results in the background')
+    def publish(self, request, queryset):
+        for examination in queryset:
+            queue_publish(examination)
+        self.message_user(request, f"Queued {queryset.count()} examination(s) for publishing")
 
 
 @admin.register(ExamSchedule)
@@ -72,6 +108,42 @@ class GradeAdmin(admin.ModelAdmin):
     search_fields = ('student__admission_number', 'student__user__first_name')
 
 
+@admin.register(ExamResult)
+class ExamResultAdmin(admin.ModelAdmin):
+    list_display = (
+        'student', 'examination', 'class_name', 'section', 'obtained_marks',
+        'max_marks', 'percentage', 'grade', 'position', 'is_passed'
+    )
+    list_filter = ('examination', 'class_name', 'is_passed')
+    search_fields = ('student__admission_number', 'student__user__first_name')
+    list_select_related = ('student__user', 'examination__academic_year', 'class_name', 'section')
+    readonly_fields = [field.name for field in ExamResult._meta.fields]
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ExamSeat)
+class ExamSeatAdmin(admin.ModelAdmin):
+    list_display = ('room_number', 'seat_number', 'student', 'exam_schedule', 'row_number', 'column_number')
+    list_filter = ('exam_schedule__examination', 'exam_schedule__date', 'room_number')
+    search_fields = ('student__admission_number', 'student__user__first_name', 'room_number')
+    list_select_related = ('student', 'exam_schedule__examination', 'exam_schedule__class_name', 'exam_schedule__subject')
+
+
+class GradeBoundaryInline(admin.TabularInline):
+    model = GradeBoundary
+    extra = 0
+
+
+@admin.register(GradingScheme)
+class GradingSchemeAdmin(admin.ModelAdmin):
+    list_display = ('name', 'campus', 'academic_year', 'is_active', 'updated_at')
+    list_filter = ('campus', 'academic_year', 'is_active')
+    search_fields = ('name',)
+    inlines = [GradeBoundaryInline]
+
+
 @admin.register(Homework)
 class HomeworkAdmin(admin.ModelAdmin):
     list_display = ('title', 'class_name', 'section', 'subject', 'teacher', 'assigned_date', 'due_date')
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AcademicsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'academics'
+
+    def ready(self):
+        from academics import signals  # noqa: F401
@@ -1,4 +1,7 @@
+from decimal import Decimal
+
 from django import forms
+from academics.marks import MarkEntry, open_marks_csv, validate_marks
 from academics.models import (
     Class, Section, Subject, Timetable, Attendance, 
     Examination, ExamSchedule, Grade, Homework
@@ -77,6 +80,138 @@ class AttendanceForm(forms.ModelForm):
                     field.widget.attrs['class'] = 'form-select'
 
 
+class AttendanceRegisterForm(forms.Form):
+    """One status/remarks pair per student of a section for a single date"""
+    
+    def __init__(self, *args, students, date, existing=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.students = list(students)
+        self.date = date
+        self.existing = existing or {}
+        for student in self.students:
+            record = self.existing.get(student.pk)
+            self.fields[f'status_{student.pk}'] = forms.ChoiceField(
+                choices=Attendance.AttendanceStatus.choices,
+                initial=record.status if record else Attendance.AttendanceStatus.PRESENT,
+                widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+            )
+            self.fields[f'remarks_{student.pk}'] = forms.CharField(
+                required=False,
+                initial=record.remarks if record else '',
+                widget=forms.TextInput(attrs={'class': 'form-control form-control-sm'})
+            )
+    
+    def rows(self):
+        for student in self.students:
+            yield student, self[f'status_{student.pk}'], self[f'remarks_{student.pk}']
+    
+    def changed_records(self, marked_by):
+        """Attendance rows whose status or remarks differ from what is stored"""
+        records = []
+        for student in self.students:
+            status = self.cleaned_data[f'status_{student.pk}']
+            remarks = self.cleaned_data[f'remarks_{student.pk}'] or None
+            record = self.existing.get(student.pk)
+            if record and record.status == status and (record.remarks or None) == remarks:
+                continue
+            records.append(Attendance(
+                student=student,
+                date=self.date,
+                status=status,
+                remarks=remarks,
+                marked_by=marked_by
+            ))
+        return records
+
+
+class MarksSheetForm(forms.Form):
+    """Theory/practical/absent/remarks per student of an exam schedule"""
+    
+    def __init__(self, *args, schedule, students, existing=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.schedule = schedule
+        self.students = list(students)
+        self.existing = existing or {}
+        marks_attrs = {'class': 'form-control form-control-sm', 'step': '0.01', 'min': 0, 'max': schedule.total_marks}
+        for student in self.students:
+            grade = self.existing.get(student.pk)
+            self.fields[f'theory_{student.pk}'] = forms.DecimalField(
+                required=False, min_value=0, max_digits=5, decimal_places=2,
+                initial=grade.theory_marks if grade else None,
+                widget=forms.NumberInput(attrs=marks_attrs)
+            )
+            self.fields[f'practical_{student.pk}'] = forms.DecimalField(
+                required=False, min_value=0, max_digits=5, decimal_places=2,
+                initial=grade.practical_marks if grade else None,
+                widget=forms.NumberInput(attrs=marks_attrs)
+            )
+            self.fields[f'absent_{student.pk}'] = forms.BooleanField(
+                required=False,
+                initial=grade.is_absent if grade else False,
+                widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+            )
+            self.fields[f'remarks_{student.pk}'] = forms.CharField(
+                required=False,
+                initial=grade.remarks if grade else '',
+                widget=forms.TextInput(attrs={'class': 'form-control form-control-sm'})
+            )
+    
+    def rows(self):
+        for student in self.students:
+            yield (
+                student,
+                self[f'theory_{student.pk}'],
+                self[f'practical_{student.pk}'],
+                self[f'absent_{student.pk}'],
+                self[f'remarks_{student.pk}'],
+            )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        for student in self.students:
+            theory = cleaned_data.get(f'theory_{student.pk}') or 0
+            practical = cleaned_data.get(f'practical_{student.pk}') or 0
+            if not cleaned_data.get(f'absent_{student.pk}'):
+                error = validate_marks(self.schedule, theory, practical)
+                if error:
+                    self.add_error(f'theory_{student.pk}', error)
+        return cleaned_data
+    
+    def changed_entries(self):
+        """MarkEntry rows that were filled in and differ from what is stored"""
+        entries = []
+        for student in self.students:
+            theory = self.cleaned_data[f'theory_{student.pk}']
+            practical = self.cleaned_data[f'practical_{student.pk}']
+            absent = self.cleaned_data[f'absent_{student.pk}']
+            if theory is None and practical is None and not absent:
+                continue
+            entry = MarkEntry(
+                student_id=student.pk,
+                theory_marks=Decimal('0') if absent else theory or Decimal('0'),
+                practical_marks=Decimal('0') if absent else practical or Decimal('0'),
+                is_absent=absent,
+                remarks=self.cleaned_data[f'remarks_{student.pk}'] or None,
+            )
+            if not entry.same_as(self.existing.get(student.pk)):
+                entries.append(entry)
+        return entries
+
+
+class MarksUploadForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV with admission_number, theory_marks, practical_marks, absent, remarks",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv'})
+    )
+    
+    def clean_file(self):
+        """The sheet decoded to a text file object"""
+        try:
+            return open_marks_csv(self.cleaned_data['file'])
+        except ValueError as exc:
+            raise forms.ValidationError(str(exc))
+
+
 class ExaminationForm(forms.ModelForm):
     class Meta:
         model = Examination
@@ -0,0 +1,133 @@
+"""
+Letter grades from percentages.
+
+A GradeScale holds grade boundaries sorted by minimum percentage and
+looks a percentage up with bisect, so grading a whole sheet is one
+O(log n) lookup per row against a scale built once.
+
+scale_for(academic_year_id) picks the GradingScheme of the year's
+campus: the one for that academic year, else the campus default (no
+year), else settings.GRADE_BOUNDARIES. Scales are kept in a per-process
+dict and checked against a version in the shared cache, which
+academics/signals.py bumps whenever a scheme or boundary changes; a
+warm lookup costs one cache read and no query.
+
+regrade() rewrites the letter of every grade of an examination with a
+single UPDATE ... SET grade = CASE ... END.
+"""
+import time
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+
+from accounts.models import AcademicYear
+from .models import ExamSchedule, Grade, GradeBoundary
+
+SCHEME_VERSION_KEY = 'academics:grading-schemes:version'
+_scales = {}
+
+CENT = Decimal('0.01')
+
+
+class GradeScale:
+    """Percentage -> letter grade over (minimum percentage, letter) boundaries"""
+    
+    def __init__(self, boundaries):
+        ordered = sorted((Decimal(str(minimum)), letter) for minimum, letter in boundaries)
+        if not ordered:
+            raise ValueError("A grade scale needs at least one boundary")
+        self.minimums = [minimum for minimum, _letter in ordered]
+        self.letters = [letter for _minimum, letter in ordered]
+    
+    def grade(self, percentage):
+        """Letter of the highest boundary at or below `percentage`"""
+        index = bisect_right(self.minimums, percentage) - 1
+        return self.letters[max(index, 0)]
+    
+    def __iter__(self):
+        return zip(self.minimums, self.letters)
+
+
+@lru_cache(maxsize=None)
+def default_scale():
+    return GradeScale(settings.GRADE_BOUNDARIES)
+
+
+def percentage(obtained, maximum):
+    if not maximum:
+        return Decimal('0.00')
+    return (Decimal(obtained) * 100 / maximum).quantize(CENT, ROUND_HALF_UP)
+
+
+def letter_grade(percentage, scale=None):
+    """Letter grade for a percentage of the maximum marks"""
+    return (scale or default_scale()).grade(percentage)
+
+
+def grade_marks(obtained, maximum, scale=None):
+    """Letter grade for `obtained` out of `maximum`, on the unrounded percentage as regrade() does"""
+    exact = Decimal(obtained) * 100 / maximum if maximum else Decimal('0')
+    return letter_grade(exact, scale)
+
+
+def scheme_version():
+    version = cache.get(SCHEME_VERSION_KEY)
+    if version is None:
+        cache.add(SCHEME_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(SCHEME_VERSION_KEY)
+    return version
+
+
+def invalidate_schemes():
+    cache.set(SCHEME_VERSION_KEY, time.time_ns(), timeout=None)
+    _scales.clear()
+
+
+def load_scale(academic_year_id):
+    """GradeScale of an academic year from the database, in one query"""
+    boundaries = GradeBoundary.objects.filter(
+        Q(scheme__academic_year_id=academic_year_id) | Q(scheme__academic_year__isnull=True),
+        scheme__is_active=True,
+        scheme__campus__in=AcademicYear.objects.filter(pk=academic_year_id).values('campus'),
+    ).values_list('scheme__academic_year_id', 'min_percentage', 'grade')
+    by_year = {}
+    for year_id, minimum, letter in boundaries:
+        by_year.setdefault(year_id, []).append((minimum, letter))
+    rows = by_year.get(academic_year_id) or by_year.get(None)
+    return GradeScale(rows) if rows else default_scale()
+
+
+def scale_for(academic_year_id):
+    """Cached GradeScale of an academic year"""
+    version = scheme_version()
+    cached = _scales.get(academic_year_id)
+    if cached is None or cached[0] != version:
+        cached = _scales[academic_year_id] = (version, load_scale(academic_year_id))
+    return cached[1]
+
+
+def regrade(examination, scale=None):
+    """
+    Re-letter every grade of `examination` in one UPDATE. Compares
+    total * 100 >= minimum * paper marks, so no division happens in SQL.
+    Returns the number of grades updated.
+    """
+    scale = scale or scale_for(examination.academic_year_id)
+    paper_marks = Subquery(ExamSchedule.objects.filter(pk=OuterRef('exam_schedule_id')).values('total_marks')[:1])
+    boundaries = sorted(scale, reverse=True)
+    letter = Case(
+        *[
+            When(GreaterThanOrEqual(F('total_marks') * 100, paper_marks * Value(minimum)), then=Value(grade))
+            for minimum, grade in boundaries[:-1]
+        ],
+        default=Value(boundaries[-1][1]),
+    )
+    return Grade.objects.filter(
+        exam_schedule__examination=examination,
+        exam_schedule__total_marks__gt=0,
+    ).update(grade=letter)
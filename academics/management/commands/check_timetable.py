@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import Timetable
+from academics.timetabling import find_clashes, load_slots
+from accounts.models import AcademicYear
+
+
+class Command(BaseCommand):
+    help = 'Report every teacher, room and section double booking in a timetable'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', type=int, required=True, help='Academic year id')
+
+    def handle(self, *args, **options):
+        academic_year = AcademicYear.objects.filter(pk=options['academic_year']).first()
+        if academic_year is None:
+            raise CommandError(f"Unknown academic year {options['academic_year']}")
+
+        slots = list(load_slots(Timetable.objects.filter(academic_year=academic_year, is_active=True)))
+        clashes = find_clashes(slots)
+        for clash in clashes:
+            self.stdout.write(self.style.WARNING(f'   {clash.describe()}'))
+        style = self.style.SUCCESS if not clashes else self.style.ERROR
+        self.stdout.write(style(f'{len(slots)} slots checked, {len(clashes)} clashes'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.timetabling import generate_timetable
+from accounts.models import AcademicYear
+
+
+class Command(BaseCommand):
+    help = 'Fill ClassSubject weekly periods into the timetable grid without double booking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', type=int, required=True, help='Academic year id')
+        parser.add_argument('--class-id', type=int, action='append', dest='class_ids', help='Only this class (repeatable)')
+        parser.add_argument('--replace', action='store_true', help="Discard the sections' current slots first")
+        parser.add_argument('--dry-run', action='store_true', help='Report the plan without writing it')
+
+    def handle(self, *args, **options):
+        academic_year = AcademicYear.objects.filter(pk=options['academic_year']).first()
+        if academic_year is None:
+            raise CommandError(f"Unknown academic year {options['academic_year']}")
+
+        plan = generate_timetable(
+            academic_year, options['class_ids'], replace=options['replace'], dry_run=options['dry_run']
+        )
+        for section, requirement, count in plan.unplaced:
+            self.stdout.write(self.style.WARNING(
+                f'   {section}: {count} of {requirement.periods_per_week} {requirement.subject.name} periods did not fit'
+            ))
+        prefix = 'Would write' if options['dry_run'] else 'Wrote'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix} {len(plan.slots)} slots for {len(plan.sections)} sections'
+            + (f' (replacing {plan.replaced})' if options['replace'] else '')
+            + f', {sum(count for _section, _requirement, count in plan.unplaced)} periods unplaced'
+        ))
@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import Examination
+from academics.seat_plans import print_seating
+from academics.seating import exam_days, plan_seating, save_seating
+
+
+class Command(BaseCommand):
+    help = 'Allocate the candidates of an exam day to rooms and seats; optionally print seat plans and door lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('examination', type=int, help='Examination id')
+        parser.add_argument('date', nargs='?', type=date.fromisoformat, help='Exam day (YYYY-MM-DD); every day if omitted')
+        parser.add_argument('--dry-run', action='store_true', help='Report the plan without saving it')
+        parser.add_argument('--print', dest='output', help='Write seat plans and door lists to this PDF (one day only)')
+
+    def handle(self, *args, **options):
+        examination = Examination.objects.select_related('academic_year__campus').filter(
+            pk=options['examination']
+        ).first()
+        if examination is None:
+            raise CommandError(f"Unknown examination {options['examination']}")
+        days = [options['date']] if options['date'] else exam_days(examination)
+        if options['output'] and len(days) != 1:
+            raise CommandError('--print needs a single exam day')
+
+        for day in days:
+            plan = (plan_seating if options['dry_run'] else save_seating)(examination, day)
+            for schedule, count in plan.unseated.items():
+                self.stdout.write(self.style.WARNING(f'   {schedule}: {count} candidates did not fit'))
+            self.stdout.write(self.style.SUCCESS(
+                f'{day}: {len(plan.seats)} of {plan.candidates} candidates seated in {plan.rooms} rooms '
+                f'over {plan.sittings} sittings'
+            ))
+
+        if options['output'] and not options['dry_run']:
+            count = print_seating(examination, days[0], options['output'])
+            self.stdout.write(self.style.SUCCESS(f'Seating {options["output"]}: {count} rooms'))
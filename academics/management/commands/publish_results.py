@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.models import Examination, ExamResult
+from academics.report_cards import print_report_cards
+from academics.results import publish_results
+
+
+class Command(BaseCommand):
+    help = 'Compute and publish the results of an examination; optionally print the report cards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('examination', type=int, help='Examination id')
+        parser.add_argument('--class-id', type=int, action='append', dest='class_ids', help='Only this class (repeatable)')
+        parser.add_argument('--report-cards', help='Also write every report card to this PDF')
+
+    def handle(self, *args, **options):
+        examination = Examination.objects.filter(pk=options['examination']).first()
+        if examination is None:
+            raise CommandError(f"Unknown examination {options['examination']}")
+
+        summary = publish_results(examination, options['class_ids'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Published {examination}: {summary.students} students in {summary.classes} classes, '
+            f'{summary.passed} passed'
+        ))
+
+        if options['report_cards']:
+            results = ExamResult.objects.filter(examination=examination)
+            if options['class_ids']:
+                results = results.filter(class_name_id__in=options['class_ids'])
+            count = print_report_cards(results, options['report_cards'])
+            self.stdout.write(self.style.SUCCESS(f'Report cards {options["report_cards"]}: {count} pages'))
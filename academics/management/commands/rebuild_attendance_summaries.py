@@ -0,0 +1,20 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from academics.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the section/day and student/month attendance summary tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=date.fromisoformat, help='First month to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end', type=date.fromisoformat, help='Last month to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        sections, students = rebuild_summaries(options['start'], options['end'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {sections} section/day and {students} student/month attendance summaries'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academics.grading import regrade, scale_for
+from academics.models import Examination
+from academics.results import publish_results
+
+
+class Command(BaseCommand):
+    help = "Re-letter every grade of the given examinations with their campus' current grading scheme"
+
+    def add_arguments(self, parser):
+        parser.add_argument('examinations', nargs='*', type=int, help='Examination ids')
+        parser.add_argument('--academic-year', type=int, help='Every examination of this academic year')
+        parser.add_argument('--publish', action='store_true', help='Refresh the published result snapshots afterwards')
+
+    def handle(self, *args, **options):
+        examinations = Examination.objects.none()
+        if options['examinations']:
+            examinations = Examination.objects.filter(pk__in=options['examinations'])
+        if options['academic_year']:
+            examinations = examinations | Examination.objects.filter(academic_year_id=options['academic_year'])
+        examinations = list(examinations.order_by('start_date'))
+        if not examinations:
+            raise CommandError('No examinations selected; pass ids or --academic-year')
+
+        for examination in examinations:
+            scale = scale_for(examination.academic_year_id)
+            updated = regrade(examination, scale)
+            self.stdout.write(f'   {examination}: {updated} grades')
+            if options['publish'] and examination.is_published:
+                publish_results(examination)
+        self.stdout.write(self.style.SUCCESS(f'Re-graded {len(examinations)} examinations'))
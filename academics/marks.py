@@ -0,0 +1,188 @@
+"""
+Bulk marks entry for one ExamSchedule.
+
+A whole class sheet, posted from the marks grid or uploaded as CSV,
+becomes a list of MarkEntry rows. save_marks() grades them all against
+one GradeScale in memory and writes them with a single
+INSERT ... ON CONFLICT (student, exam_schedule) DO UPDATE, so
+Grade.save() and its per-row schedule lookup are never called.
+
+Entering a 40-student sheet costs the schedule, the students, the
+existing grades and one upsert.
+"""
+import csv
+import io
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from students.models import Student
+from .grading import grade_marks, scale_for
+from .models import Grade
+
+ZERO = Decimal('0.00')
+CSV_HEADERS = ['admission_number', 'student', 'theory_marks', 'practical_marks', 'absent', 'remarks']
+TRUE_VALUES = {'1', 'y', 'yes', 'true', 'a', 'abs', 'absent'}
+# Sheets saved from Excel on Windows are cp1252 rather than UTF-8.
+CSV_ENCODINGS = ('utf-8-sig', 'cp1252')
+UPSERT_FIELDS = [
+    'theory_marks', 'practical_marks', 'total_marks', 'grade',
+    'remarks', 'is_absent', 'entered_by', 'updated_at'
+]
+
+
+@dataclass
+class MarkEntry:
+    student_id: int
+    theory_marks: Decimal = ZERO
+    practical_marks: Decimal = ZERO
+    is_absent: bool = False
+    remarks: str = None
+
+    def same_as(self, grade):
+        return (
+            grade is not None
+            and grade.theory_marks == self.theory_marks
+            and grade.practical_marks == self.practical_marks
+            and grade.is_absent == self.is_absent
+            and (grade.remarks or None) == (self.remarks or None)
+        )
+
+
+def sheet_students(schedule, section=None):
+    """Active students of the schedule's class, in register order"""
+    students = Student.objects.filter(
+        current_class_id=schedule.class_name_id,
+        status='ACTIVE'
+    ).select_related('user', 'section').order_by('section__name', 'roll_number', 'user__first_name')
+    if section is not None:
+        students = students.filter(section=section)
+    return students
+
+
+def existing_grades(schedule, student_ids):
+    return {
+        grade.student_id: grade
+        for grade in Grade.objects.filter(exam_schedule=schedule, student_id__in=student_ids)
+    }
+
+
+def build_grades(schedule, entries, entered_by=None, scale=None):
+    """Unsaved, graded Grade rows for `entries`"""
+    scale = scale or scale_for(schedule.examination.academic_year_id)
+    grades = []
+    for entry in entries:
+        theory = ZERO if entry.is_absent else entry.theory_marks
+        practical = ZERO if entry.is_absent else entry.practical_marks
+        total = theory + practical
+        grades.append(Grade(
+            student_id=entry.student_id,
+            exam_schedule=schedule,
+            theory_marks=theory,
+            practical_marks=practical,
+            total_marks=total,
+            grade=grade_marks(total, schedule.total_marks, scale),
+            remarks=entry.remarks or None,
+            is_absent=entry.is_absent,
+            entered_by=entered_by,
+        ))
+    return grades
+
+
+def save_marks(schedule, entries, entered_by=None):
+    """Upsert the grades of `entries` in one statement; returns the row count"""
+    grades = build_grades(schedule, entries, entered_by)
+    if grades:
+        with transaction.atomic():
+            Grade.objects.bulk_create(
+                grades,
+                update_conflicts=True,
+                unique_fields=['student', 'exam_schedule'],
+                update_fields=UPSERT_FIELDS,
+                batch_size=1000,
+            )
+    return len(grades)
+
+
+def validate_marks(schedule, theory, practical):
+    """Error message for marks outside 0..schedule.total_marks, or None"""
+    if theory < 0 or practical < 0:
+        return "marks cannot be negative"
+    if theory + practical > schedule.total_marks:
+        return f"theory + practical is more than the {schedule.total_marks} marks of the paper"
+    return None
+
+
+def _decimal(value):
+    value = (value or '').strip()
+    return Decimal(value) if value else ZERO
+
+
+def open_marks_csv(upload):
+    """
+    The uploaded sheet as a text file object, decoded with the first of
+    CSV_ENCODINGS that fits. Raises ValueError when none does.
+    """
+    content = upload.read()
+    for encoding in CSV_ENCODINGS:
+        try:
+            return io.StringIO(content.decode(encoding), newline='')
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("The sheet is not a readable CSV file; save it as CSV UTF-8 and upload it again.")
+
+
+def read_marks_csv(fileobj, schedule, students):
+    """
+    Parse an uploaded marks sheet (text file object with CSV_HEADERS).
+    Returns (entries, errors); rows are matched to `students` by
+    admission number and nothing should be saved while errors remain.
+    """
+    by_admission = {student.admission_number: student for student in students}
+    reader = csv.DictReader(fileobj)
+    missing = {'admission_number', 'theory_marks'} - set(reader.fieldnames or [])
+    if missing:
+        return [], [f"Missing column(s): {', '.join(sorted(missing))}"]
+
+    entries, errors, seen = [], [], set()
+    for line, row in enumerate(reader, start=2):
+        admission = (row.get('admission_number') or '').strip()
+        if not admission:
+            continue
+        student = by_admission.get(admission)
+        if student is None:
+            errors.append(f"Row {line}: {admission} is not a student of {schedule.class_name}")
+            continue
+        if student.pk in seen:
+            errors.append(f"Row {line}: {admission} appears more than once")
+            continue
+        seen.add(student.pk)
+        absent = (row.get('absent') or '').strip().lower() in TRUE_VALUES
+        try:
+            theory, practical = _decimal(row.get('theory_marks')), _decimal(row.get('practical_marks'))
+        except InvalidOperation:
+            errors.append(f"Row {line}: marks must be numbers")
+            continue
+        error = None if absent else validate_marks(schedule, theory, practical)
+        if error:
+            errors.append(f"Row {line}: {error}")
+            continue
+        entries.append(MarkEntry(student.pk, theory, practical, absent, (row.get('remarks') or '').strip() or None))
+    return entries, errors
+
+
+def write_marks_csv(fileobj, students, existing):
+    """The class sheet as CSV, pre-filled with the marks already entered"""
+    writer = csv.writer(fileobj)
+    writer.writerow(CSV_HEADERS)
+    for student in students:
+        grade = existing.get(student.pk)
+        writer.writerow([
+            student.admission_number,
+            student.user.get_full_name(),
+            grade.theory_marks if grade else '',
+            grade.practical_marks if grade else '',
+            'yes' if grade and grade.is_absent else '',
+            (grade.remarks or '') if grade else '',
+        ])
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+STATUS_FIELDS = {'PRESENT': 'present', 'ABSENT': 'absent', 'LATE': 'late', 'HALF_DAY': 'half_day', 'LEAVE': 'leave'}
+
+
+def build_summaries(apps, schema_editor):
+    # Mirrors academics/summaries.py rebuild_summaries().
+    Attendance = apps.get_model('academics', 'Attendance')
+    SectionAttendanceSummary = apps.get_model('academics', 'SectionAttendanceSummary')
+    StudentAttendanceSummary = apps.get_model('academics', 'StudentAttendanceSummary')
+    counts = {field: Count('pk', filter=Q(status=status)) for status, field in STATUS_FIELDS.items()}
+    attendance = Attendance.objects.order_by()
+
+    sections = attendance.values(
+        'date', 'student__campus_id', 'student__current_class_id', 'student__section_id'
+    ).annotate(**counts)
+    SectionAttendanceSummary.objects.bulk_create((
+        SectionAttendanceSummary(
+            date=row['date'],
+            campus_id=row['student__campus_id'],
+            class_name_id=row['student__current_class_id'],
+            section_id=row['student__section_id'],
+            **{field: row[field] for field in STATUS_FIELDS.values()}
+        )
+        for row in sections.iterator(chunk_size=2000)
+    ), batch_size=2000)
+
+    students = attendance.annotate(month=TruncMonth('date')).values('student_id', 'month').annotate(**counts)
+    StudentAttendanceSummary.objects.bulk_create((
+        StudentAttendanceSummary(
+            student_id=row['student_id'],
+            month=row['month'],
+            **{field: row[field] for field in STATUS_FIELDS.values()}
+        )
+        for row in students.iterator(chunk_size=2000)
+    ), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0003_initial'),
+        ('accounts', '0001_initial'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectionAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('half_day', models.PositiveIntegerField(default=0)),
+                ('leave', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('campus', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='accounts.campus')),
+                ('class_name', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='academics.class')),
+                ('section', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='academics.section')),
+            ],
+            options={
+                'verbose_name': 'Section Attendance Summary',
+                'verbose_name_plural': 'Section Attendance Summaries',
+                'db_table': 'attendance_section_summary',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['campus', 'date'], name='attendance__campus__4383f1_idx')],
+                'unique_together': {('date', 'campus', 'class_name', 'section')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('half_day', models.PositiveIntegerField(default=0)),
+                ('leave', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Student Attendance Summary',
+                'verbose_name_plural': 'Student Attendance Summaries',
+                'db_table': 'attendance_student_summary',
+                'ordering': ['-month'],
+                'unique_together': {('student', 'month')},
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_sectionattendancesummary_studentattendancesummary'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('obtained_marks', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('max_marks', models.PositiveIntegerField(default=0)),
+                ('percentage', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('grade', models.CharField(max_length=5)),
+                ('failed_subjects', models.PositiveIntegerField(default=0)),
+                ('is_passed', models.BooleanField(default=False)),
+                ('position', models.PositiveIntegerField(help_text='Position in the class')),
+                ('section_position', models.PositiveIntegerField(blank=True, null=True)),
+                ('subjects', models.JSONField(default=list, help_text='Per-subject marks as published')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('class_name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_results', to='academics.class')),
+                ('examination', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='academics.examination')),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exam_results', to='academics.section')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_results', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Exam Result',
+                'verbose_name_plural': 'Exam Results',
+                'db_table': 'exam_results',
+                'ordering': ['examination', 'class_name', 'position'],
+                'indexes': [models.Index(fields=['examination', 'class_name', 'position'], name='exam_result_examina_ea883d_idx')],
+                'unique_together': {('examination', 'student')},
+            },
+        ),
+    ]
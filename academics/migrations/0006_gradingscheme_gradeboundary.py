@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0005_examresult'),
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingScheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(blank=True, help_text='Leave empty for the campus default', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='grading_schemes', to='accounts.academicyear')),
+                ('campus', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grading_schemes', to='accounts.campus')),
+            ],
+            options={
+                'verbose_name': 'Grading Scheme',
+                'verbose_name_plural': 'Grading Schemes',
+                'db_table': 'grading_schemes',
+                'ordering': ['campus', '-academic_year'],
+                'unique_together': {('campus', 'academic_year')},
+            },
+        ),
+        migrations.CreateModel(
+            name='GradeBoundary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_percentage', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('grade', models.CharField(max_length=5)),
+                ('description', models.CharField(blank=True, max_length=100, null=True)),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='boundaries', to='academics.gradingscheme')),
+            ],
+            options={
+                'verbose_name': 'Grade Boundary',
+                'verbose_name_plural': 'Grade Boundaries',
+                'db_table': 'grade_boundaries',
+                'ordering': ['scheme', '-min_percentage'],
+                'unique_together': {('scheme', 'grade'), ('scheme', 'min_percentage')},
+            },
+        ),
+    ]
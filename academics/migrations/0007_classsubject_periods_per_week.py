@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_gradingscheme_gradeboundary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classsubject',
+            name='periods_per_week',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Timetable periods per section per week (see generate_timetable)'),
+        ),
+    ]
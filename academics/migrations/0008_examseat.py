@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_classsubject_periods_per_week'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamSeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_number', models.CharField(max_length=50)),
+                ('seat_number', models.PositiveIntegerField()),
+                ('row_number', models.PositiveSmallIntegerField()),
+                ('column_number', models.PositiveSmallIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('exam_schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='academics.examschedule')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_seats', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Exam Seat',
+                'verbose_name_plural': 'Exam Seats',
+                'db_table': 'exam_seats',
+                'ordering': ['room_number', 'seat_number'],
+                'indexes': [models.Index(fields=['room_number', 'seat_number'], name='exam_seats_room_nu_7f4d7b_idx')],
+                'unique_together': {('exam_schedule', 'student')},
+            },
+        ),
+    ]
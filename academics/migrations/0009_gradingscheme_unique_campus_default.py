@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_examseat'),
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='gradingscheme',
+            constraint=models.UniqueConstraint(condition=models.Q(('academic_year__isnull', True)), fields=('campus',), name='grading_schemes_unique_campus_default', violation_error_message='This campus already has a default grading scheme.'),
+        ),
+    ]
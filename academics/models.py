@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from accounts.models import User, Campus, AcademicYear
@@ -121,6 +122,10 @@ class ClassSubject(models.Model):
     theory_marks = models.IntegerField(default=100)
     practical_marks = models.IntegerField(default=0)
     pass_marks = models.IntegerField(default=40)
+    periods_per_week = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Timetable periods per section per week (see generate_timetable)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -192,6 +197,16 @@ class Timetable(models.Model):
     
     def __str__(self):
         return f"{self.class_name.name}-{self.section.name} | {self.day_of_week} | {self.subject.name}"
+    
+    def clean(self):
+        from .timetabling import slot_clashes
+        
+        if self.start_time and self.end_time and self.start_time >= self.end_time:
+            raise ValidationError({'end_time': _('End time must be after the start time.')})
+        if self.is_active and self.academic_year_id and self.day_of_week and self.start_time and self.end_time:
+            clashes = slot_clashes(self)
+            if clashes:
+                raise ValidationError([clash.describe() for clash in clashes])
 
 
 class Attendance(models.Model):
@@ -236,6 +251,83 @@ class Attendance(models.Model):
         return f"{self.student.admission_number} - {self.date} - {self.status}"
 
 
+class AttendanceCounts(models.Model):
+    """Per-status attendance counters shared by the summary tables"""
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    half_day = models.PositiveIntegerField(default=0)
+    leave = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        abstract = True
+    
+    @property
+    def total(self):
+        return self.present + self.absent + self.late + self.half_day + self.leave
+    
+    @property
+    def percentage(self):
+        """Share of marked days the student attended (late and half days count)"""
+        if not self.total:
+            return 0
+        return round((self.present + self.late + self.half_day) * 100 / self.total, 1)
+
+
+class SectionAttendanceSummary(AttendanceCounts):
+    """Daily Attendance Rollup per Section (see academics/summaries.py)"""
+    date = models.DateField()
+    campus = models.ForeignKey(
+        Campus,
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries'
+    )
+    class_name = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='attendance_summaries'
+    )
+    section = models.ForeignKey(
+        Section,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='attendance_summaries'
+    )
+    
+    class Meta:
+        db_table = 'attendance_section_summary'
+        verbose_name = _('Section Attendance Summary')
+        verbose_name_plural = _('Section Attendance Summaries')
+        unique_together = ['date', 'campus', 'class_name', 'section']
+        indexes = [models.Index(fields=['campus', 'date'])]
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"{self.date} - {self.class_name} {self.section or ''}"
+
+
+class StudentAttendanceSummary(AttendanceCounts):
+    """Monthly Attendance Rollup per Student (see academics/summaries.py)"""
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries'
+    )
+    month = models.DateField(help_text="First day of the month")
+    
+    class Meta:
+        db_table = 'attendance_student_summary'
+        verbose_name = _('Student Attendance Summary')
+        verbose_name_plural = _('Student Attendance Summaries')
+        unique_together = ['student', 'month']
+        ordering = ['-month']
+    
+    def __str__(self):
+        return f"{self.student.admission_number} - {self.month:%Y-%m}"
+
+
 class Examination(models.Model):
     """Examination Management"""
     
@@ -346,24 +438,161 @@ class Grade(models.Model):
         return f"{self.student.admission_number} - {self.exam_schedule.subject.name} - {self.total_marks}"
     
     def save(self, *args, **kwargs):
+        from .grading import grade_marks, scale_for
+        
         self.total_marks = self.theory_marks + self.practical_marks
-        # Calculate grade based on percentage
-        percentage = (self.total_marks / self.exam_schedule.total_marks) * 100
-        if percentage >= 90:
-            self.grade = 'A+'
-        elif percentage >= 80:
-            self.grade = 'A'
-        elif percentage >= 70:
-            self.grade = 'B'
-        elif percentage >= 60:
-            self.grade = 'C'
-        elif percentage >= 50:
-            self.grade = 'D'
-        else:
-            self.grade = 'F'
+        # One query for both the paper's marks and the scheme's academic year
+        paper_marks, academic_year_id = ExamSchedule.objects.filter(pk=self.exam_schedule_id).values_list(
+            'total_marks', 'examination__academic_year_id'
+        ).get()
+        self.grade = grade_marks(self.total_marks, paper_marks, scale_for(academic_year_id))
         super().save(*args, **kwargs)
 
 
+class ExamResult(models.Model):
+    """Result Snapshot per Student and Examination (see academics/results.py)"""
+    examination = models.ForeignKey(
+        Examination,
+        on_delete=models.CASCADE,
+        related_name='results'
+    )
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.CASCADE,
+        related_name='exam_results'
+    )
+    class_name = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        related_name='exam_results'
+    )
+    section = models.ForeignKey(
+        Section,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='exam_results'
+    )
+    obtained_marks = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    max_marks = models.PositiveIntegerField(default=0)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    grade = models.CharField(max_length=5)
+    failed_subjects = models.PositiveIntegerField(default=0)
+    is_passed = models.BooleanField(default=False)
+    position = models.PositiveIntegerField(help_text="Position in the class")
+    section_position = models.PositiveIntegerField(null=True, blank=True)
+    subjects = models.JSONField(default=list, help_text="Per-subject marks as published")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'exam_results'
+        verbose_name = _('Exam Result')
+        verbose_name_plural = _('Exam Results')
+        unique_together = ['examination', 'student']
+        indexes = [models.Index(fields=['examination', 'class_name', 'position'])]
+        ordering = ['examination', 'class_name', 'position']
+    
+    def __str__(self):
+        return f"{self.student.admission_number} - {self.examination.name} - {self.percentage}%"
+
+
+class ExamSeat(models.Model):
+    """Exam Seating Plan per Student and Paper (see academics/seating.py)"""
+    exam_schedule = models.ForeignKey(
+        ExamSchedule,
+        on_delete=models.CASCADE,
+        related_name='seats'
+    )
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.CASCADE,
+        related_name='exam_seats'
+    )
+    room_number = models.CharField(max_length=50)
+    seat_number = models.PositiveIntegerField()
+    row_number = models.PositiveSmallIntegerField()
+    column_number = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'exam_seats'
+        verbose_name = _('Exam Seat')
+        verbose_name_plural = _('Exam Seats')
+        unique_together = ['exam_schedule', 'student']
+        indexes = [models.Index(fields=['room_number', 'seat_number'])]
+        ordering = ['room_number', 'seat_number']
+    
+    def __str__(self):
+        return f"{self.student.admission_number} - {self.room_number} seat {self.seat_number}"
+
+
+class GradingScheme(models.Model):
+    """Grade Boundaries per Campus, optionally for one Academic Year (see academics/grading.py)"""
+    name = models.CharField(max_length=100)
+    campus = models.ForeignKey(
+        Campus,
+        on_delete=models.CASCADE,
+        related_name='grading_schemes'
+    )
+    academic_year = models.ForeignKey(
+        AcademicYear,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='grading_schemes',
+        help_text="Leave empty for the campus default"
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'grading_schemes'
+        verbose_name = _('Grading Scheme')
+        verbose_name_plural = _('Grading Schemes')
+        unique_together = ['campus', 'academic_year']
+        constraints = [
+            # NULLs never clash in unique_together, so one default per campus is enforced here.
+            models.UniqueConstraint(
+                fields=['campus'],
+                condition=models.Q(academic_year__isnull=True),
+                name='grading_schemes_unique_campus_default',
+                violation_error_message=_('This campus already has a default grading scheme.'),
+            ),
+        ]
+        ordering = ['campus', '-academic_year']
+    
+    def __str__(self):
+        return f"{self.name} - {self.campus.name} ({self.academic_year.name if self.academic_year else 'default'})"
+    
+    def clean(self):
+        if self.academic_year_id and self.campus_id and self.academic_year.campus_id != self.campus_id:
+            raise ValidationError({'academic_year': _('The academic year belongs to another campus.')})
+
+
+class GradeBoundary(models.Model):
+    """Lowest percentage earning a letter grade within a GradingScheme"""
+    scheme = models.ForeignKey(
+        GradingScheme,
+        on_delete=models.CASCADE,
+        related_name='boundaries'
+    )
+    min_percentage = models.DecimalField(max_digits=5, decimal_places=2)
+    grade = models.CharField(max_length=5)
+    description = models.CharField(max_length=100, blank=True, null=True)
+    
+    class Meta:
+        db_table = 'grade_boundaries'
+        verbose_name = _('Grade Boundary')
+        verbose_name_plural = _('Grade Boundaries')
+        unique_together = [['scheme', 'min_percentage'], ['scheme', 'grade']]
+        ordering = ['scheme', '-min_percentage']
+    
+    def __str__(self):
+        return f"{self.grade} >= {self.min_percentage}%"
+
+
 class Homework(models.Model):
     """Homework/Assignment Management"""
     
@@ -0,0 +1,158 @@
+"""
+Report cards drawn from published ExamResult snapshots.
+
+Everything on a card comes from the snapshot and its select_related
+rows, so a batch costs one query per chunk of students (plus one for
+class sizes) whatever the number of subjects. Each card is one A4 page
+of a single PDF.
+"""
+from django.db.models import Count
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from utils.pdf import campus_details, draw_header, fit, fonts
+from .models import ExamResult
+
+MARGIN = 36
+# Card order; print_report_cards() chunks the ids in this order too.
+ORDERING = ('class_name__numeric_value', 'position', 'student__admission_number')
+
+
+def class_sizes(results):
+    """{(examination_id, class_id): students with a result} for `results`"""
+    rows = ExamResult.objects.filter(examination__in=results.values('examination')).values(
+        'examination_id', 'class_name_id'
+    ).annotate(students=Count('pk')).order_by()
+    return {(row['examination_id'], row['class_name_id']): row['students'] for row in rows}
+
+
+def load_report_cards(result_ids, sizes, campuses=None):
+    campuses = {} if campuses is None else campuses
+    results = ExamResult.objects.filter(pk__in=result_ids).select_related(
+        'examination__academic_year', 'class_name', 'section',
+        'student__user', 'student__campus',
+    ).order_by(*ORDERING)
+    cards = []
+    for result in results:
+        student = result.student
+        cards.append({
+            'campus': campus_details(student.campus, campuses),
+            'examination': result.examination.name,
+            'academic_year': result.examination.academic_year.name,
+            'student_name': student.user.get_full_name(),
+            'admission_number': student.admission_number,
+            'roll_number': student.roll_number or '-',
+            'father_name': student.father_name,
+            'class_name': result.class_name.name,
+            'section': result.section.name if result.section else '-',
+            'subjects': result.subjects,
+            'obtained_marks': result.obtained_marks,
+            'max_marks': result.max_marks,
+            'percentage': result.percentage,
+            'grade': result.grade,
+            'is_passed': result.is_passed,
+            'position': result.position,
+            'section_position': result.section_position,
+            'class_size': sizes.get((result.examination_id, result.class_name_id), 0),
+        })
+    return cards
+
+
+def draw_report_card(pdf, card):
+    regular, bold = fonts()
+    page_width, page_height = A4
+    x, width = MARGIN, page_width - 2 * MARGIN
+    y = draw_header(pdf, card['campus'], x, page_height - MARGIN, width)
+
+    pdf.setFont(bold, 14)
+    pdf.drawCentredString(page_width / 2, y - 10, "REPORT CARD")
+    pdf.setFont(regular, 9)
+    pdf.drawCentredString(page_width / 2, y - 24, f"{card['examination']} - {card['academic_year']}")
+    y -= 50
+
+    details = [
+        ("Student", card['student_name'], "Admission No", card['admission_number']),
+        ("Father Name", card['father_name'], "Roll No", card['roll_number']),
+        ("Class", card['class_name'], "Section", card['section']),
+    ]
+    for left_label, left, right_label, right in details:
+        pdf.setFont(regular, 9)
+        pdf.drawString(x, y, left_label)
+        pdf.drawString(x + width / 2, y, right_label)
+        pdf.setFont(bold, 9)
+        pdf.drawString(x + 80, y, fit(left, bold, 9, width / 2 - 90))
+        pdf.drawString(x + width / 2 + 80, y, fit(right, bold, 9, width / 2 - 80))
+        y -= 14
+
+    y -= 10
+    columns = [(x + 4, "Subject"), (x + width * 0.52, "Max"), (x + width * 0.64, "Pass"),
+               (x + width * 0.78, "Obtained"), (x + width - 4, "Grade")]
+    pdf.setFillGray(0.9)
+    pdf.rect(x, y - 5, width, 16, stroke=0, fill=1)
+    pdf.setFillGray(0)
+    pdf.setFont(bold, 9)
+    pdf.drawString(columns[0][0], y, columns[0][1])
+    for column_x, label in columns[1:]:
+        pdf.drawRightString(column_x, y, label)
+    y -= 18
+
+    for subject in card['subjects']:
+        pdf.setFont(regular, 9)
+        pdf.drawString(columns[0][0], y, fit(subject['subject'], regular, 9, width * 0.45))
+        pdf.drawRightString(columns[1][0], y, str(subject['total']))
+        pdf.drawRightString(columns[2][0], y, str(subject['pass_marks']))
+        pdf.drawRightString(columns[3][0], y, "Absent" if subject['absent'] else subject['obtained'])
+        if not subject['passed']:
+            pdf.setFillColorRGB(0.75, 0, 0)
+        pdf.drawRightString(columns[4][0], y, subject['grade'])
+        pdf.setFillGray(0)
+        y -= 14
+    pdf.line(x, y + 9, x + width, y + 9)
+
+    pdf.setFont(bold, 9)
+    pdf.drawString(columns[0][0], y - 4, "Total")
+    pdf.drawRightString(columns[1][0], y - 4, str(card['max_marks']))
+    pdf.drawRightString(columns[3][0], y - 4, f"{card['obtained_marks']}")
+    pdf.drawRightString(columns[4][0], y - 4, card['grade'])
+    y -= 36
+
+    position = f"{card['position']} of {card['class_size']}"
+    if card['section_position']:
+        position += f" (section: {card['section_position']})"
+    summary = [
+        ("Percentage", f"{card['percentage']}%"),
+        ("Position in Class", position),
+        ("Result", "PASS" if card['is_passed'] else "FAIL"),
+    ]
+    for label, value in summary:
+        pdf.setFont(regular, 10)
+        pdf.drawString(x, y, label)
+        pdf.setFont(bold, 10)
+        pdf.drawString(x + 120, y, value)
+        y -= 16
+
+    pdf.setFont(regular, 9)
+    for index, label in enumerate(("Class Teacher", "Principal", "Parent / Guardian")):
+        line_x = x + index * width / 3
+        pdf.line(line_x, MARGIN + 14, line_x + width / 3 - 20, MARGIN + 14)
+        pdf.drawString(line_x, MARGIN + 2, label)
+    pdf.showPage()
+
+
+def print_report_cards(results, output, chunk_size=200):
+    """
+    Draw a report card per ExamResult in `results` (a queryset) into
+    `output`, a path or binary file object. Returns the number of cards.
+    """
+    ids = list(results.order_by(*ORDERING).values_list('pk', flat=True))
+    pdf = canvas.Canvas(output, pagesize=A4, pageCompression=1)
+    pdf.setTitle("Report Cards")
+    sizes = class_sizes(results) if ids else {}
+    campuses = {}
+    for start in range(0, len(ids), chunk_size):
+        for card in load_report_cards(ids[start:start + chunk_size], sizes, campuses):
+            draw_report_card(pdf, card)
+    if not ids:
+        pdf.showPage()
+    pdf.save()
+    return len(ids)
@@ -0,0 +1,161 @@
+"""
+Result processing for an Examination.
+
+publish_results() turns the Grade rows of an examination into one
+ExamResult snapshot per student:
+
+    1 query    the examination's schedules (subject, total and pass marks)
+    1 query    per class, every Grade of that class in the examination
+    1 query    per class, INSERT ... ON CONFLICT (examination, student)
+    1 query    per class, DELETE results of students without grades
+
+A student's total is the sum over every subject scheduled for their
+class; a missing or absent mark counts as 0 and fails that subject. A
+student passes when no subject is failed. Positions use competition
+ranking (1, 2, 2, 4) on obtained marks, per class and per section.
+
+The subject breakdown is stored on the snapshot, so result pages and
+report cards (academics/report_cards.py) read ExamResult only and stay
+as published even if grades are edited later; publish again to refresh.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+
+from .grading import grade_marks, percentage, scale_for
+from .models import ExamResult, ExamSchedule, Examination, Grade
+
+ZERO = Decimal('0.00')
+RESULT_FIELDS = [
+    'section', 'obtained_marks', 'max_marks', 'percentage', 'grade', 'failed_subjects',
+    'is_passed', 'position', 'section_position', 'subjects', 'updated_at'
+]
+
+
+@dataclass
+class PublishSummary:
+    classes: int = 0
+    students: int = 0
+    passed: int = 0
+
+
+def class_schedules(examination, class_ids=None):
+    """{class_id: [schedule dict, ...]} in subject order"""
+    schedules = ExamSchedule.objects.filter(examination=examination)
+    if class_ids is not None:
+        schedules = schedules.filter(class_name_id__in=class_ids)
+    by_class = defaultdict(list)
+    rows = schedules.order_by('class_name_id', 'subject__name', 'pk').values_list(
+        'pk', 'class_name_id', 'subject__name', 'subject__code', 'total_marks', 'pass_marks'
+    )
+    for pk, class_id, name, code, total, pass_marks in rows:
+        by_class[class_id].append({'id': pk, 'subject': name, 'code': code, 'total': total, 'pass_marks': pass_marks})
+    return by_class
+
+
+def class_marks(examination, class_id):
+    """{student_id: (section_id, {schedule_id: marks or None when absent})}"""
+    students = {}
+    grades = Grade.objects.filter(
+        exam_schedule__examination=examination,
+        exam_schedule__class_name_id=class_id,
+    ).values_list('student_id', 'student__section_id', 'exam_schedule_id', 'total_marks', 'is_absent')
+    for student_id, section_id, schedule_id, marks, is_absent in grades.iterator(chunk_size=2000):
+        _section, marks_by_schedule = students.setdefault(student_id, (section_id, {}))
+        marks_by_schedule[schedule_id] = None if is_absent else marks
+    return students
+
+
+def rank(results, attribute):
+    """Set competition-ranking positions on `results` by obtained marks"""
+    previous, position = None, 0
+    ordered = sorted(results, key=lambda result: -result.obtained_marks)
+    for index, result in enumerate(ordered, start=1):
+        if result.obtained_marks != previous:
+            previous, position = result.obtained_marks, index
+        setattr(result, attribute, position)
+
+
+def compute_class(examination, class_id, schedules, marks):
+    """Unsaved ExamResult rows of one class"""
+    max_marks = sum(schedule['total'] for schedule in schedules)
+    scale = scale_for(examination.academic_year_id)
+    results = []
+    for student_id, (section_id, marks_by_schedule) in marks.items():
+        obtained, failed, subjects = ZERO, 0, []
+        for schedule in schedules:
+            score = marks_by_schedule.get(schedule['id'])
+            absent = score is None
+            score = ZERO if absent else score
+            passed = not absent and score >= schedule['pass_marks']
+            obtained += score
+            failed += not passed
+            subjects.append({
+                'subject': schedule['subject'],
+                'code': schedule['code'],
+                'obtained': str(score),
+                'total': schedule['total'],
+                'pass_marks': schedule['pass_marks'],
+                'grade': grade_marks(score, schedule['total'], scale),
+                'absent': absent,
+                'passed': passed,
+            })
+        overall = percentage(obtained, max_marks)
+        results.append(ExamResult(
+            examination=examination,
+            student_id=student_id,
+            class_name_id=class_id,
+            section_id=section_id,
+            obtained_marks=obtained,
+            max_marks=max_marks,
+            percentage=overall,
+            grade=grade_marks(obtained, max_marks, scale),
+            failed_subjects=failed,
+            is_passed=not failed,
+            subjects=subjects,
+        ))
+
+    rank(results, 'position')
+    by_section = defaultdict(list)
+    for result in results:
+        by_section[result.section_id].append(result)
+    for section_id, section_results in by_section.items():
+        if section_id is not None:
+            rank(section_results, 'section_position')
+    return results
+
+
+def publish_results(examination, class_ids=None):
+    """
+    Recompute the ExamResult snapshot of `examination` (optionally only
+    `class_ids`) and mark it published. Returns a PublishSummary.
+    """
+    summary = PublishSummary()
+    schedules = class_schedules(examination, class_ids)
+    with transaction.atomic():
+        for class_id, class_schedule in schedules.items():
+            results = compute_class(examination, class_id, class_schedule, class_marks(examination, class_id))
+            ExamResult.objects.bulk_create(
+                results,
+                update_conflicts=True,
+                unique_fields=['examination', 'student'],
+                update_fields=['class_name'] + RESULT_FIELDS,
+                batch_size=1000,
+            )
+            ExamResult.objects.filter(examination=examination, class_name_id=class_id).exclude(
+                student_id__in=[result.student_id for result in results]
+            ).delete()
+            summary.classes += 1
+            summary.students += len(results)
+            summary.passed += sum(result.is_passed for result in results)
+
+        # Classes whose schedules were removed since the last publish
+        stale = ExamResult.objects.filter(examination=examination).exclude(class_name_id__in=list(schedules))
+        if class_ids is not None:
+            stale = stale.filter(class_name_id__in=class_ids)
+        stale.delete()
+        Examination.objects.filter(pk=examination.pk).update(is_published=True)
+    examination.is_published = True
+    return summary
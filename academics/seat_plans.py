@@ -0,0 +1,174 @@
+"""
+Seat plans and door lists for one day of an Examination.
+
+Every seat of the day is read with one query and grouped per sitting
+and room. Each room gets a seat plan (A4 landscape: the desk grid as
+seen from the invigilator's table) and a door list (A4 portrait:
+candidates by class and roll number with their seat), all in a single
+PDF.
+"""
+from itertools import groupby
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfgen import canvas
+
+from utils.pdf import campus_details, draw_header, fit, fonts
+from .models import ExamSeat
+from .seating import natural_key, sittings
+
+MARGIN = 30
+CELL_MIN_HEIGHT = 34
+LIST_ROW_HEIGHT = 14
+
+
+def load_rooms(examination, date):
+    """One dict per (sitting, room) with its seats, in sitting then room order"""
+    seats = list(ExamSeat.objects.filter(
+        exam_schedule__examination=examination, exam_schedule__date=date
+    ).select_related(
+        'exam_schedule__class_name', 'exam_schedule__subject', 'student__user', 'student__section'
+    ))
+    schedules = {seat.exam_schedule_id: seat.exam_schedule for seat in seats}
+    sitting_of = {}
+    for index, sitting in enumerate(sittings(schedules.values())):
+        for schedule in sitting:
+            sitting_of[schedule.pk] = (index, sitting)
+
+    seats.sort(key=lambda seat: (
+        sitting_of[seat.exam_schedule_id][0], natural_key(seat.room_number), seat.seat_number
+    ))
+    campus = campus_details(examination.academic_year.campus, {}) if seats else None
+    rooms = []
+    for (index, room), room_seats in groupby(
+        seats, key=lambda seat: (sitting_of[seat.exam_schedule_id][0], seat.room_number)
+    ):
+        room_seats = list(room_seats)
+        sitting = sitting_of[room_seats[0].exam_schedule_id][1]
+        rooms.append({
+            'campus': campus,
+            'examination': examination.name,
+            'date': date.strftime('%d %b %Y'),
+            'time': (
+                f"{min(schedule.start_time for schedule in sitting):%H:%M} - "
+                f"{max(schedule.end_time for schedule in sitting):%H:%M}"
+            ),
+            'room': room,
+            'seats': [_seat(seat) for seat in room_seats],
+        })
+    return rooms
+
+
+def _seat(seat):
+    student = seat.student
+    schedule = seat.exam_schedule
+    return {
+        'number': seat.seat_number,
+        'row': seat.row_number,
+        'column': seat.column_number,
+        'admission_number': student.admission_number,
+        'name': student.user.get_full_name(),
+        'roll_number': student.roll_number or '',
+        'class_name': schedule.class_name.name + (f"-{student.section.name}" if student.section else ''),
+        'class_order': schedule.class_name.numeric_value,
+        'subject': schedule.subject.name,
+    }
+
+
+def _title(pdf, room, title, page_width, top):
+    regular, bold = fonts()
+    y = draw_header(pdf, room['campus'], MARGIN, top, page_width - 2 * MARGIN)
+    pdf.setFont(bold, 13)
+    pdf.drawCentredString(page_width / 2, y - 6, f"{title} - ROOM {room['room']}")
+    pdf.setFont(regular, 9)
+    pdf.drawCentredString(
+        page_width / 2, y - 20,
+        f"{room['examination']} - {room['date']} - {room['time']} - {len(room['seats'])} candidates"
+    )
+    return y - 36
+
+
+def draw_seat_plan(pdf, room):
+    regular, bold = fonts()
+    page_width, page_height = landscape(A4)
+    columns = max(seat['column'] for seat in room['seats'])
+    rows = max(seat['row'] for seat in room['seats'])
+    by_row = {}
+    for seat in room['seats']:
+        by_row.setdefault(seat['row'], []).append(seat)
+    cell_width = (page_width - 2 * MARGIN) / columns
+
+    row = 1
+    while row <= rows:
+        pdf.setPageSize((page_width, page_height))
+        y = _title(pdf, room, "SEATING PLAN", page_width, page_height - MARGIN)
+        pdf.setFont(bold, 8)
+        pdf.drawCentredString(page_width / 2, y, "FRONT - INVIGILATOR")
+        y -= 8
+        per_page = max(1, int((y - MARGIN) // CELL_MIN_HEIGHT))
+        cell_height = min(60, (y - MARGIN) / min(per_page, rows - row + 1))
+        for page_row in range(row, min(rows, row + per_page - 1) + 1):
+            for seat in by_row.get(page_row, []):
+                x = MARGIN + (seat['column'] - 1) * cell_width
+                top = y - (page_row - row) * cell_height
+                pdf.rect(x + 2, top - cell_height + 2, cell_width - 4, cell_height - 4)
+                pdf.setFont(bold, 9)
+                pdf.drawString(x + 6, top - 12, str(seat['number']))
+                pdf.drawRightString(x + cell_width - 6, top - 12, fit(seat['admission_number'], bold, 9, cell_width - 34))
+                pdf.setFont(regular, 7)
+                pdf.drawString(x + 6, top - 22, fit(seat['class_name'], regular, 7, cell_width - 12))
+                if cell_height >= 40:
+                    pdf.drawString(x + 6, top - 31, fit(seat['subject'], regular, 7, cell_width - 12))
+        row += per_page
+        pdf.showPage()
+
+
+def draw_door_list(pdf, room):
+    regular, bold = fonts()
+    page_width, page_height = A4
+    width = page_width - 2 * MARGIN
+    columns = [(MARGIN + 4, "Seat"), (MARGIN + 40, "Admission No"), (MARGIN + 120, "Name"),
+               (MARGIN + width * 0.55, "Class"), (MARGIN + width * 0.72, "Subject")]
+    seats = sorted(room['seats'], key=lambda seat: (
+        seat['class_order'], seat['class_name'], natural_key(str(seat['roll_number'])), seat['admission_number']
+    ))
+
+    index = 0
+    while index < len(seats):
+        pdf.setPageSize((page_width, page_height))
+        y = _title(pdf, room, "DOOR LIST", page_width, page_height - MARGIN)
+        pdf.setFillGray(0.9)
+        pdf.rect(MARGIN, y - 5, width, 16, stroke=0, fill=1)
+        pdf.setFillGray(0)
+        pdf.setFont(bold, 9)
+        for column_x, label in columns:
+            pdf.drawString(column_x, y, label)
+        y -= 18
+        pdf.setFont(regular, 9)
+        while index < len(seats) and y > MARGIN:
+            seat = seats[index]
+            values = [str(seat['number']), seat['admission_number'], seat['name'], seat['class_name'], seat['subject']]
+            limits = [32, 76, width * 0.55 - 124, width * 0.17 - 6, width * 0.28 - 6]
+            for (column_x, _label), value, limit in zip(columns, values, limits):
+                pdf.drawString(column_x, y, fit(value, regular, 9, limit))
+            y -= LIST_ROW_HEIGHT
+            index += 1
+        pdf.showPage()
+
+
+def print_seating(examination, date, output, seat_plans=True, door_lists=True):
+    """
+    Draw the seat plan and door list of every room used on `date` into
+    `output`, a path or binary file object. Returns the number of rooms.
+    """
+    rooms = load_rooms(examination, date)
+    pdf = canvas.Canvas(output, pagesize=landscape(A4), pageCompression=1)
+    pdf.setTitle(f"Seating {examination.name} {date}")
+    for room in rooms:
+        if seat_plans:
+            draw_seat_plan(pdf, room)
+        if door_lists:
+            draw_door_list(pdf, room)
+    if not rooms or not (seat_plans or door_lists):
+        pdf.showPage()
+    pdf.save()
+    return len(rooms)
@@ -0,0 +1,223 @@
+"""
+Exam seating for one day of an Examination.
+
+plan_seating() splits the day's ExamSchedules into sittings (papers
+whose times overlap) and seats every active student of each paper's
+class in the rooms of the examination's campus:
+
+    rooms       the rooms named on the sitting's schedules (comma
+                separated), else every active section room. A room
+                seats the largest capacity of its sections, or
+                settings.EXAM_ROOM_CAPACITY when no section uses it.
+    layout      rows of settings.EXAM_ROOM_COLUMNS desks, filled from
+                the front.
+    interleave  a room's seats alternate like a chessboard. One colour
+                takes the largest remaining paper, the other the
+                largest remaining paper not already on the first, so
+                no two candidates of a paper sit side by side or one
+                behind the other. When every paper left is already
+                on the first colour, the remaining seats are filled
+                one at a time with a paper no neighbour is sitting.
+
+allocate() is a greedy pass over a heap of papers, O(n + r k log k)
+for n candidates, r rooms and k papers (plus O(log k) per seat filled
+one at a time), with no queries. A day costs
+the schedules, the section rooms and one student query per sitting;
+save_seating() then replaces the day's seats with one DELETE and a
+bulk INSERT. A class with two papers in one sitting is seated once,
+under its first paper. Candidates who do not fit are reported per
+paper, never squeezed in.
+"""
+import heapq
+import re
+from collections import deque, namedtuple
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+
+from students.models import Student
+from .models import ExamSchedule, ExamSeat, Section
+from .timetabling import room_key
+
+Room = namedtuple('Room', 'name capacity')
+Seat = namedtuple('Seat', 'paper candidate room number row column')
+
+
+@dataclass
+class SeatingPlan:
+    seats: list = field(default_factory=list)
+    sittings: int = 0
+    rooms: int = 0
+    unseated: dict = field(default_factory=dict)
+
+    @property
+    def candidates(self):
+        return len(self.seats) + sum(self.unseated.values())
+
+
+def natural_key(name):
+    """Sort key that puts Room 2 before Room 10"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+def exam_days(examination):
+    return list(ExamSchedule.objects.filter(examination=examination).order_by('date').values_list(
+        'date', flat=True
+    ).distinct())
+
+
+def sittings(schedules):
+    """`schedules` grouped into runs whose times overlap"""
+    groups, end = [], None
+    for schedule in sorted(schedules, key=lambda schedule: (schedule.start_time, schedule.end_time)):
+        if groups and schedule.start_time < end:
+            groups[-1].append(schedule)
+            end = max(end, schedule.end_time)
+        else:
+            groups.append([schedule])
+            end = schedule.end_time
+    return groups
+
+
+def section_rooms(campus_id):
+    """{room key: (room name, capacity)} of the campus's active sections"""
+    rooms = {}
+    sections = Section.objects.filter(
+        class_name__campus_id=campus_id, is_active=True, room_number__isnull=False
+    ).values_list('room_number', 'capacity')
+    for name, capacity in sections:
+        key = room_key(name)
+        if key:
+            rooms[key] = (name.strip(), max(capacity, rooms.get(key, ('', 0))[1]))
+    return rooms
+
+
+def exam_rooms(schedules, known):
+    """Rooms a sitting may use, in natural order"""
+    named = {}
+    for schedule in schedules:
+        for name in (schedule.room_number or '').split(','):
+            if room_key(name):
+                named.setdefault(room_key(name), name.strip())
+    if named:
+        rooms = [Room(*known.get(key, (name, settings.EXAM_ROOM_CAPACITY))) for key, name in named.items()]
+    else:
+        rooms = [Room(name, capacity) for name, capacity in known.values()]
+    return sorted((room for room in rooms if room.capacity > 0), key=lambda room: natural_key(room.name))
+
+
+NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def allocate(groups, rooms, columns):
+    """
+    Seat the candidates of `groups` ({paper: [candidate, ...]}) in
+    `rooms`. Returns (seats, unseated), a list of Seat and
+    {paper: candidates left over}.
+    """
+    queues = {paper: deque(candidates) for paper, candidates in groups.items() if candidates}
+    heap = [(-len(queue), order, paper) for order, (paper, queue) in enumerate(queues.items())]
+    heapq.heapify(heap)
+    seats = []
+
+    def take(entry, number, row, column, room, grid):
+        paper = entry[2]
+        queue = queues[paper]
+        seats.append(Seat(paper, queue.popleft(), room.name, number, row + 1, column + 1))
+        grid[row, column] = paper
+
+    for room in rooms:
+        if not heap:
+            break
+        first_colour = set()
+        grid = {}
+        gaps = []
+        for colour in (0, 1):
+            free = deque(
+                (number + 1, number // columns, number % columns)
+                for number in range(room.capacity)
+                if (number // columns + number % columns) % 2 == colour
+            )
+            held = []
+            while free and heap:
+                entry = heapq.heappop(heap)
+                paper = entry[2]
+                if colour and paper in first_colour:
+                    held.append(entry)
+                    continue
+                queue = queues[paper]
+                while free and queue:
+                    take(entry, *free.popleft(), room, grid)
+                if not colour:
+                    first_colour.add(paper)
+                if queue:
+                    held.append((-len(queue), entry[1], paper))
+            for entry in held:
+                heapq.heappush(heap, entry)
+            gaps.extend(free)
+
+        # Every paper left is already on the first colour: fill the
+        # remaining seats one by one with the largest paper none of the
+        # seat's neighbours is sitting.
+        for number, row, column in sorted(gaps):
+            if not heap:
+                break
+            taken = {grid.get((row + dr, column + dc)) for dr, dc in NEIGHBOURS}
+            skipped = []
+            while heap and heap[0][2] in taken:
+                skipped.append(heapq.heappop(heap))
+            if heap:
+                entry = heapq.heappop(heap)
+                take(entry, number, row, column, room, grid)
+                if queues[entry[2]]:
+                    skipped.append((-len(queues[entry[2]]), entry[1], entry[2]))
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+    return seats, {paper: len(queue) for paper, queue in queues.items() if queue}
+
+
+def plan_seating(examination, date):
+    """A SeatingPlan of unsaved ExamSeat rows for one day of `examination`"""
+    schedules = ExamSchedule.objects.filter(examination=examination, date=date).select_related(
+        'class_name', 'subject'
+    )
+    known = section_rooms(examination.academic_year.campus_id)
+    columns = settings.EXAM_ROOM_COLUMNS
+    plan = SeatingPlan()
+    for sitting in sittings(schedules):
+        papers = {}
+        for schedule in sorted(sitting, key=lambda schedule: schedule.pk):
+            papers.setdefault(schedule.class_name_id, schedule)
+        groups = {schedule: [] for schedule in papers.values()}
+        students = Student.objects.filter(current_class_id__in=list(papers), status='ACTIVE').order_by(
+            'current_class_id', 'section__name', 'roll_number', 'admission_number'
+        ).values_list('pk', 'current_class_id')
+        for student_id, class_id in students:
+            groups[papers[class_id]].append(student_id)
+
+        seats, unseated = allocate(groups, exam_rooms(sitting, known), columns)
+        plan.sittings += 1
+        plan.rooms += len({seat.room for seat in seats})
+        plan.unseated.update(unseated)
+        plan.seats.extend(
+            ExamSeat(
+                exam_schedule=seat.paper,
+                student_id=seat.candidate,
+                room_number=seat.room,
+                seat_number=seat.number,
+                row_number=seat.row,
+                column_number=seat.column,
+            )
+            for seat in seats
+        )
+    return plan
+
+
+def save_seating(examination, date):
+    """Replace the seats of one day of `examination`; returns the SeatingPlan"""
+    plan = plan_seating(examination, date)
+    with transaction.atomic():
+        ExamSeat.objects.filter(exam_schedule__examination=examination, exam_schedule__date=date).delete()
+        ExamSeat.objects.bulk_create(plan.seats, batch_size=1000)
+    return plan
@@ -0,0 +1,99 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from students.models import Student
+from .grading import invalidate_schemes
+from .models import Attendance, GradeBoundary, GradingScheme, Section, Subject, Timetable
+from .summaries import refresh_student_placement, refresh_summaries
+from .weeks import forget_weeks, invalidate_weeks, slot_owners
+
+
+def attendance_mark(student_id, date):
+    """(student, date, campus, class, section) tuple for refresh_summaries"""
+    placement = Student.objects.filter(pk=student_id).values_list(
+        'campus_id', 'current_class_id', 'section_id'
+    ).first()
+    return (student_id, date, *placement) if placement else None
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_previous_mark(sender, instance, raw=False, **kwargs):
+    # An edit may move the row to another student or day; the summaries
+    # it used to count towards need refreshing too.
+    instance._previous_mark = None
+    if instance.pk and not raw:
+        previous = Attendance.objects.filter(pk=instance.pk).values_list('student_id', 'date').first()
+        if previous and previous != (instance.student_id, instance.date):
+            instance._previous_mark = attendance_mark(*previous)
+
+
+@receiver(post_save, sender=Attendance)
+def refresh_summaries_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    marks = {attendance_mark(instance.student_id, instance.date), getattr(instance, '_previous_mark', None)}
+    transaction.on_commit(partial(refresh_summaries, marks - {None}))
+
+
+@receiver(post_delete, sender=Attendance)
+def refresh_summaries_on_delete(sender, instance, **kwargs):
+    # Resolve the placement now: when the student itself is being deleted
+    # it is gone by the time the transaction commits.
+    mark = attendance_mark(instance.student_id, instance.date)
+    if mark:
+        transaction.on_commit(partial(refresh_summaries, {mark}))
+
+
+@receiver(pre_save, sender=Student)
+def remember_previous_placement(sender, instance, raw=False, **kwargs):
+    # Marks are counted under the student's current placement, so a move
+    # takes their whole history from the old section's summaries to the
+    # new one's.
+    instance._previous_placement = None
+    if instance.pk and not raw:
+        instance._previous_placement = Student.objects.filter(pk=instance.pk).values_list(
+            'campus_id', 'current_class_id', 'section_id'
+        ).first()
+
+
+@receiver(post_save, sender=Student)
+def refresh_summaries_on_move(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_placement', None)
+    current = (instance.campus_id, instance.current_class_id, instance.section_id)
+    if raw or previous is None or previous == current:
+        return
+    transaction.on_commit(partial(refresh_student_placement, instance.pk, {previous, current}))
+
+
+@receiver([post_save, post_delete], sender=GradingScheme)
+@receiver([post_save, post_delete], sender=GradeBoundary)
+def invalidate_grading_schemes(sender, **kwargs):
+    transaction.on_commit(invalidate_schemes)
+
+
+@receiver(pre_save, sender=Timetable)
+def remember_previous_owners(sender, instance, raw=False, **kwargs):
+    # Moving a slot to another section or teacher changes their weeks too.
+    instance._previous_owners = set()
+    if instance.pk and not raw:
+        previous = Timetable.objects.filter(pk=instance.pk).values_list(
+            'section_id', 'teacher_id', 'academic_year_id'
+        ).first()
+        if previous:
+            instance._previous_owners = slot_owners(*previous)
+
+
+@receiver([post_save, post_delete], sender=Timetable)
+def forget_timetable_weeks(sender, instance, **kwargs):
+    owners = slot_owners(instance.section_id, instance.teacher_id, instance.academic_year_id)
+    owners |= getattr(instance, '_previous_owners', set())
+    transaction.on_commit(partial(forget_weeks, owners))
+
+
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Section)
+def invalidate_timetable_weeks(sender, **kwargs):
+    transaction.on_commit(invalidate_weeks)
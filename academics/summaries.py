@@ -0,0 +1,242 @@
+"""
+Materialized attendance rollups.
+
+`Attendance` gains a row per student per school day, so counting it on
+every page does not scale. Two summary tables are kept alongside it:
+
+* SectionAttendanceSummary - one row per (date, campus, class, section)
+* StudentAttendanceSummary - one row per (student, month)
+
+A mark is counted under the student's *current* campus, class and
+section, not where they sat on the day. Moving a student therefore moves
+their whole history: academics/signals.py refreshes every day the
+student has a mark, under both the old and the new placement, so the
+tables always agree with a rebuild.
+
+Writes refresh only the summary rows they touch (see academics/signals.py
+and the class register view); `rebuild_attendance_summaries` recomputes
+them from scratch.
+"""
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from students.models import Student
+from .models import Attendance, SectionAttendanceSummary, StudentAttendanceSummary
+
+STATUS_FIELDS = {
+    Attendance.AttendanceStatus.PRESENT: 'present',
+    Attendance.AttendanceStatus.ABSENT: 'absent',
+    Attendance.AttendanceStatus.LATE: 'late',
+    Attendance.AttendanceStatus.HALF_DAY: 'half_day',
+    Attendance.AttendanceStatus.LEAVE: 'leave',
+}
+COUNT_FIELDS = list(STATUS_FIELDS.values())
+
+# Where a student's marks are counted: their current campus, class and
+# section (see refresh_student_placement for moves).
+PLACEMENT_FIELDS = ('student__campus_id', 'student__current_class_id', 'student__section_id')
+
+
+def status_counts():
+    """Conditional COUNTs of attendance rows, one per summary column"""
+    return {field: Count('pk', filter=Q(status=status)) for status, field in STATUS_FIELDS.items()}
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _section_filter(keys, lookups=('campus_id', 'class_name_id', 'section_id')):
+    """Q matching (campus, class, section) keys, NULL class/section included"""
+    clauses = []
+    for key in keys:
+        clause = Q()
+        for lookup, value in zip(lookups, key):
+            clause &= Q(**{f'{lookup}__isnull': True}) if value is None else Q(**{lookup: value})
+        clauses.append(clause)
+    return reduce(or_, clauses)
+
+
+def refresh_section_days(keys):
+    """Recompute the section summaries for (date, campus, class, section) keys"""
+    by_date = {}
+    for date, *section_key in keys:
+        by_date.setdefault(date, set()).add(tuple(section_key))
+    # Days touching the same sections are recomputed together, so a
+    # student's move costs three queries however long their history.
+    by_sections = {}
+    for date, section_keys in by_date.items():
+        by_sections.setdefault(frozenset(section_keys), []).append(date)
+
+    for section_keys, dates in by_sections.items():
+        rows = Attendance.objects.filter(
+            _section_filter(section_keys, PLACEMENT_FIELDS),
+            date__in=dates
+        ).order_by().values('date', *PLACEMENT_FIELDS).annotate(**status_counts())
+        # Class and section may be NULL, which a unique constraint cannot
+        # match on, so the touched rows are replaced rather than upserted.
+        SectionAttendanceSummary.objects.filter(_section_filter(section_keys), date__in=dates).delete()
+        SectionAttendanceSummary.objects.bulk_create([
+            SectionAttendanceSummary(
+                date=row['date'],
+                campus_id=row['student__campus_id'],
+                class_name_id=row['student__current_class_id'],
+                section_id=row['student__section_id'],
+                **{field: row[field] for field in COUNT_FIELDS}
+            )
+            for row in rows
+        ])
+
+
+def refresh_student_months(keys):
+    """Recompute the monthly summaries for (student_id, month) keys"""
+    by_month = {}
+    for student_id, month in keys:
+        by_month.setdefault(month, set()).add(student_id)
+
+    existing = set(Student.objects.filter(
+        pk__in={student_id for student_id, _month in keys}
+    ).values_list('pk', flat=True))
+
+    summaries = []
+    for month, student_ids in by_month.items():
+        counts = {
+            row['student_id']: row
+            for row in Attendance.objects.filter(
+                student_id__in=student_ids,
+                date__gte=month,
+                date__lt=next_month(month)
+            ).order_by().values('student_id').annotate(**status_counts())
+        }
+        for student_id in student_ids & existing & counts.keys():
+            summaries.append(StudentAttendanceSummary(
+                student_id=student_id,
+                month=month,
+                **{field: counts[student_id][field] for field in COUNT_FIELDS}
+            ))
+        # Months left without any marks lose their row, as after a rebuild.
+        emptied = student_ids - counts.keys()
+        if emptied:
+            StudentAttendanceSummary.objects.filter(month=month, student_id__in=emptied).delete()
+    StudentAttendanceSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['student', 'month'],
+        update_fields=COUNT_FIELDS + ['updated_at'],
+    )
+
+
+def refresh_student_placement(student_id, placements):
+    """
+    Recompute the section summaries of every day `student_id` has a mark
+    under each (campus, class, section) of `placements`, after the
+    student moved between them.
+    """
+    dates = set(Attendance.objects.filter(student_id=student_id).values_list('date', flat=True))
+    if dates:
+        with transaction.atomic():
+            refresh_section_days({(date, *placement) for date in dates for placement in placements})
+
+
+def refresh_summaries(marks):
+    """
+    Bring both summary tables up to date after attendance writes.
+
+    `marks` are (student_id, date, campus_id, class_id, section_id) tuples
+    describing every row that was created, changed or deleted.
+    """
+    marks = set(marks)
+    if not marks:
+        return
+    with transaction.atomic():
+        refresh_section_days({(date, *placement) for _student_id, date, *placement in marks})
+        refresh_student_months({(student_id, month_start(date)) for student_id, date, *_placement in marks})
+
+
+def save_attendance(records):
+    """
+    Upsert attendance rows on (student, date) in one statement and refresh
+    the summaries they touch within the same transaction. bulk_create
+    sends no model signals, so this is the write path for batches.
+    """
+    if not records:
+        return
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=['student', 'date'],
+            update_fields=['status', 'remarks', 'marked_by', 'updated_at'],
+        )
+        refresh_summaries({
+            (record.student_id, record.date, record.student.campus_id,
+             record.student.current_class_id, record.student.section_id)
+            for record in records
+        })
+
+
+def rebuild_summaries(start=None, end=None, batch_size=1000):
+    """Recompute every summary row, optionally only for months in [start, end]"""
+    attendance = Attendance.objects.order_by()
+    sections = SectionAttendanceSummary.objects.all()
+    students = StudentAttendanceSummary.objects.all()
+    if start:
+        start = month_start(start)
+        attendance = attendance.filter(date__gte=start)
+        sections = sections.filter(date__gte=start)
+        students = students.filter(month__gte=start)
+    if end:
+        end = next_month(month_start(end))
+        attendance = attendance.filter(date__lt=end)
+        sections = sections.filter(date__lt=end)
+        students = students.filter(month__lt=end)
+
+    with transaction.atomic():
+        sections.delete()
+        students.delete()
+        section_rows = attendance.values('date', *PLACEMENT_FIELDS).annotate(**status_counts())
+        created_sections = SectionAttendanceSummary.objects.bulk_create((
+            SectionAttendanceSummary(
+                date=row['date'],
+                campus_id=row['student__campus_id'],
+                class_name_id=row['student__current_class_id'],
+                section_id=row['student__section_id'],
+                **{field: row[field] for field in COUNT_FIELDS}
+            )
+            for row in section_rows.iterator(chunk_size=batch_size)
+        ), batch_size=batch_size)
+        student_rows = attendance.annotate(
+            month=TruncMonth('date')
+        ).values('student_id', 'month').annotate(**status_counts())
+        created_students = StudentAttendanceSummary.objects.bulk_create((
+            StudentAttendanceSummary(
+                student_id=row['student_id'],
+                month=row['month'],
+                **{field: row[field] for field in COUNT_FIELDS}
+            )
+            for row in student_rows.iterator(chunk_size=batch_size)
+        ), batch_size=batch_size)
+    return len(created_sections), len(created_students)
+
+
+def student_attendance_stats(student, start=None, end=None):
+    """
+    Attendance counts for one student from the monthly summaries, keyed
+    by status like {'PRESENT': {'count': 12}, ...}.
+    """
+    summaries = StudentAttendanceSummary.objects.filter(student=student)
+    if start:
+        summaries = summaries.filter(month__gte=month_start(start))
+    if end:
+        summaries = summaries.filter(month__lte=end)
+    totals = summaries.aggregate(**{field: Sum(field) for field in COUNT_FIELDS})
+    return {status.value: {'count': totals[field] or 0} for status, field in STATUS_FIELDS.items()}
@@ -0,0 +1,18 @@
+from django.db import transaction
+
+from jobs.queue import enqueue, task
+from .models import Examination
+from .results import publish_results
+
+
+@task('academics.publish_results')
+def publish_examination_results(examination_id, class_ids=None):
+    publish_results(Examination.objects.get(pk=examination_id), class_ids)
+
+
+def queue_publish(examination, class_ids=None):
+    transaction.on_commit(lambda: enqueue(
+        'academics.publish_results',
+        {'examination_id': examination.pk, 'class_ids': class_ids},
+        dedup_key=f"publish-results-{examination.pk}",
+    ))
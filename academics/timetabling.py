@@ -0,0 +1,376 @@
+"""
+Timetable clash detection and generation.
+
+Slots are loaded with one values_list() query into light Slot tuples
+and indexed per resource and day (teacher, room, section) in interval
+trees:
+
+    find_clashes(slots)   every double booking, by a sweep over each
+                          resource's day sorted by start: O(n log n + k)
+    slot_clashes(slot)    the clashes of one slot being saved; used by
+                          Timetable.clean(), one query per edit
+
+generate_timetable() fills the ClassSubject.periods_per_week of every
+section into the TIMETABLE_DAYS x TIMETABLE_PERIODS grid. Lessons are
+placed most-constrained first (busiest teacher, then most periods),
+each into the free cell that best spreads the subject over the week;
+a lesson with no free cell may move one already planned lesson of its
+section to make room. Existing slots that are kept stay fixed and
+block their teacher, room and section. Whatever cannot be placed is
+reported, never forced.
+"""
+import heapq
+from collections import Counter, defaultdict, namedtuple
+from dataclasses import dataclass, field
+from datetime import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import ClassSubject, Section, Timetable
+from .weeks import invalidate_weeks
+
+Slot = namedtuple('Slot', 'pk day start end teacher_id teacher room section_id section label')
+
+
+class Clash(namedtuple('Clash', 'kind key day first second')):
+
+    def describe(self):
+        resource = {
+            'teacher': f"teacher {self.first.teacher}",
+            'room': f"room {self.key}",
+            'section': f"section {self.first.section}",
+        }[self.kind]
+        return (
+            f"{self.day.title()}: {self.first.label} ({clock(self.first.start)}-{clock(self.first.end)}) and "
+            f"{self.second.label} ({clock(self.second.start)}-{clock(self.second.end)}) both need {resource}"
+        )
+
+
+def minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def clock(value):
+    return f"{value // 60:02d}:{value % 60:02d}"
+
+
+def parse_time(value):
+    hours, mins = value.split(':')
+    return time(int(hours), int(mins))
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over half-open [start, end) intervals,
+    built from (start, end, item) triples in O(n log n).
+    overlapping(start, end) returns the overlapping items in O(log n + k).
+    """
+
+    def __init__(self, intervals):
+        intervals = [interval for interval in intervals if interval[0] < interval[1]]
+        self.left = self.right = None
+        self.by_start = self.by_end = []
+        self.center = None
+        if not intervals:
+            return
+        points = sorted(point for start, end, _item in intervals for point in (start, end))
+        # The lower median always has at least one interval at or across it
+        self.center = points[(len(points) - 1) // 2]
+        here, left, right = [], [], []
+        for interval in intervals:
+            if interval[1] <= self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_start = sorted(here, key=lambda interval: interval[0])
+        self.by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+
+    def overlapping(self, start, end):
+        found, nodes = [], [self]
+        while nodes:
+            node = nodes.pop()
+            if node.center is None:
+                continue
+            if end <= node.center:
+                for interval in node.by_start:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval[2])
+                if node.left:
+                    nodes.append(node.left)
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval[1] <= start:
+                        break
+                    found.append(interval[2])
+                if node.right:
+                    nodes.append(node.right)
+            else:
+                found.extend(interval[2] for interval in node.by_start)
+                nodes.extend(child for child in (node.left, node.right) if child)
+        return found
+
+
+def room_key(room_number):
+    return (room_number or '').strip().upper() or None
+
+
+def resource_keys(slot):
+    """(kind, key) of every resource a slot occupies"""
+    keys = [('section', slot.section_id)]
+    if slot.teacher_id:
+        keys.append(('teacher', slot.teacher_id))
+    if room_key(slot.room):
+        keys.append(('room', room_key(slot.room)))
+    return keys
+
+
+def load_slots(queryset):
+    rows = queryset.order_by().values_list(
+        'pk', 'day_of_week', 'start_time', 'end_time', 'teacher_id', 'teacher__first_name',
+        'teacher__last_name', 'room_number', 'section_id', 'class_name__name', 'section__name', 'subject__name'
+    )
+    for pk, day, start, end, teacher_id, first, last, room, section_id, class_name, section, subject in rows:
+        yield Slot(
+            pk, day, minutes(start), minutes(end), teacher_id, f"{first or ''} {last or ''}".strip(),
+            room, section_id, f"{class_name}-{section}", f"{class_name}-{section} {subject}",
+        )
+
+
+class SlotIndex:
+    """Interval trees of slots per (resource kind, key, day)"""
+
+    def __init__(self, slots):
+        groups = defaultdict(list)
+        for slot in slots:
+            for kind, key in resource_keys(slot):
+                groups[(kind, key, slot.day)].append((slot.start, slot.end, slot))
+        self.trees = {group: IntervalTree(intervals) for group, intervals in groups.items()}
+
+    def clashes(self, slot):
+        for kind, key in resource_keys(slot):
+            tree = self.trees.get((kind, key, slot.day))
+            if tree is None:
+                continue
+            for other in tree.overlapping(slot.start, slot.end):
+                if other.pk is None or other.pk != slot.pk:
+                    yield Clash(kind, key, slot.day, other, slot)
+
+
+def find_clashes(slots):
+    """Every pair of slots double-booking a teacher, room or section"""
+    groups = defaultdict(list)
+    for slot in slots:
+        for kind, key in resource_keys(slot):
+            groups[(kind, key, slot.day)].append(slot)
+    clashes = []
+    for (kind, key, day), group in groups.items():
+        group.sort(key=lambda slot: (slot.start, slot.end))
+        running = []
+        for index, slot in enumerate(group):
+            while running and running[0][0] <= slot.start:
+                heapq.heappop(running)
+            clashes.extend(Clash(kind, key, day, group[other], slot) for _end, other in running)
+            heapq.heappush(running, (slot.end, index))
+    return clashes
+
+
+def slot_clashes(timetable):
+    """Clashes of an unsaved or edited Timetable row with the other active slots of its day"""
+    resources = Q(section_id=timetable.section_id)
+    if timetable.teacher_id:
+        resources |= Q(teacher_id=timetable.teacher_id)
+    if room_key(timetable.room_number):
+        resources |= Q(room_number__iexact=room_key(timetable.room_number))
+    others = Timetable.objects.filter(
+        resources,
+        academic_year_id=timetable.academic_year_id,
+        day_of_week=timetable.day_of_week,
+        is_active=True,
+    )
+    if timetable.pk:
+        others = others.exclude(pk=timetable.pk)
+    slot = Slot(
+        timetable.pk, timetable.day_of_week, minutes(timetable.start_time), minutes(timetable.end_time),
+        timetable.teacher_id, '', timetable.room_number, timetable.section_id, '', 'this slot',
+    )
+    return list(SlotIndex(load_slots(others)).clashes(slot))
+
+
+# Generation --------------------------------------------------------------
+
+@dataclass
+class TimetablePlan:
+    slots: list = field(default_factory=list)
+    unplaced: list = field(default_factory=list)
+    sections: list = field(default_factory=list)
+    replaced: int = 0
+
+
+class _Lesson:
+    __slots__ = ('section', 'requirement', 'resources')
+
+    def __init__(self, section, requirement):
+        self.section = section
+        self.requirement = requirement
+        self.resources = [('section', section.pk)]
+        if requirement.teacher_id:
+            self.resources.append(('teacher', requirement.teacher_id))
+        if room_key(section.room_number):
+            self.resources.append(('room', room_key(section.room_number)))
+
+
+class _Grid:
+    """Occupancy of every resource per (day, period) while planning"""
+
+    def __init__(self, days, periods):
+        self.days = days
+        self.periods = periods
+        self.busy = set()
+        self.planned = {}
+        self.subject_days = Counter()
+        self.day_load = Counter()
+
+    def free(self, resources, day, period, ignore=()):
+        return all((kind, key, day, period) not in self.busy or (kind, key) in ignore for kind, key in resources)
+
+    def occupy(self, resources, day, period):
+        self.busy.update((kind, key, day, period) for kind, key in resources)
+
+    def place(self, lesson, day, period):
+        self.occupy(lesson.resources, day, period)
+        self.planned[(lesson.section.pk, day, period)] = lesson
+        self.subject_days[(lesson.section.pk, lesson.requirement.subject_id, day)] += 1
+        self.day_load[(lesson.section.pk, day)] += 1
+
+    def remove(self, lesson, day, period):
+        self.busy.difference_update((kind, key, day, period) for kind, key in lesson.resources)
+        del self.planned[(lesson.section.pk, day, period)]
+        self.subject_days[(lesson.section.pk, lesson.requirement.subject_id, day)] -= 1
+        self.day_load[(lesson.section.pk, day)] -= 1
+
+    def best_cell(self, lesson, exclude=None):
+        best, best_score = None, None
+        for day in self.days:
+            spread = (
+                self.subject_days[(lesson.section.pk, lesson.requirement.subject_id, day)],
+                self.day_load[(lesson.section.pk, day)],
+            )
+            for period in range(len(self.periods)):
+                if (day, period) == exclude or not self.free(lesson.resources, day, period):
+                    continue
+                score = (*spread, period)
+                if best_score is None or score < best_score:
+                    best, best_score = (day, period), score
+        return best
+
+    def make_room(self, lesson):
+        """Move one planned lesson of the same section so `lesson` fits; returns the freed cell"""
+        own = [('section', lesson.section.pk)]
+        for day in self.days:
+            for period in range(len(self.periods)):
+                blocking = self.planned.get((lesson.section.pk, day, period))
+                if blocking is None or not self.free(lesson.resources, day, period, ignore=own):
+                    continue
+                self.remove(blocking, day, period)
+                cell = self.best_cell(blocking, exclude=(day, period))
+                if cell is None:
+                    self.place(blocking, day, period)
+                    continue
+                self.place(blocking, *cell)
+                return day, period
+        return None
+
+
+def plan_timetable(academic_year, class_ids=None, replace=False):
+    """A TimetablePlan of unsaved Timetable rows for `academic_year`"""
+    days = list(settings.TIMETABLE_DAYS)
+    periods = [(parse_time(start), parse_time(end)) for start, end in settings.TIMETABLE_PERIODS]
+    grid = _Grid(days, periods)
+
+    sections = Section.objects.filter(class_name__campus_id=academic_year.campus_id, is_active=True)
+    if class_ids:
+        sections = sections.filter(class_name_id__in=class_ids)
+    sections = list(sections.select_related('class_name').order_by('class_name__numeric_value', 'name'))
+    requirements = defaultdict(list)
+    for requirement in ClassSubject.objects.filter(
+        academic_year=academic_year,
+        class_name_id__in={section.class_name_id for section in sections},
+        periods_per_week__gt=0,
+    ).select_related('subject'):
+        requirements[requirement.class_name_id].append(requirement)
+
+    # Slots that stay block their resources; when not replacing, a
+    # section's own slots also count towards its weekly periods.
+    kept = Timetable.objects.filter(academic_year=academic_year, is_active=True)
+    if replace:
+        kept = kept.exclude(section__in=sections)
+    period_tree = IntervalTree((minutes(start), minutes(end), index) for index, (start, end) in enumerate(periods))
+    already = Counter()
+    for slot in load_slots(kept):
+        for period in period_tree.overlapping(slot.start, slot.end):
+            grid.occupy(resource_keys(slot), slot.day, period)
+    if not replace:
+        already.update(kept.filter(section__in=sections).values_list('section_id', 'subject_id'))
+
+    lessons = []
+    for section in sections:
+        for requirement in requirements[section.class_name_id]:
+            missing = requirement.periods_per_week - already[(section.pk, requirement.subject_id)]
+            lessons.extend(_Lesson(section, requirement) for _ in range(max(missing, 0)))
+    teacher_load = Counter(lesson.requirement.teacher_id for lesson in lessons if lesson.requirement.teacher_id)
+    lessons.sort(key=lambda lesson: (
+        -teacher_load[lesson.requirement.teacher_id],
+        -lesson.requirement.periods_per_week,
+        lesson.section.pk,
+        lesson.requirement.subject_id,
+    ))
+
+    plan = TimetablePlan(sections=sections)
+    unplaced = Counter()
+    for lesson in lessons:
+        cell = grid.best_cell(lesson) or grid.make_room(lesson)
+        if cell is None:
+            unplaced[(lesson.section, lesson.requirement)] += 1
+        else:
+            grid.place(lesson, *cell)
+    plan.unplaced = [(section, requirement, count) for (section, requirement), count in unplaced.items()]
+
+    for (_section_id, day, period), lesson in sorted(grid.planned.items(), key=lambda item: item[0]):
+        start, end = periods[period]
+        plan.slots.append(Timetable(
+            class_name_id=lesson.section.class_name_id,
+            section=lesson.section,
+            subject_id=lesson.requirement.subject_id,
+            teacher_id=lesson.requirement.teacher_id,
+            day_of_week=day,
+            start_time=start,
+            end_time=end,
+            room_number=lesson.section.room_number,
+            academic_year=academic_year,
+        ))
+    if replace:
+        plan.replaced = Timetable.objects.filter(
+            academic_year=academic_year, is_active=True, section__in=sections
+        ).count()
+    return plan
+
+
+def generate_timetable(academic_year, class_ids=None, replace=False, dry_run=False):
+    """Plan and, unless `dry_run`, write the timetable with one bulk_create"""
+    plan = plan_timetable(academic_year, class_ids, replace)
+    if not dry_run:
+        with transaction.atomic():
+            if replace:
+                Timetable.objects.filter(
+                    academic_year=academic_year, is_active=True, section__in=plan.sections
+                ).delete()
+            Timetable.objects.bulk_create(plan.slots, batch_size=1000)
+            transaction.on_commit(invalidate_weeks)
+    return plan
@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from .weeks import SECTION, TEACHER
 
 app_name = 'academics'
 
@@ -25,11 +26,24 @@ urlpatterns = [
     # Attendance
     path('attendance/', views.attendance_list, name='attendance_list'),
     path('attendance/mark/', views.attendance_mark, name='attendance_mark'),
+    path('attendance/register/', views.attendance_register, name='attendance_register'),
     path('attendance/<int:pk>/edit/', views.attendance_edit, name='attendance_edit'),
     
+    # Timetable
+    path('timetable/', views.timetable, name='timetable'),
+    path('timetable/sections/<int:pk>/', views.week_timetable, {'kind': SECTION}, name='section_timetable'),
+    path('timetable/sections/<int:pk>/json/', views.week_timetable_json, {'kind': SECTION}, name='section_timetable_json'),
+    path('timetable/teachers/<int:pk>/', views.week_timetable, {'kind': TEACHER}, name='teacher_timetable'),
+    path('timetable/teachers/<int:pk>/json/', views.week_timetable_json, {'kind': TEACHER}, name='teacher_timetable_json'),
+    
     # Exams
     path('exams/', views.exam_list, name='exam_list'),
     path('exams/add/', views.exam_create, name='exam_create'),
     path('exams/<int:pk>/edit/', views.exam_edit, name='exam_edit'),
     path('exams/<int:pk>/delete/', views.exam_delete, name='exam_delete'),
+    path('exams/<int:pk>/results/', views.exam_results, name='exam_results'),
+    path('exams/<int:pk>/results/publish/', views.exam_publish, name='exam_publish'),
+    path('exams/<int:pk>/report-cards/', views.exam_report_cards, name='exam_report_cards'),
+    path('exams/<int:pk>/seating/', views.exam_seating, name='exam_seating'),
+    path('exams/schedules/<int:pk>/marks/', views.marks_entry, name='marks_entry'),
 ]
@@ -1,9 +1,29 @@
+import io
+from datetime import date
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from .models import Class, Section, Subject, Attendance, Examination
-from .forms import ClassForm, SectionForm, SubjectForm, AttendanceForm, ExaminationForm
+from django.db.models import Avg, Count, Max, Q
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from accounts.dashboard import get_user_campus
+from accounts.models import AcademicYear, User
+from students.models import Student
+from .models import Class, Section, Subject, Attendance, Examination, ExamSchedule, ExamResult, ExamSeat
+from .forms import (
+    ClassForm, SectionForm, SubjectForm, AttendanceForm, AttendanceRegisterForm, ExaminationForm,
+    MarksSheetForm, MarksUploadForm
+)
+from .marks import existing_grades, read_marks_csv, save_marks, sheet_students, write_marks_csv
+from .report_cards import print_report_cards
+from .seat_plans import print_seating
+from .seating import exam_days, save_seating
+from .summaries import save_attendance
+from .tasks import queue_publish
+from .weeks import SECTION, week
 
 
 # ==================== CLASS VIEWS ====================
@@ -238,6 +258,45 @@ def attendance_mark(request):
     })
 
 
+@login_required
+def attendance_register(request):
+    """Mark attendance for a whole section on one date"""
+    try:
+        attendance_date = date.fromisoformat(request.GET.get('date', ''))
+    except ValueError:
+        attendance_date = timezone.localdate()
+    
+    sections = Section.objects.filter(is_active=True).select_related('class_name').order_by(
+        'class_name__numeric_value', 'name'
+    )
+    section = None
+    form = None
+    section_id = request.GET.get('section', '')
+    if section_id.isdigit():
+        section = get_object_or_404(sections, pk=section_id)
+        students = Student.objects.filter(
+            section=section,
+            status='ACTIVE'
+        ).select_related('user').order_by('roll_number', 'user__first_name')
+        existing = {
+            record.student_id: record
+            for record in Attendance.objects.filter(date=attendance_date, student__section=section)
+        }
+        form = AttendanceRegisterForm(request.POST or None, students=students, date=attendance_date, existing=existing)
+        if request.method == 'POST' and form.is_valid():
+            records = form.changed_records(request.user)
+            save_attendance(records)
+            messages.success(request, f'Attendance saved for {section} on {attendance_date:%d %b %Y} ({len(records)} changed).')
+            return redirect(f"{reverse('academics:attendance_register')}?section={section.pk}&date={attendance_date.isoformat()}")
+    
+    return render(request, 'school/attendance/register.html', {
+        'sections': sections,
+        'section': section,
+        'date': attendance_date,
+        'form': form,
+    })
+
+
 @login_required
 def attendance_edit(request, pk):
     """Edit attendance record"""
@@ -319,3 +378,226 @@ def exam_delete(request, pk):
     return render(request, 'school/exams/exam_confirm_delete.html', {
         'exam': exam
     })
+
+
+@login_required
+def exam_results(request, pk):
+    """Published results of an examination, one class at a time"""
+    examination = get_object_or_404(Examination.objects.select_related('academic_year'), pk=pk)
+    classes = Class.objects.filter(exam_schedules__examination=examination).distinct().order_by('numeric_value')
+    class_id = request.GET.get('class', '')
+    selected = get_object_or_404(classes, pk=class_id) if class_id.isdigit() else classes.first()
+    
+    results = ExamResult.objects.filter(examination=examination, class_name=selected).select_related(
+        'student__user', 'section'
+    ).order_by('position', 'student__admission_number')
+    stats = results.aggregate(
+        students=Count('pk'),
+        passed=Count('pk', filter=Q(is_passed=True)),
+        average=Avg('percentage'),
+        highest=Max('percentage'),
+    )
+    page_obj = Paginator(results, 50).get_page(request.GET.get('page'))
+    first = page_obj.object_list[0] if page_obj.object_list else None
+    
+    return render(request, 'school/exams/results.html', {
+        'examination': examination,
+        'classes': classes,
+        'selected_class': selected,
+        'results': page_obj,
+        'subjects': [subject['subject'] for subject in first.subjects] if first else [],
+        'schedules': ExamSchedule.objects.filter(examination=examination, class_name=selected).select_related(
+            'subject'
+        ).order_by('subject__name'),
+        'stats': stats,
+    })
+
+
+@login_required
+def exam_publish(request, pk):
+    """Queue the result computation of a whole examination"""
+    examination = get_object_or_404(Examination, pk=pk)
+    if request.method == 'POST':
+        queue_publish(examination)
+        messages.success(request, f'Results of {examination.name} are being published; refresh in a moment.')
+    return redirect('academics:exam_results', pk=examination.pk)
+
+
+@login_required
+def exam_report_cards(request, pk):
+    """Report cards of one class (or the whole examination) as a PDF"""
+    examination = get_object_or_404(Examination, pk=pk)
+    results = ExamResult.objects.filter(examination=examination)
+    class_id = request.GET.get('class', '')
+    if class_id.isdigit():
+        results = results.filter(class_name_id=class_id)
+    buffer = io.BytesIO()
+    print_report_cards(results, buffer)
+    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="report_cards_{examination.pk}.pdf"'
+    return response
+
+
+@login_required
+def exam_seating(request, pk):
+    """Seat candidates in rooms per exam day and print seat plans and door lists"""
+    examination = get_object_or_404(Examination.objects.select_related('academic_year__campus'), pk=pk)
+    days = exam_days(examination)
+    try:
+        day = parse_date(request.POST.get('date') or request.GET.get('date') or '')
+    except ValueError:
+        day = None
+    if day not in days:
+        day = days[0] if days else None
+    seating_url = reverse('academics:exam_seating', args=[examination.pk]) + (f'?date={day}' if day else '')
+    
+    if request.method == 'POST' and day:
+        plan = save_seating(examination, day)
+        for schedule, count in list(plan.unseated.items())[:20]:
+            messages.warning(request, f'{schedule.class_name.name} {schedule.subject.name}: {count} candidates did not fit.')
+        messages.success(
+            request, f'Seated {len(plan.seats)} of {plan.candidates} candidates in {plan.rooms} rooms on {day:%d %b %Y}.'
+        )
+        return redirect(seating_url)
+    
+    if request.GET.get('download') == 'pdf' and day:
+        buffer = io.BytesIO()
+        print_seating(examination, day, buffer)
+        response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="seating_{examination.pk}_{day}.pdf"'
+        return response
+    
+    seats = ExamSeat.objects.filter(exam_schedule__examination=examination)
+    planned = {
+        row['exam_schedule__date']: row
+        for row in seats.values('exam_schedule__date').annotate(
+            seats=Count('pk'), rooms=Count('room_number', distinct=True)
+        ).order_by()
+    }
+    rooms = seats.filter(exam_schedule__date=day).values('room_number').annotate(
+        seats=Count('pk'), papers=Count('exam_schedule', distinct=True)
+    ).order_by('room_number') if day else []
+    
+    return render(request, 'school/exams/seating.html', {
+        'examination': examination,
+        'days': [(exam_day, planned.get(exam_day)) for exam_day in days],
+        'day': day,
+        'rooms': rooms,
+    })
+
+
+@login_required
+def marks_entry(request, pk):
+    """Enter a whole class sheet of marks for one exam schedule"""
+    schedule = get_object_or_404(
+        ExamSchedule.objects.select_related('examination', 'class_name', 'subject'), pk=pk
+    )
+    sections = Section.objects.filter(class_name_id=schedule.class_name_id, is_active=True).order_by('name')
+    section_id = request.GET.get('section', '')
+    section = get_object_or_404(sections, pk=section_id) if section_id.isdigit() else None
+    students = list(sheet_students(schedule, section))
+    existing = existing_grades(schedule, [student.pk for student in students])
+    sheet_url = reverse('academics:marks_entry', args=[schedule.pk]) + (f'?section={section.pk}' if section else '')
+    
+    if request.GET.get('download') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="marks_{schedule.pk}.csv"'
+        write_marks_csv(response, students, existing)
+        return response
+    
+    form = MarksSheetForm(schedule=schedule, students=students, existing=existing)
+    upload_form = MarksUploadForm()
+    if request.method == 'POST' and 'file' in request.FILES:
+        upload_form = MarksUploadForm(request.POST, request.FILES)
+        if upload_form.is_valid():
+            entries, errors = read_marks_csv(upload_form.cleaned_data['file'], schedule, students)
+            if errors:
+                for error in errors[:20]:
+                    messages.error(request, error)
+            else:
+                count = save_marks(schedule, entries, request.user)
+                messages.success(request, f'Marks saved for {count} students from the uploaded sheet.')
+                return redirect(sheet_url)
+    elif request.method == 'POST':
+        form = MarksSheetForm(request.POST, schedule=schedule, students=students, existing=existing)
+        if form.is_valid():
+            count = save_marks(schedule, form.changed_entries(), request.user)
+            messages.success(request, f'Marks saved for {schedule.subject.name} ({count} changed).')
+            return redirect(sheet_url)
+    
+    return render(request, 'school/exams/marks_entry.html', {
+        'schedule': schedule,
+        'sections': sections,
+        'section': section,
+        'form': form,
+        'upload_form': upload_form,
+        'entered': len(existing),
+    })
+
+
+# ==================== TIMETABLE VIEWS ====================
+
+@login_required
+def timetable(request):
+    """Own week for teachers and students, otherwise a section / teacher picker"""
+    user = request.user
+    if user.role == User.UserRole.TEACHER:
+        return redirect('academics:teacher_timetable', pk=user.pk)
+    section_id = Student.objects.filter(user=user).values_list('section_id', flat=True).first()
+    if section_id:
+        return redirect('academics:section_timetable', pk=section_id)
+    
+    campus = get_user_campus(user)
+    sections = Section.objects.filter(is_active=True).select_related('class_name').order_by(
+        'class_name__numeric_value', 'name'
+    )
+    teachers = User.objects.filter(role=User.UserRole.TEACHER, is_active=True).order_by('first_name', 'last_name')
+    if campus:
+        sections = sections.filter(class_name__campus_id=campus)
+        teachers = teachers.filter(staff_profile__campus_id=campus)
+    
+    return render(request, 'school/academics/timetable_index.html', {
+        'sections': sections,
+        'teachers': teachers,
+    })
+
+
+def timetable_week(request, kind, pk):
+    """Owner, academic year and cached week of a section or teacher timetable"""
+    if kind == SECTION:
+        owner = get_object_or_404(Section.objects.select_related('class_name'), pk=pk)
+        name, campus = f"{owner.class_name.name}-{owner.name}", owner.class_name.campus_id
+    else:
+        owner = get_object_or_404(User.objects.select_related('staff_profile'), pk=pk)
+        name, campus = owner.get_full_name() or owner.username, get_user_campus(owner)
+    
+    years = AcademicYear.objects.filter(campus_id=campus) if campus else AcademicYear.objects.all()
+    year_id = request.GET.get('academic_year', '')
+    academic_year = years.filter(pk=year_id).first() if year_id.isdigit() else years.filter(is_current=True).first()
+    return {
+        'kind': kind,
+        'owner': owner,
+        'name': name,
+        'academic_year': academic_year,
+        'week': week(kind, pk, academic_year.pk) if academic_year else None,
+    }
+
+
+@login_required
+def week_timetable(request, kind, pk):
+    """Weekly timetable of a section or a teacher"""
+    return render(request, 'school/academics/timetable.html', timetable_week(request, kind, pk))
+
+
+@login_required
+def week_timetable_json(request, kind, pk):
+    """Weekly timetable of a section or a teacher as JSON"""
+    context = timetable_week(request, kind, pk)
+    academic_year = context['academic_year']
+    return JsonResponse({
+        'kind': kind,
+        'id': pk,
+        'name': context['name'],
+        'academic_year': {'id': academic_year.pk, 'name': academic_year.name} if academic_year else None,
+        **(context['week'] or {'days': [], 'periods': [], 'slots': 0}),
+    })
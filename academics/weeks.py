@@ -0,0 +1,101 @@
+"""
+Weekly timetables of a section or a teacher.
+
+load_week() reads the whole week with one query (subject, teacher and
+section joined in) and groups it by period and day in Python. week()
+keeps the result in the shared cache under (kind, owner, academic
+year), so a warm page costs two cache reads and no query.
+
+academics/signals.py deletes the weeks a saved or deleted slot belongs
+to. Bulk writes (generate_timetable) and subject or section edits
+bump WEEK_VERSION_KEY instead, which retires every cached week at once.
+Teacher names are not watched, since users are saved on every login;
+WEEK_TIMEOUT bounds how long a renamed teacher shows the old name.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Timetable
+
+SECTION = 'section'
+TEACHER = 'teacher'
+KINDS = {SECTION: 'section_id', TEACHER: 'teacher_id'}
+
+WEEK_KEY = 'academics:week:{version}:{kind}:{pk}:{year}'
+WEEK_VERSION_KEY = 'academics:week:version'
+WEEK_TIMEOUT = 60 * 60 * 24
+
+
+def week_version():
+    version = cache.get(WEEK_VERSION_KEY)
+    if version is None:
+        cache.add(WEEK_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(WEEK_VERSION_KEY)
+    return version
+
+
+def invalidate_weeks():
+    cache.set(WEEK_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def forget_weeks(owners):
+    """Drop the cached weeks of (kind, pk, academic_year_id) triples"""
+    version = week_version()
+    cache.delete_many([
+        WEEK_KEY.format(version=version, kind=kind, pk=pk, year=year)
+        for kind, pk, year in owners if pk
+    ])
+
+
+def slot_owners(section_id, teacher_id, academic_year_id):
+    return {(SECTION, section_id, academic_year_id), (TEACHER, teacher_id, academic_year_id)}
+
+
+def load_week(kind, pk, academic_year_id):
+    """
+    The week as a JSON-ready dict: `days` in week order and one row per
+    distinct period, whose `cells` hold the slots of each day in order.
+    """
+    slots = Timetable.objects.filter(
+        academic_year_id=academic_year_id,
+        is_active=True,
+        **{KINDS[kind]: pk}
+    ).select_related('subject', 'teacher', 'section__class_name').order_by('start_time', 'end_time')
+
+    rows, used_days = {}, set()
+    for slot in slots:
+        period = (slot.start_time.strftime('%H:%M'), slot.end_time.strftime('%H:%M'))
+        rows.setdefault(period, {}).setdefault(slot.day_of_week, []).append({
+            'id': slot.pk,
+            'subject': slot.subject.name,
+            'subject_code': slot.subject.code,
+            'teacher_id': slot.teacher_id,
+            'teacher': slot.teacher.get_full_name() if slot.teacher else None,
+            'section_id': slot.section_id,
+            'section': f"{slot.section.class_name.name}-{slot.section.name}",
+            'room': slot.room_number or None,
+        })
+        used_days.add(slot.day_of_week)
+
+    shown = set(settings.TIMETABLE_DAYS) | used_days
+    days = [day for day in Timetable.DayOfWeek.values if day in shown]
+    return {
+        'days': days,
+        'periods': [
+            {'start': start, 'end': end, 'cells': [cells.get(day, []) for day in days]}
+            for (start, end), cells in rows.items()
+        ],
+        'slots': sum(len(entries) for cells in rows.values() for entries in cells.values()),
+    }
+
+
+def week(kind, pk, academic_year_id):
+    """Cached load_week()"""
+    key = WEEK_KEY.format(version=week_version(), kind=kind, pk=pk, year=academic_year_id)
+    data = cache.get(key)
+    if data is None:
+        data = load_week(kind, pk, academic_year_id)
+        cache.set(key, data, WEEK_TIMEOUT)
+    return data
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q, Sum, Value
+from django.utils import timezone
+
+from students.models import Student
+from academics.models import Class, Examination, SectionAttendanceSummary
+from staff.models import Staff, Leave
+from finance.models import FeeInvoice
+
+DASHBOARD_STATS_KEY = "dashboard:stats:{campus}"
+
+
+def get_user_campus(user):
+    """Campus a dashboard user belongs to, or None to see every campus"""
+    if user.is_admin:
+        return None
+    for profile in ('staff_profile', 'student_profile'):
+        try:
+            return getattr(user, profile).campus_id
+        except AttributeError:
+            continue
+    return None
+
+
+def _scalar(queryset, expression):
+    """`queryset` reduced to a one-row, one-column aggregate (no GROUP BY)"""
+    return queryset.order_by().annotate(_all=Value(1)).values('_all').annotate(value=expression).values('value')
+
+
+def _select_one(**querysets):
+    """
+    Evaluate several scalar querysets as subqueries of a single
+    SELECT, so the whole dashboard costs one database round trip.
+    """
+    columns, params = [], []
+    for name, queryset in querysets.items():
+        sql, query_params = queryset.query.sql_with_params()
+        columns.append(f"({sql}) AS {connection.ops.quote_name(name)}")
+        params.extend(query_params)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columns)}", params)
+        return dict(zip(querysets, cursor.fetchone()))
+
+
+def compute_dashboard_stats(campus_id=None):
+    """Dashboard counters for one campus (or all campuses when None)"""
+    today = timezone.now().date()
+
+    students = Student.objects.all()
+    staff = Staff.objects.all()
+    classes = Class.objects.all()
+    invoices = FeeInvoice.objects.all()
+    attendance = SectionAttendanceSummary.objects.all()
+    leaves = Leave.objects.all()
+    exams = Examination.objects.all()
+    if campus_id is not None:
+        students = students.filter(campus_id=campus_id)
+        staff = staff.filter(campus_id=campus_id)
+        classes = classes.filter(campus_id=campus_id)
+        invoices = invoices.filter(student__campus_id=campus_id)
+        attendance = attendance.filter(campus_id=campus_id)
+        leaves = leaves.filter(staff__campus_id=campus_id)
+        exams = exams.filter(academic_year__campus_id=campus_id)
+
+    attendance = attendance.filter(date=today)
+    row = _select_one(
+        total_students=_scalar(students, Count('pk', filter=Q(status='ACTIVE'))),
+        total_teachers=_scalar(staff, Count('pk', filter=Q(user__role='TEACHER', is_active=True))),
+        total_classes=_scalar(classes, Count('pk', filter=Q(is_active=True))),
+        pending_fees=_scalar(
+            invoices.filter(status__in=['PENDING', 'PARTIAL', 'OVERDUE']),
+            Sum('total_amount')
+        ),
+        present_today=_scalar(attendance, Sum('present')),
+        absent_today=_scalar(attendance, Sum('absent')),
+        staff_on_leave=_scalar(
+            leaves.filter(start_date__lte=today, end_date__gte=today),
+            Count('pk', filter=Q(status='APPROVED'))
+        ),
+        upcoming_exams=_scalar(
+            exams.filter(start_date__gte=today),
+            Count('pk', filter=Q(start_date__lte=today + timedelta(days=30)))
+        ),
+    )
+    row['pending_fees'] = Decimal(str(row['pending_fees'] or 0))
+    row['present_today'] = row['present_today'] or 0
+    row['absent_today'] = row['absent_today'] or 0
+    return row
+
+
+def get_dashboard_stats(campus_id=None):
+    """Cached dashboard counters; they may lag writes by DASHBOARD_STATS_TIMEOUT"""
+    key = DASHBOARD_STATS_KEY.format(campus=campus_id if campus_id is not None else 'all')
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(campus_id)
+        cache.set(key, stats, settings.DASHBOARD_STATS_TIMEOUT)
+    return stats
@@ -59,3 +59,34 @@ class HolidayForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if 'campus' in self.fields:
             self.fields['campus'].widget.attrs['class'] = 'form-select'
+
+
+class FinanceRangeForm(forms.Form):
+    """Date range for the finance overview and its chart data"""
+    start = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    end = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    granularity = forms.ChoiceField(
+        choices=[('day', 'Daily'), ('month', 'Monthly')],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
+    MAX_DAYS = 366 * 5
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end:
+            if start > end:
+                raise forms.ValidationError("Start date must be before end date")
+            if (end - start).days > self.MAX_DAYS:
+                raise forms.ValidationError("Choose a range of at most five years")
+        return cleaned_data
+    
+    def date_range(self, today):
+        """(start, end, granularity), defaulting to the month to date"""
+        data = self.cleaned_data if self.is_valid() else {}
+        end = data.get('end') or today
+        start = data.get('start') or end.replace(day=1)
+        granularity = data.get('granularity') or ('month' if (end - start).days > 92 else 'day')
+        return start, end, granularity
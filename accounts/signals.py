@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from students.models import Student
+from .models import User
+from .statistics import bump_stats_version
+
+
+@receiver(post_save, sender=Student, dispatch_uid="accounts_student_stats_save")
+@receiver(post_delete, sender=Student, dispatch_uid="accounts_student_stats_delete")
+def invalidate_student_stats(sender, **kwargs):
+    transaction.on_commit(bump_stats_version)
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts_student_user_stats_save")
+def invalidate_student_user_stats(sender, instance, update_fields=None, **kwargs):
+    # Gender lives on the user row.
+    if instance.role == User.UserRole.STUDENT and not (update_fields and set(update_fields) <= {'last_login'}):
+        transaction.on_commit(bump_stats_version)
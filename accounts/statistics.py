@@ -0,0 +1,60 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+STATS_VERSION_KEY = "students:stats:version"
+STATS_KEY = "students:stats:{version}:{signature}"
+
+
+def get_stats_version():
+    version = cache.get(STATS_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.set(STATS_VERSION_KEY, version, None)
+    return version
+
+
+def bump_stats_version():
+    cache.set(STATS_VERSION_KEY, time.time_ns(), None)
+
+
+def compute_student_stats(queryset):
+    """
+    Total, gender split and class distribution of `queryset` from one
+    GROUP BY query with conditional counts per class.
+    """
+    rows = queryset.order_by('current_class__numeric_value').values(
+        'current_class__name', 'current_class__numeric_value'
+    ).annotate(
+        total=Count('pk'),
+        male=Count('pk', filter=Q(user__gender='M')),
+        female=Count('pk', filter=Q(user__gender='F')),
+    )
+    stats = {'total': 0, 'male': 0, 'female': 0, 'class_labels': [], 'class_data': []}
+    for row in rows:
+        stats['total'] += row['total']
+        stats['male'] += row['male']
+        stats['female'] += row['female']
+        if row['current_class__name']:
+            stats['class_labels'].append(row['current_class__name'])
+            stats['class_data'].append(row['total'])
+    return stats
+
+
+def get_student_stats(queryset, **filters):
+    """
+    Cached compute_student_stats(). `filters` are the request parameters
+    that produced `queryset` and form its cache signature; any student
+    change bumps the version and so retires every cached signature.
+    """
+    signature = hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()
+    key = STATS_KEY.format(version=get_stats_version(), signature=signature)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_student_stats(queryset)
+        cache.set(key, stats, settings.STUDENT_STATS_TIMEOUT)
+    return stats
@@ -6,6 +6,7 @@ app_name = 'school'
 urlpatterns = [
     # Dashboard
     path('', views.dashboard, name='dashboard'),
+    path('dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
     
     # Students
     path('students/', views.students_list, name='students'),
@@ -27,6 +28,7 @@ urlpatterns = [
     
     # Finance
     path('finance/', views.finance_view, name='finance'),
+    path('finance/analytics/', views.finance_analytics, name='finance_analytics'),
     
     # Library
     path('library/', views.library_view, name='library'),
@@ -1,57 +1,30 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Sum, Q
 from django.utils import timezone
-from django.core.paginator import Paginator
-from datetime import datetime, timedelta
+from django.http import JsonResponse
+from datetime import datetime
 
 from students.models import Student
 from academics.models import Class, Attendance, Examination
-from staff.models import Staff, Leave
+from staff.models import Staff
 from communication.models import Announcement
+from finance.analytics import finance_summary
 from finance.models import FeeInvoice
+from academics.summaries import student_attendance_stats
+from search.index import Kind, search_queryset
+from utils.pagination import CountedPaginator
+from .dashboard import get_dashboard_stats, get_user_campus
+from .forms import FinanceRangeForm
+from .statistics import get_student_stats
 
 
 @login_required
 def dashboard(request):
     """Main dashboard view"""
-    context = {
-        'total_students': Student.objects.filter(status='ACTIVE').count(),
-        'total_teachers': Staff.objects.filter(
-            user__role='TEACHER',
-            is_active=True
-        ).count(),
-        'total_classes': Class.objects.filter(is_active=True).count(),
-        'pending_fees': FeeInvoice.objects.filter(
-            status__in=['PENDING', 'PARTIAL', 'OVERDUE']
-        ).aggregate(
-            total=Sum('total_amount')
-        )['total'] or 0,
-        
-        # Today's attendance
-        'present_today': Attendance.objects.filter(
-            date=timezone.now().date(),
-            status='PRESENT'
-        ).count(),
-        'absent_today': Attendance.objects.filter(
-            date=timezone.now().date(),
-            status='ABSENT'
-        ).count(),
-        
-        # Staff on leave
-        'staff_on_leave': Leave.objects.filter(
-            start_date__lte=timezone.now().date(),
-            end_date__gte=timezone.now().date(),
-            status='APPROVED'
-        ).count(),
-        
-        # Upcoming exams
-        'upcoming_exams': Examination.objects.filter(
-            start_date__gte=timezone.now().date(),
-            start_date__lte=timezone.now().date() + timedelta(days=30)
-        ).count(),
-        
+    today = timezone.now().date()
+    context = get_dashboard_stats(get_user_campus(request.user)).copy()
+    context.update({
         # Recent data
         'recent_students': Student.objects.filter(
             status='ACTIVE'
@@ -59,16 +32,22 @@ def dashboard(request):
         
         'recent_announcements': Announcement.objects.filter(
             is_active=True,
-            start_date__lte=timezone.now().date(),
-            end_date__gte=timezone.now().date()
+            start_date__lte=today,
+            end_date__gte=today
         ).order_by('-created_at')[:5],
         
         'upcoming_events': [],  # Add events model later
-    }
+    })
     
     return render(request, 'school/dashboard.html', context)
 
 
+@login_required
+def dashboard_stats(request):
+    """Dashboard counters as JSON for partial refresh"""
+    return JsonResponse(get_dashboard_stats(get_user_campus(request.user)))
+
+
 @login_required
 def students_list(request):
     """List all students"""
@@ -76,20 +55,6 @@ def students_list(request):
         status='ACTIVE'
     ).select_related('user', 'current_class', 'section', 'campus')
     
-    # Statistics
-    total_students = students.count()
-    male_count = students.filter(user__gender='M').count()
-    female_count = students.filter(user__gender='F').count()
-    
-    # Class distribution for charts
-    class_distribution = Student.objects.filter(status='ACTIVE') \
-        .values('current_class__name') \
-        .annotate(count=Count('id')) \
-        .order_by('current_class__numeric_value')
-    
-    class_labels = [item['current_class__name'] for item in class_distribution if item['current_class__name']]
-    class_data = [item['count'] for item in class_distribution if item['current_class__name']]
-    
     # Filter by class if provided
     class_filter = request.GET.get('class')
     if class_filter:
@@ -98,25 +63,24 @@ def students_list(request):
     # Search
     search = request.GET.get('search')
     if search:
-        students = students.filter(
-            Q(admission_number__icontains=search) |
-            Q(user__first_name__icontains=search) |
-            Q(user__last_name__icontains=search)
-        )
+        students = search_queryset(students, search, Kind.STUDENT)
+    
+    # Statistics (one query, cached per filter) double as the paginator's count
+    stats = get_student_stats(students, class_filter=class_filter, search=search)
     
     # Pagination
-    paginator = Paginator(students, 10)  # Show 10 students per page
+    paginator = CountedPaginator(students, 10, count=stats['total'])  # Show 10 students per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
     context = {
         'students': page_obj,
         'classes': Class.objects.filter(is_active=True),
-        'total_students': total_students,
-        'male_count': male_count,
-        'female_count': female_count,
-        'class_labels': class_labels,
-        'class_data': class_data,
+        'total_students': stats['total'],
+        'male_count': stats['male'],
+        'female_count': stats['female'],
+        'class_labels': stats['class_labels'],
+        'class_data': stats['class_data'],
     }
     
     return render(request, 'school/students/list.html', context)
@@ -176,9 +140,7 @@ def student_detail(request, pk):
         'student': student,
         'documents': student.documents.all(),
         'health_records': student.health_records.all()[:5],
-        'attendance_stats': Attendance.objects.filter(
-            student=student
-        ).values('status').annotate(count=Count('id')),
+        'attendance_stats': student_attendance_stats(student),
     }
     
     return render(request, 'school/students/detail.html', context)
@@ -241,13 +203,11 @@ def exams_view(request):
 @login_required
 def finance_view(request):
     """Finance overview"""
+    form = FinanceRangeForm(request.GET)
+    start, end, granularity = form.date_range(timezone.localdate())
     context = {
-        'total_revenue': FeeInvoice.objects.filter(
-            status='PAID'
-        ).aggregate(total=Sum('total_amount'))['total'] or 0,
-        'pending_amount': FeeInvoice.objects.filter(
-            status__in=['PENDING', 'PARTIAL', 'OVERDUE']
-        ).aggregate(total=Sum('total_amount'))['total'] or 0,
+        'form': form,
+        'summary': finance_summary(start, end, granularity),
         'recent_invoices': FeeInvoice.objects.select_related(
             'student__user'
         ).order_by('-invoice_date')[:10],
@@ -256,6 +216,15 @@ def finance_view(request):
     return render(request, 'school/finance/index.html', context)
 
 
+@login_required
+def finance_analytics(request):
+    """Finance totals and time series as JSON for the overview charts"""
+    form = FinanceRangeForm(request.GET)
+    if request.GET and not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    return JsonResponse(finance_summary(*form.date_range(timezone.localdate())))
+
+
 @login_required
 def library_view(request):
     """Library view"""
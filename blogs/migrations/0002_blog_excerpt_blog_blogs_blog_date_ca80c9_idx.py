@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+from utils.utils import plain_text_excerpt
+
+
+def fill_excerpts(apps, schema_editor):
+    Blog = apps.get_model('blogs', 'Blog')
+    rows = list(Blog.objects.only('id', 'description'))
+    for row in rows:
+        row.excerpt = plain_text_excerpt(row.description)
+    Blog.objects.bulk_update(rows, ['excerpt'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['date', 'id'], name='blogs_blog_date_ca80c9_idx'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
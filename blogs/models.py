@@ -1,9 +1,18 @@
 from django.db import models
 from ckeditor_uploader.fields import RichTextUploadingField
+from utils.utils import EXCERPT_LENGTH, plain_text_excerpt
 
 # Create your models here.
 class Blog(models.Model):
     image=models.ImageField(upload_to="blogs/")
     title=models.CharField(max_length=255)
     date=models.DateTimeField()
-    description=RichTextUploadingField()
\ No newline at end of file
+    description=RichTextUploadingField()
+    excerpt=models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["date", "id"])]
+
+    def save(self, *args, **kwargs):
+        self.excerpt = plain_text_excerpt(self.description)
+        super().save(*args, **kwargs)
\ No newline at end of file
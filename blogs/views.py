@@ -1,10 +1,17 @@
 from django.shortcuts import render
 from blogs.models import Blog
+from utils.pagination import KeysetPaginator
+
+BLOGS_PER_PAGE = 9
 
 # Create your views here.
 def blog_list(request):
-    blogs=Blog.objects.all()
-    return render (request, "blogs.html", {"blogs":blogs})
+    # The list only shows the excerpt, so leave the rich-text body in the database
+    blogs=Blog.objects.defer("description")
+    page=KeysetPaginator(blogs, ("-date", "-id"), BLOGS_PER_PAGE).get_page(
+        after=request.GET.get("after"), before=request.GET.get("before")
+    )
+    return render (request, "blogs.html", {"blogs":page})
 
 def blog_detail(request, id):
     blog=Blog.objects.get(id=id)
@@ -0,0 +1,26 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from communication.models import SMSLog, EmailLog
+from jobs.queue import enqueue
+
+
+@receiver(post_save, sender=EmailLog)
+def queue_email(sender, instance, created, **kwargs):
+    if created and instance.status == EmailLog.EmailStatus.PENDING:
+        transaction.on_commit(partial(
+            enqueue, 'communication.send_email', {'email_log_id': instance.pk},
+            dedup_key=f'email-log:{instance.pk}'
+        ))
+
+
+@receiver(post_save, sender=SMSLog)
+def queue_sms(sender, instance, created, **kwargs):
+    if created and instance.status == SMSLog.SMSStatus.PENDING:
+        transaction.on_commit(partial(
+            enqueue, 'communication.send_sms', {'sms_log_id': instance.pk},
+            dedup_key=f'sms-log:{instance.pk}'
+        ))
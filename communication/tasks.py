@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.mail import send_mail
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from communication.models import SMSLog, EmailLog
+from jobs.queue import PermanentFailure, task
+
+
+@task('communication.send_email')
+def send_email(email_log_id):
+    """Deliver a queued EmailLog row"""
+    log = EmailLog.objects.filter(
+        pk=email_log_id,
+        status__in=[EmailLog.EmailStatus.PENDING, EmailLog.EmailStatus.FAILED]
+    ).first()
+    if log is None:
+        return
+    try:
+        send_mail(log.subject, log.message, settings.DEFAULT_FROM_EMAIL, [log.email])
+    except Exception as exc:
+        log.status = EmailLog.EmailStatus.FAILED
+        log.error_message = str(exc)
+        log.save(update_fields=['status', 'error_message'])
+        raise
+    log.status = EmailLog.EmailStatus.SENT
+    log.sent_at = timezone.now()
+    log.error_message = None
+    log.save(update_fields=['status', 'sent_at', 'error_message'])
+
+
+@task('communication.send_sms')
+def send_sms(sms_log_id):
+    """Deliver a queued SMSLog row through the configured SMS_BACKEND"""
+    log = SMSLog.objects.filter(
+        pk=sms_log_id,
+        status__in=[SMSLog.SMSStatus.PENDING, SMSLog.SMSStatus.FAILED]
+    ).first()
+    if log is None:
+        return
+    if not settings.SMS_BACKEND:
+        log.status = SMSLog.SMSStatus.FAILED
+        log.error_message = 'No SMS gateway configured (settings.SMS_BACKEND)'
+        log.save(update_fields=['status', 'error_message'])
+        raise PermanentFailure(log.error_message)
+    try:
+        import_string(settings.SMS_BACKEND)(log.phone_number, log.message)
+    except Exception as exc:
+        log.status = SMSLog.SMSStatus.FAILED
+        log.error_message = str(exc)
+        log.save(update_fields=['status', 'error_message'])
+        raise
+    log.status = SMSLog.SMSStatus.SENT
+    log.sent_at = timezone.now()
+    log.error_message = None
+    log.save(update_fields=['status', 'sent_at', 'error_message'])
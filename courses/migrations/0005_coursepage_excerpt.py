@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+from utils.utils import plain_text_excerpt
+
+
+def fill_excerpts(apps, schema_editor):
+    CoursePage = apps.get_model('courses', 'CoursePage')
+    rows = list(CoursePage.objects.only('id', 'course_detail'))
+    for row in rows:
+        row.excerpt = plain_text_excerpt(row.course_detail)
+    CoursePage.objects.bulk_update(rows, ['excerpt'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_rename_content_coursepage_course_detail_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursepage',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from ckeditor_uploader.fields import RichTextUploadingField
+from utils.utils import EXCERPT_LENGTH, plain_text_excerpt
 
 
 class CompulsorySubjects(models.Model):
@@ -18,6 +19,11 @@ class CoursePage(models.Model):
     course_name = models.CharField(max_length=255, unique=True)
     title = models.CharField(max_length=255)
     course_detail = RichTextUploadingField()
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
     duration = models.CharField(max_length=255)
     elective_subjects = models.ManyToManyField(ElactiveSubjects, related_name="course_elective_subjects", null=True, blank=True)
     compulsory_subjects = models.ManyToManyField(CompulsorySubjects, related_name="course_compulsory_subjects", null=True, blank=True)
+
+    def save(self, *args, **kwargs):
+        self.excerpt = plain_text_excerpt(self.course_detail)
+        super().save(*args, **kwargs)
@@ -1,7 +1,7 @@
 from django.shortcuts import render
 from courses.models import CoursePage
 from django.views.generic import ListView, DetailView
-from utils import utils
+from utils.pagination import KeysetPaginator
 
 def courses_page(request):
     courses = CoursePage.objects.all()
@@ -13,13 +13,18 @@ class CourseListView(ListView):
     model = CoursePage
     template_name = 'courses.html'
     context_object_name = 'courses'
+    per_page = 20
+
+    def get_queryset(self):
+        # courses.html shows each course's full detail and subjects in place,
+        # so the body stays loaded and the subject lists are prefetched.
+        return CoursePage.objects.prefetch_related('compulsory_subjects', 'elective_subjects')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context={
-            'courses': self.get_queryset(),
-            **utils.get_context()
-        }
+        context['courses'] = KeysetPaginator(self.object_list, ('id',), self.per_page).get_page(
+            after=self.request.GET.get('after'), before=self.request.GET.get('before')
+        )
         return context
 
 
@@ -27,8 +32,3 @@ class CourseDetailView(DetailView):
     model = CoursePage
     template_name = 'course.html'
     context_object_name = 'course'
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update(utils.get_context())
-        return context
@@ -1,3 +1,6 @@
+from headers.cache import get_site_context
+
+
 def breadcrumbs(request):
     path = request.path.strip("/").split("/")  # Get URL parts
     breadcrumbs = [{"name": "Home", "url": "/"}]  # Always start with Home
@@ -9,3 +12,8 @@ def breadcrumbs(request):
         breadcrumbs.append({"name": name, "url": url_accumulator})
 
     return {"breadcrumbs": breadcrumbs}
+
+
+def site_context(request):
+    """Header/footer data for public pages, served from the versioned cache"""
+    return get_site_context()
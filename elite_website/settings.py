@@ -62,6 +62,9 @@ INSTALLED_APPS = [
     "hostel",
     "communication",
     "reports",
+    "images",
+    "jobs",
+    "search",
 ]
 
 # Custom User Model
@@ -91,6 +94,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'elite_website.context_processors.breadcrumbs',
+                'elite_website.context_processors.site_context',
             ],
         },
     },
@@ -110,6 +114,17 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -151,6 +166,55 @@ MEAID_FILES = os.path.join(BASE_DIR, "media")
 MEDIA_URL = '/api/v1/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Responsive image derivatives (see images/derivatives.py)
+IMAGE_DERIVATIVE_WIDTHS = [320, 640, 1280]
+IMAGE_DERIVATIVE_WORKERS = 2
+
+# Background jobs (python manage.py run_workers)
+JOB_WORKER_PROCESSES = 2
+JOB_POLL_INTERVAL = 2
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF = 30
+JOB_STALE_AFTER = 60 * 30
+
+# Files written by background jobs (reports, fee prints) hold personal
+# data: they are kept outside MEDIA_ROOT and only served to their owner
+# through jobs.views.export_download (see jobs/exports.py)
+EXPORTS_ROOT = BASE_DIR / "private" / "exports"
+
+# Letter grades as (minimum percentage, grade) (see academics/grading.py)
+GRADE_BOUNDARIES = [(90, 'A+'), (80, 'A'), (70, 'B'), (60, 'C'), (50, 'D'), (0, 'F')]
+
+# Weekly period grid used by generate_timetable (see academics/timetabling.py)
+TIMETABLE_DAYS = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY']
+TIMETABLE_PERIODS = [
+    ('08:00', '08:40'), ('08:40', '09:20'), ('09:20', '10:00'), ('10:00', '10:40'),
+    ('11:00', '11:40'), ('11:40', '12:20'), ('12:20', '13:00'), ('13:00', '13:40'),
+]
+
+# Exam seating (see academics/seating.py): desks per row, and the seats
+# of rooms named on an exam schedule that no section uses
+EXAM_ROOM_COLUMNS = 6
+EXAM_ROOM_CAPACITY = 40
+
+# Fee challan / receipt printing (see finance/printing.py)
+CHALLAN_PRINT_WORKERS = 4
+CHALLAN_FONT = None  # path to a TTF used instead of Helvetica
+CHALLAN_PRINT_INLINE_LIMIT = 200  # larger admin selections are printed in the background
+
+# Dotted path to a callable(phone_number, message) that sends one SMS
+SMS_BACKEND = None
+
+# Seconds the staff dashboard counters are cached per campus
+DASHBOARD_STATS_TIMEOUT = 60
+
+# Seconds the students list statistics are cached per filter
+STUDENT_STATS_TIMEOUT = 60 * 5
+
+# Student/staff search hits listed by relevance; further hits follow in
+# the list's usual order (python manage.py rebuild_search_index)
+SEARCH_RANKED_RESULTS = 200
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -40,6 +40,7 @@ urlpatterns = [
     path('school/academics/', include('academics.urls')),
     path('school/staff/', include('staff.urls')),
     path('school/reports/', include('reports.urls')),
+    path('school/exports/', include('jobs.urls')),
     path('accounts/', include('django.contrib.auth.urls')),
 ]
 
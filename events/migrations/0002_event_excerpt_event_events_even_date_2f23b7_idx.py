@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+from utils.utils import plain_text_excerpt
+
+
+def fill_excerpts(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    rows = list(Event.objects.only('id', 'description'))
+    for row in rows:
+        row.excerpt = plain_text_excerpt(row.description)
+    Event.objects.bulk_update(rows, ['excerpt'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'id'], name='events_even_date_2f23b7_idx'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from ckeditor_uploader.fields import RichTextUploadingField
+from utils.utils import EXCERPT_LENGTH, plain_text_excerpt
 
 class Event(models.Model):
     image=models.ImageField(upload_to="envents/")
@@ -7,4 +8,12 @@ class Event(models.Model):
     date=models.DateTimeField()
     location=models.CharField(max_length=255)
     description=RichTextUploadingField()
+    excerpt=models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["date", "id"])]
+
+    def save(self, *args, **kwargs):
+        self.excerpt = plain_text_excerpt(self.description)
+        super().save(*args, **kwargs)
 
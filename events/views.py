@@ -1,13 +1,20 @@
 from django.shortcuts import render
 from django.views.generic import ListView
 from events.models import Event
+from utils.pagination import KeysetPaginator
+
+EVENTS_PER_PAGE = 12
 
 
 # Create your views here.
 
 def events_page(request):
-    events=Event.objects.all()
-    return render(request, 'events.html', {"events":events})
+    # The list only shows the excerpt, so leave the rich-text body in the database
+    events=Event.objects.defer("description")
+    page=KeysetPaginator(events, ("-date", "-id"), EVENTS_PER_PAGE).get_page(
+        after=request.GET.get("after"), before=request.GET.get("before")
+    )
+    return render(request, 'events.html', {"events":page})
 
 def event_detail(request,id):
     event=Event.objects.get(id=id)
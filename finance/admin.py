@@ -1,8 +1,19 @@
-from django.contrib import admin
+import io
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from jobs.queue import enqueue
 from .models import (
-    FeeType, FeeStructure, FeeInvoice, FeeInvoiceItem,
-    Payment, Discount, StudentDiscount, Expense, Salary
+    FeeType, FeeStructure, FeeInvoice, FeeInvoiceItem, BillingRun, Payment,
+    StudentLedger, BankStatement, StatementLine, Discount, StudentDiscount, Expense, Salary
 )
+from .payroll import write_bank_file
+from .posting import post_payment, receipt_number
+from .printing import CHALLAN, RECEIPT, print_batch
+from .reconciliation import post_review_lines
 
 
 @admin.register(FeeType)
@@ -19,6 +30,29 @@ class FeeStructureAdmin(admin.ModelAdmin):
     search_fields = ('class_name__name', 'fee_type__name')
 
 
+def print_selection(modeladmin, request, queryset, kind):
+    """
+    Small selections download as one PDF; larger ones are printed to a
+    ZIP by a background job, which notifies the user when done.
+    """
+    label = 'challans' if kind == CHALLAN else 'receipts'
+    count = queryset.count()
+    if count > settings.CHALLAN_PRINT_INLINE_LIMIT:
+        ids = list(queryset.values_list('pk', flat=True))
+        transaction.on_commit(lambda: enqueue(
+            'finance.print_batch',
+            {'kind': kind, 'ids': ids, 'user_id': request.user.pk},
+        ))
+        modeladmin.message_user(request, f"Printing {count} {label} in the background; you will be notified when the file is ready")
+        return None
+    buffer = io.BytesIO()
+    print_batch(kind, queryset, buffer, fmt='pdf')
+    timestamp = timezone.localtime().strftime('%Y%m%d_%H%M')
+    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="fee_{label}_{timestamp}.pdf"'
+    return response
+
+
 @admin.register(FeeInvoice)
 class FeeInvoiceAdmin(admin.ModelAdmin):
     list_display = (
@@ -29,6 +63,11 @@ class FeeInvoiceAdmin(admin.ModelAdmin):
     search_fields = ('invoice_number', 'student__admission_number')
     readonly_fields = ('created_at', 'updated_at', 'balance_amount')
     date_hierarchy = 'invoice_date'
+    actions = ['print_challans']
+    
+    @admin.action(description='Print fee challans for selected invoices')
+    def print_challans(self, request, queryset):
+        return print_selection(self, request, queryset, CHALLAN)
 
 
 @admin.register(FeeInvoiceItem)
@@ -38,6 +77,13 @@ class FeeInvoiceItemAdmin(admin.ModelAdmin):
     search_fields = ('invoice__invoice_number',)
 
 
+@admin.register(BillingRun)
+class BillingRunAdmin(admin.ModelAdmin):
+    list_display = ('period', 'academic_year', 'status', 'invoices_created', 'total_billed', 'finished_at')
+    list_filter = ('status', 'academic_year')
+    readonly_fields = ('last_student_id', 'invoices_created', 'total_billed', 'error', 'finished_at', 'created_at', 'updated_at')
+
+
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = (
@@ -48,6 +94,106 @@ class PaymentAdmin(admin.ModelAdmin):
     search_fields = ('receipt_number', 'invoice__invoice_number', 'transaction_id')
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'payment_date'
+    actions = ['print_receipts']
+    
+    @admin.action(description='Print receipts for selected payments')
+    def print_receipts(self, request, queryset):
+        return print_selection(self, request, queryset, RECEIPT)
+    
+    def get_changeform_initial_data(self, request):
+        initial = super().get_changeform_initial_data(request)
+        initial.setdefault('receipt_number', receipt_number(timezone.localdate()))
+        return initial
+    
+    def save_model(self, request, obj, form, change):
+        # New completed payments go through the posting service (one
+        # F() update of the invoice); edits keep Payment.save()'s full
+        # recomputation.
+        if change or obj.payment_status != Payment.PaymentStatus.COMPLETED:
+            return super().save_model(request, obj, form, change)
+        fields = {name: getattr(obj, name) for name in ('receipt_number', 'transaction_id', 'cheque_number', 'bank_name', 'remarks')}
+        payment = post_payment(
+            obj.invoice, obj.amount, obj.payment_method, obj.payment_date,
+            received_by=obj.received_by or request.user, **fields
+        )
+        obj.pk = payment.pk or Payment.objects.get(receipt_number=payment.receipt_number).pk
+
+
+@admin.register(StudentLedger)
+class StudentLedgerAdmin(admin.ModelAdmin):
+    list_display = ('student', 'academic_year', 'invoice_count', 'total_amount', 'paid_amount', 'balance', 'updated_at')
+    list_filter = ('academic_year',)
+    search_fields = ('student__admission_number', 'student__user__first_name', 'student__user__last_name')
+    ordering = ('-balance',)
+    readonly_fields = (
+        'student', 'academic_year', 'invoice_count', 'total_amount', 'late_fee',
+        'discount_amount', 'paid_amount', 'balance', 'updated_at'
+    )
+    
+    def has_add_permission(self, request):
+        return False
+
+
+def queue_reconciliation(statement):
+    transaction.on_commit(lambda: enqueue(
+        'finance.reconcile_statement',
+        {'statement_id': statement.pk},
+        dedup_key=f"reconcile-statement-{statement.pk}",
+    ))
+
+
+@admin.register(BankStatement)
+class BankStatementAdmin(admin.ModelAdmin):
+    list_display = (
+        'file', 'statement_format', 'status', 'lines_total', 'lines_matched',
+        'lines_unmatched', 'amount_matched', 'uploaded_by', 'created_at'
+    )
+    list_filter = ('status', 'statement_format')
+    readonly_fields = (
+        'status', 'lines_total', 'lines_matched', 'lines_unmatched', 'amount_matched',
+        'error', 'uploaded_by', 'processed_at', 'created_at', 'updated_at'
+    )
+    actions = ['reconcile_again']
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.uploaded_by = request.user
+        super().save_model(request, obj, form, change)
+        if not change:
+            queue_reconciliation(obj)
+    
+    @admin.action(description='Re-run reconciliation in the background')
+    def reconcile_again(self, request, queryset):
+        for statement in queryset:
+            queue_reconciliation(statement)
+        self.message_user(request, f"Queued {queryset.count()} statement(s)")
+
+
+@admin.register(StatementLine)
+class StatementLineAdmin(admin.ModelAdmin):
+    list_display = ('statement', 'line_number', 'value_date', 'amount', 'reference', 'reason', 'invoice', 'status')
+    list_filter = ('status', 'statement')
+    search_fields = ('reference', 'description', 'invoice__invoice_number')
+    list_editable = ('invoice',)
+    raw_id_fields = ('invoice',)
+    readonly_fields = (
+        'statement', 'line_number', 'value_date', 'amount', 'reference', 'description',
+        'reason', 'payment', 'created_at', 'updated_at'
+    )
+    actions = ['post_to_invoice', 'mark_ignored']
+    
+    @admin.action(description='Post selected lines to their chosen invoice')
+    def post_to_invoice(self, request, queryset):
+        posted = post_review_lines(queryset, received_by=request.user)
+        level = messages.SUCCESS if posted else messages.WARNING
+        self.message_user(request, f"Posted {posted} line(s); lines without an open invoice stay queued", level)
+    
+    @admin.action(description='Ignore selected lines')
+    def mark_ignored(self, request, queryset):
+        updated = queryset.filter(status=StatementLine.LineStatus.UNMATCHED).update(
+            status=StatementLine.LineStatus.IGNORED, updated_at=timezone.now()
+        )
+        self.message_user(request, f"Ignored {updated} line(s)")
 
 
 @admin.register(Discount)
@@ -78,3 +224,13 @@ class SalaryAdmin(admin.ModelAdmin):
     list_filter = ('status', 'year', 'month')
     search_fields = ('staff__employee_id', 'staff__user__first_name')
     readonly_fields = ('created_at', 'updated_at', 'net_salary')
+    actions = ['download_bank_file']
+    
+    @admin.action(description='Download bank transfer file for selected salaries')
+    def download_bank_file(self, request, queryset):
+        buffer = io.StringIO()
+        write_bank_file(buffer, queryset)
+        timestamp = timezone.localtime().strftime('%Y%m%d_%H%M')
+        response = HttpResponse(buffer.getvalue(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="salary_transfers_{timestamp}.csv"'
+        return response
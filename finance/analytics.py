@@ -0,0 +1,173 @@
+"""
+Finance analytics over daily rollups.
+
+FinanceRollup holds one row per day, metric and category:
+
+    BILLED      amount due of non-cancelled invoices by invoice_date
+    COLLECTED   completed payments by payment_date, per payment method
+    EXPENSE     expenses by date, per expense category
+
+A day's rows are recomputed from the source table, inside the writing
+transaction, whenever something dated that day changes: see
+finance/signals.py and the bulk writers in posting.py, billing.py and
+overdue.py. Reports then read a few hundred rollup rows instead of
+scanning every invoice and payment. Outstanding at a date is everything
+billed up to it minus everything collected up to it.
+
+`python manage.py rebuild_finance_rollups` recomputes the table.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Expense, FeeInvoice, FinanceRollup, Payment
+
+Metric = FinanceRollup.Metric
+ZERO = Decimal('0.00')
+GRANULARITIES = ('day', 'month')
+
+
+def _sources():
+    """metric -> (queryset, date field, category field or None, amount expression)"""
+    return {
+        Metric.BILLED: (
+            FeeInvoice.objects.exclude(status=FeeInvoice.InvoiceStatus.CANCELLED),
+            'invoice_date', None,
+            F('total_amount') + F('late_fee') - F('discount_amount'),
+        ),
+        Metric.COLLECTED: (
+            Payment.objects.filter(payment_status=Payment.PaymentStatus.COMPLETED),
+            'payment_date', 'payment_method',
+            F('amount'),
+        ),
+        Metric.EXPENSE: (
+            Expense.objects.all(),
+            'date', 'category',
+            F('amount'),
+        ),
+    }
+
+
+def rollup_rows(metric, dates=None):
+    """Aggregate the source of `metric` into unsaved FinanceRollup rows"""
+    queryset, date_field, category_field, amount = _sources()[metric]
+    if dates is not None:
+        queryset = queryset.filter(**{f'{date_field}__in': dates})
+    group = [date_field] + ([category_field] if category_field else [])
+    rows = queryset.order_by().values(*group).annotate(total=Sum(amount), n=Count('pk'))
+    for row in rows.iterator(chunk_size=2000):
+        yield FinanceRollup(
+            date=row[date_field],
+            metric=metric,
+            category=row[category_field] if category_field else '',
+            amount=row['total'] or ZERO,
+            count=row['n'],
+        )
+
+
+def refresh_rollups(metric, dates, batch_size=500):
+    """Recompute `metric` for each day in `dates`; call inside the write's transaction"""
+    dates = sorted({day for day in dates if day})
+    for start in range(0, len(dates), batch_size):
+        chunk = dates[start:start + batch_size]
+        with transaction.atomic():
+            FinanceRollup.objects.filter(metric=metric, date__in=chunk).delete()
+            FinanceRollup.objects.bulk_create(rollup_rows(metric, chunk))
+
+
+def rebuild_rollups():
+    with transaction.atomic():
+        FinanceRollup.objects.all().delete()
+        created = 0
+        for metric in Metric.values:
+            created += len(FinanceRollup.objects.bulk_create(rollup_rows(metric), batch_size=2000))
+    return created
+
+
+def _period_key(day, granularity):
+    return day.replace(day=1) if granularity == 'month' else day
+
+
+def _periods(start, end, granularity):
+    day = _period_key(start, granularity)
+    while day <= end:
+        yield day
+        if granularity == 'month':
+            day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            day += timedelta(days=1)
+
+
+def finance_summary(start, end, granularity='day'):
+    """
+    Totals, a time series and category breakdowns for start..end
+    (inclusive), shaped for JSON. Costs two queries on the rollup table.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {GRANULARITIES}")
+
+    opening = FinanceRollup.objects.filter(
+        date__lt=start, metric__in=[Metric.BILLED, Metric.COLLECTED]
+    ).values('metric').annotate(total=Sum('amount'))
+    opening = {row['metric']: row['total'] for row in opening}
+    outstanding = (opening.get(Metric.BILLED) or ZERO) - (opening.get(Metric.COLLECTED) or ZERO)
+
+    period = TruncMonth('date') if granularity == 'month' else F('date')
+    rows = FinanceRollup.objects.filter(date__range=(start, end)).annotate(
+        period=period
+    ).values('period', 'metric', 'category').annotate(total=Sum('amount')).order_by('period')
+
+    buckets = {}
+    categories = {Metric.COLLECTED: {}, Metric.EXPENSE: {}}
+    totals = {metric: ZERO for metric in Metric.values}
+    for row in rows:
+        day = row['period']
+        if hasattr(day, 'date'):
+            day = day.date()
+        bucket = buckets.setdefault(day, {metric: ZERO for metric in Metric.values})
+        bucket[row['metric']] += row['total']
+        totals[row['metric']] += row['total']
+        if row['metric'] in categories:
+            by_category = categories[row['metric']]
+            by_category[row['category']] = by_category.get(row['category'], ZERO) + row['total']
+
+    series = []
+    for day in _periods(start, end, granularity):
+        bucket = buckets.get(day, {})
+        billed = bucket.get(Metric.BILLED, ZERO)
+        collected = bucket.get(Metric.COLLECTED, ZERO)
+        outstanding += billed - collected
+        series.append({
+            'period': day.isoformat(),
+            'billed': billed,
+            'collected': collected,
+            'expenses': bucket.get(Metric.EXPENSE, ZERO),
+            'outstanding': outstanding,
+        })
+
+    method_labels = dict(Payment.PaymentMethod.choices)
+    category_labels = dict(Expense.ExpenseCategory.choices)
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'granularity': granularity,
+        'totals': {
+            'billed': totals[Metric.BILLED],
+            'collected': totals[Metric.COLLECTED],
+            'expenses': totals[Metric.EXPENSE],
+            'net': totals[Metric.COLLECTED] - totals[Metric.EXPENSE],
+            'outstanding': outstanding,
+        },
+        'series': series,
+        'collections_by_method': [
+            {'category': key, 'label': str(method_labels.get(key, key)), 'amount': amount}
+            for key, amount in sorted(categories[Metric.COLLECTED].items(), key=lambda item: -item[1])
+        ],
+        'expenses_by_category': [
+            {'category': key, 'label': str(category_labels.get(key, key)), 'amount': amount}
+            for key, amount in sorted(categories[Metric.EXPENSE].items(), key=lambda item: -item[1])
+        ],
+    }
@@ -0,0 +1,296 @@
+"""
+Billing runs: turn FeeStructure rows into FeeInvoice/FeeInvoiceItem rows.
+
+A run bills one academic year for one month. Active students of the
+year's campus are processed in primary-key order, a chunk at a time;
+each chunk's invoices, items and the run's checkpoint are written in one
+transaction, so an interrupted run picks up after the last committed
+chunk and never bills a student twice. A completed run can be topped up
+(students admitted or activated since): it is walked again from the
+start and bills only students who have no invoice for the month yet.
+
+Per student the run bills:
+
+* every active FeeStructure of their class that falls due this month
+  (MONTHLY always, QUARTERLY/HALF_YEARLY every 3/6 months from the
+  start of the academic year, ANNUALLY in its first month, ONE_TIME
+  once per academic year);
+* Route.monthly_fee when they use transport, Room.monthly_fee when
+  they live in the hostel;
+* minus their active StudentDiscounts for the year, as discount_amount.
+"""
+import calendar
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from students.models import Student
+from .analytics import refresh_rollups
+from .ledger import refresh_ledgers
+from .models import (
+    BillingRun, Discount, FeeInvoice, FeeInvoiceItem,
+    FeeStructure, FeeType, FinanceRollup, StudentDiscount
+)
+
+TRANSPORT_FEE_CODE = 'TRANSPORT'
+HOSTEL_FEE_CODE = 'HOSTEL'
+DEFAULT_DUE_DAY = 10
+CENT = Decimal('0.01')
+
+# Months between bills for each frequency; ONE_TIME is handled separately.
+FREQUENCY_MONTHS = {
+    FeeStructure.FeeFrequency.MONTHLY: 1,
+    FeeStructure.FeeFrequency.QUARTERLY: 3,
+    FeeStructure.FeeFrequency.HALF_YEARLY: 6,
+    FeeStructure.FeeFrequency.ANNUALLY: 12,
+}
+
+
+class BillingError(Exception):
+    pass
+
+
+@dataclass
+class BillingResult:
+    invoices: int = 0
+    total: Decimal = Decimal('0.00')
+    discount: Decimal = Decimal('0.00')
+    skipped: int = 0
+    by_fee_type: dict = field(default_factory=dict)
+
+
+def invoice_number(period, admission_number):
+    """Deterministic per student and month, so a re-run cannot duplicate"""
+    return f"INV-{period:%Y%m}-{admission_number}"
+
+
+def _months_since_start(academic_year, period):
+    start = academic_year.start_date
+    return (period.year - start.year) * 12 + period.month - start.month
+
+
+def _due_date(period, due_day):
+    last_day = calendar.monthrange(period.year, period.month)[1]
+    return period.replace(day=min(max(due_day, 1), last_day))
+
+
+def _discount_amount(discounts, total):
+    amount = Decimal('0.00')
+    for discount_type, value in discounts:
+        if discount_type == Discount.DiscountType.PERCENTAGE:
+            amount += (total * value / 100).quantize(CENT)
+        else:
+            amount += value
+    return min(amount, total)
+
+
+class BillingEngine:
+    def __init__(self, academic_year, period, user=None, chunk_size=500):
+        self.academic_year = academic_year
+        self.period = period.replace(day=1)
+        self.user = user
+        self.chunk_size = chunk_size
+        if not academic_year.start_date.replace(day=1) <= self.period <= academic_year.end_date:
+            raise BillingError(f"{self.period:%B %Y} is outside academic year {academic_year.name}")
+
+        months = _months_since_start(academic_year, self.period)
+        structures = FeeStructure.objects.filter(
+            academic_year=academic_year,
+            is_active=True
+        ).select_related('fee_type')
+        # class id -> [(fee_type, amount, due_day)] billable this month
+        self.recurring = {}
+        # class id -> [(fee_type, amount, due_day)] billed once per year
+        self.one_time = {}
+        for structure in structures:
+            entry = (structure.fee_type, structure.amount, structure.due_day)
+            if structure.frequency == FeeStructure.FeeFrequency.ONE_TIME:
+                self.one_time.setdefault(structure.class_name_id, []).append(entry)
+            elif months % FREQUENCY_MONTHS[structure.frequency] == 0:
+                self.recurring.setdefault(structure.class_name_id, []).append(entry)
+        self.one_time_fee_types = {fee_type.pk for entries in self.one_time.values() for fee_type, _a, _d in entries}
+
+        self.discounts = {}
+        for student_id, discount_type, value in StudentDiscount.objects.filter(
+            academic_year=academic_year,
+            is_active=True,
+            discount__is_active=True
+        ).values_list('student_id', 'discount__discount_type', 'discount__value'):
+            self.discounts.setdefault(student_id, []).append((discount_type, value))
+
+        self.transport_fee_type = self._fee_type(TRANSPORT_FEE_CODE, 'Transport Fee')
+        self.hostel_fee_type = self._fee_type(HOSTEL_FEE_CODE, 'Hostel Fee')
+
+    @staticmethod
+    def _fee_type(code, name):
+        fee_type, _created = FeeType.objects.get_or_create(code=code, defaults={'name': name})
+        return fee_type
+
+    def students(self, after=0):
+        return Student.objects.filter(
+            campus_id=self.academic_year.campus_id,
+            status='ACTIVE',
+            pk__gt=after
+        ).order_by('pk').values_list(
+            'pk', 'admission_number', 'current_class_id',
+            'uses_transport', 'route__monthly_fee', 'route__is_active',
+            'is_hosteler', 'hostel_room__monthly_fee', 'hostel_room__is_active',
+        )
+
+    def build_chunk(self, rows):
+        """Unsaved invoices for one chunk of student rows, each with `_items`"""
+        student_ids = [row[0] for row in rows]
+        billed_once = set()
+        if self.one_time_fee_types:
+            billed_once = set(FeeInvoiceItem.objects.filter(
+                invoice__student_id__in=student_ids,
+                invoice__academic_year=self.academic_year,
+                fee_type_id__in=self.one_time_fee_types
+            ).values_list('invoice__student_id', 'fee_type_id'))
+
+        invoices = []
+        for (student_id, admission_number, class_id, uses_transport, route_fee, route_active,
+             is_hosteler, room_fee, room_active) in rows:
+            lines = list(self.recurring.get(class_id, []))
+            lines += [
+                entry for entry in self.one_time.get(class_id, [])
+                if (student_id, entry[0].pk) not in billed_once
+            ]
+            items = [
+                FeeInvoiceItem(fee_type=fee_type, description=f"{fee_type.name} - {self.period:%B %Y}", amount=amount)
+                for fee_type, amount, _due_day in lines
+            ]
+            if uses_transport and route_fee and route_active:
+                items.append(FeeInvoiceItem(
+                    fee_type=self.transport_fee_type,
+                    description=f"Transport - {self.period:%B %Y}",
+                    amount=route_fee
+                ))
+            if is_hosteler and room_fee and room_active:
+                items.append(FeeInvoiceItem(
+                    fee_type=self.hostel_fee_type,
+                    description=f"Hostel - {self.period:%B %Y}",
+                    amount=room_fee
+                ))
+            if not items:
+                continue
+
+            total = sum((item.amount for item in items), Decimal('0.00'))
+            due_day = min((due_day for _f, _a, due_day in lines), default=DEFAULT_DUE_DAY)
+            invoice = FeeInvoice(
+                invoice_number=invoice_number(self.period, admission_number),
+                student_id=student_id,
+                academic_year=self.academic_year,
+                invoice_date=self.period,
+                due_date=_due_date(self.period, due_day),
+                total_amount=total,
+                discount_amount=_discount_amount(self.discounts.get(student_id, []), total),
+                remarks=f"Billing run {self.period:%B %Y}",
+                created_by=self.user,
+            )
+            invoice._items = items
+            invoices.append(invoice)
+        return invoices
+
+    def save_chunk(self, invoices):
+        # Invoices already written for this month (e.g. issued by hand
+        # before the run) keep their number and are not billed again.
+        existing = set(FeeInvoice.objects.filter(
+            invoice_number__in=[invoice.invoice_number for invoice in invoices]
+        ).values_list('invoice_number', flat=True))
+        invoices = [invoice for invoice in invoices if invoice.invoice_number not in existing]
+        FeeInvoice.objects.bulk_create(invoices)
+        items = []
+        for invoice in invoices:
+            for item in invoice._items:
+                item.invoice = invoice
+                items.append(item)
+        FeeInvoiceItem.objects.bulk_create(items)
+        refresh_ledgers({invoice.student_id for invoice in invoices})
+        refresh_rollups(FinanceRollup.Metric.BILLED, {invoice.invoice_date for invoice in invoices})
+        return invoices, len(existing)
+
+
+def _tally(result, invoices):
+    for invoice in invoices:
+        result.invoices += 1
+        result.total += invoice.total_amount
+        result.discount += invoice.discount_amount
+        for item in invoice._items:
+            result.by_fee_type[item.fee_type.name] = result.by_fee_type.get(item.fee_type.name, 0) + item.amount
+
+
+def preview_billing(academic_year, period, chunk_size=500):
+    """Dry run: what a billing run would create, without writing anything"""
+    engine = BillingEngine(academic_year, period, chunk_size=chunk_size)
+    result = BillingResult()
+    rows = []
+    for row in engine.students().iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            _tally(result, engine.build_chunk(rows))
+            rows = []
+    if rows:
+        _tally(result, engine.build_chunk(rows))
+    return result
+
+
+def run_billing(academic_year, period, user=None, chunk_size=500, force=False, top_up=False, progress=None):
+    """
+    Bill `period` for `academic_year`, resuming a previous run from its
+    checkpoint. Returns the BillingRun. `force` takes over a run left
+    RUNNING by a process that died; `top_up` re-opens a COMPLETED run to
+    bill the students without an invoice for the month; `progress(run)`
+    is called per chunk.
+    """
+    period = period.replace(day=1)
+    engine = BillingEngine(academic_year, period, user=user, chunk_size=chunk_size)
+    run, _created = BillingRun.objects.get_or_create(
+        academic_year=academic_year,
+        period=period,
+        defaults={'started_by': user}
+    )
+    claim = {}
+    if run.status == BillingRun.RunStatus.COMPLETED:
+        if not top_up:
+            return run
+        # save_chunk() skips students already invoiced this month, so
+        # walking every student again bills only the ones left out.
+        claimable = [BillingRun.RunStatus.COMPLETED]
+        claim = {'last_student_id': 0, 'finished_at': None}
+    else:
+        claimable = [BillingRun.RunStatus.PENDING, BillingRun.RunStatus.FAILED]
+        if force:
+            claimable.append(BillingRun.RunStatus.RUNNING)
+    # Claim the run so two invocations cannot bill the same month at once.
+    if not BillingRun.objects.filter(pk=run.pk, status__in=claimable).update(
+        status=BillingRun.RunStatus.RUNNING, error=None, updated_at=timezone.now(), **claim
+    ):
+        raise BillingError(f"Billing for {period:%B %Y} is already running (use force to take it over)")
+    run.refresh_from_db()
+
+    try:
+        while True:
+            rows = list(engine.students(after=run.last_student_id)[:chunk_size])
+            if not rows:
+                break
+            with transaction.atomic():
+                invoices, _skipped = engine.save_chunk(engine.build_chunk(rows))
+                run.last_student_id = rows[-1][0]
+                run.invoices_created += len(invoices)
+                run.total_billed += sum((invoice.total_amount for invoice in invoices), Decimal('0.00'))
+                run.save(update_fields=['last_student_id', 'invoices_created', 'total_billed', 'updated_at'])
+            if progress:
+                progress(run)
+    except Exception as exc:
+        run.status = BillingRun.RunStatus.FAILED
+        run.error = str(exc)
+        run.save(update_fields=['status', 'error', 'updated_at'])
+        raise
+
+    run.status = BillingRun.RunStatus.COMPLETED
+    run.finished_at = timezone.now()
+    run.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return run
@@ -0,0 +1,128 @@
+"""
+Per-student fee ledger.
+
+StudentLedger keeps, for every student and academic year, the sums of
+their non-cancelled invoices and the resulting balance, so outstanding
+balances and defaulter lists are an indexed read instead of a SUM over
+every invoice.
+
+Rows are recomputed from the invoices, never incremented, inside the
+transaction that changed the invoices:
+
+    FeeInvoice save/delete   finance/signals.py
+    post_payment(s)          finance/posting.py
+    billing runs             finance/billing.py
+    nightly late fees        finance/overdue.py
+
+Writes that bypass all of these (raw SQL, queryset.update() elsewhere)
+are caught by `python manage.py verify_fee_ledger`, which reports drift
+and with --fix rebuilds the table.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Sum
+
+from .models import FeeInvoice, StudentLedger
+
+AMOUNT_FIELDS = ['total_amount', 'late_fee', 'discount_amount', 'paid_amount']
+LEDGER_FIELDS = ['invoice_count', *AMOUNT_FIELDS, 'balance']
+ZERO = Decimal('0.00')
+
+
+def ledger_rows(invoices):
+    """Aggregate `invoices` into unsaved StudentLedger rows"""
+    rows = invoices.exclude(status=FeeInvoice.InvoiceStatus.CANCELLED).order_by().values(
+        'student_id', 'academic_year_id'
+    ).annotate(
+        invoice_count=Count('id'),
+        **{field: Sum(field) for field in AMOUNT_FIELDS}
+    )
+    for row in rows.iterator(chunk_size=2000):
+        amounts = {field: row[field] or ZERO for field in AMOUNT_FIELDS}
+        yield StudentLedger(
+            student_id=row['student_id'],
+            academic_year_id=row['academic_year_id'],
+            invoice_count=row['invoice_count'],
+            balance=amounts['total_amount'] + amounts['late_fee'] - amounts['discount_amount'] - amounts['paid_amount'],
+            **amounts
+        )
+
+
+def refresh_ledgers(student_ids, batch_size=500):
+    """
+    Recompute the ledger rows of `student_ids` (a list or a values
+    queryset of ids) for every academic year. Call it inside the
+    transaction that wrote the invoices.
+    """
+    if not hasattr(student_ids, 'query'):
+        student_ids = list(set(student_ids))
+        for start in range(0, len(student_ids), batch_size):
+            _refresh(student_ids[start:start + batch_size])
+    else:
+        _refresh(student_ids)
+
+
+def _refresh(student_ids):
+    with transaction.atomic():
+        StudentLedger.objects.bulk_create(
+            ledger_rows(FeeInvoice.objects.filter(student_id__in=student_ids)),
+            update_conflicts=True,
+            unique_fields=['student', 'academic_year'],
+            update_fields=LEDGER_FIELDS + ['updated_at'],
+        )
+        # Years whose last invoice was cancelled or deleted
+        StudentLedger.objects.filter(student_id__in=student_ids).exclude(Exists(
+            FeeInvoice.objects.filter(
+                student_id=OuterRef('student_id'),
+                academic_year_id=OuterRef('academic_year_id'),
+            ).exclude(status=FeeInvoice.InvoiceStatus.CANCELLED)
+        )).delete()
+
+
+def find_drift():
+    """
+    Compare the ledger with a full recomputation. Returns a list of
+    (student_id, academic_year_id, stored, expected) where either side
+    is a dict of LEDGER_FIELDS or None when the row is missing.
+    """
+    expected = {
+        (row.student_id, row.academic_year_id): {field: getattr(row, field) for field in LEDGER_FIELDS}
+        for row in ledger_rows(FeeInvoice.objects.all())
+    }
+    drift = []
+    stored_rows = StudentLedger.objects.values_list('student_id', 'academic_year_id', *LEDGER_FIELDS)
+    for student_id, academic_year_id, *values in stored_rows.iterator(chunk_size=2000):
+        stored = dict(zip(LEDGER_FIELDS, values))
+        wanted = expected.pop((student_id, academic_year_id), None)
+        if stored != wanted:
+            drift.append((student_id, academic_year_id, stored, wanted))
+    for (student_id, academic_year_id), wanted in expected.items():
+        drift.append((student_id, academic_year_id, None, wanted))
+    return drift
+
+
+def rebuild_ledgers(batch_size=2000):
+    """Replace the whole ledger with a recomputation from the invoices"""
+    with transaction.atomic():
+        StudentLedger.objects.all().delete()
+        rows = ledger_rows(FeeInvoice.objects.all())
+        batch = []
+        created = 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                created += len(StudentLedger.objects.bulk_create(batch))
+                batch = []
+        created += len(StudentLedger.objects.bulk_create(batch))
+    return created
+
+
+def defaulters(academic_year, min_balance=Decimal('0.01'), order='-balance'):
+    """Students owing at least `min_balance` in `academic_year`, largest first"""
+    return StudentLedger.objects.filter(
+        academic_year=academic_year,
+        balance__gte=min_balance,
+    ).select_related(
+        'student__user', 'student__current_class', 'student__section'
+    ).order_by(order, 'student__admission_number')
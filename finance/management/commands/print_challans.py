@@ -0,0 +1,60 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Campus
+from finance.models import FeeInvoice, Payment
+from finance.printing import CHALLAN, FORMATS, RECEIPT, print_batch
+
+
+def month(value):
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+class Command(BaseCommand):
+    help = 'Print fee challans (or receipts) to one PDF or a ZIP of PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='File to write')
+        parser.add_argument('--format', choices=FORMATS, default='pdf', help='One combined PDF or a ZIP with a PDF per document')
+        parser.add_argument('--month', type=month, help='Invoice (or payment) month, YYYY-MM')
+        parser.add_argument('--campus', help='Campus code (default: every campus)')
+        parser.add_argument('--class-id', type=int, help='Only students of this class')
+        parser.add_argument('--unpaid', action='store_true', help='Only invoices with a balance due')
+        parser.add_argument('--receipts', action='store_true', help='Print payment receipts instead of challans')
+        parser.add_argument('--workers', type=int, help='Rendering processes for --format zip')
+        parser.add_argument('--chunk-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        if options['receipts']:
+            kind, prefix = RECEIPT, 'invoice__'
+            queryset = Payment.objects.filter(payment_status=Payment.PaymentStatus.COMPLETED)
+            date_field = 'payment_date'
+        else:
+            kind, prefix = CHALLAN, ''
+            queryset = FeeInvoice.objects.exclude(status=FeeInvoice.InvoiceStatus.CANCELLED)
+            date_field = 'invoice_date'
+            if options['unpaid']:
+                queryset = queryset.exclude(status=FeeInvoice.InvoiceStatus.PAID)
+
+        if options['month']:
+            first = options['month']
+            queryset = queryset.filter(**{f'{date_field}__year': first.year, f'{date_field}__month': first.month})
+        if options['campus']:
+            campus = Campus.objects.filter(code=options['campus']).first()
+            if campus is None:
+                raise CommandError(f"Unknown campus {options['campus']!r}")
+            queryset = queryset.filter(**{f'{prefix}student__campus': campus})
+        if options['class_id']:
+            queryset = queryset.filter(**{f'{prefix}student__current_class_id': options['class_id']})
+
+        started = time.monotonic()
+        count = print_batch(
+            kind, queryset, options['output'], fmt=options['format'],
+            workers=options['workers'], chunk_size=options['chunk_size'],
+        )
+        label = 'challans' if kind == CHALLAN else 'receipts'
+        self.stdout.write(self.style.SUCCESS(
+            f'Printed {count} {label} to {options["output"]} in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from finance.analytics import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily billed/collected/expense rollups behind the finance overview'
+
+    def handle(self, *args, **options):
+        created = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} finance rollup rows'))
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.models import BankStatement
+from finance.reconciliation import reconcile_statement
+
+MT940_SUFFIXES = {'.sta', '.mt940', '.940'}
+
+
+class Command(BaseCommand):
+    help = 'Match a bank statement (CSV or MT940) against open invoices and post the payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Statement file to import')
+        parser.add_argument('--statement', type=int, help='Re-run an already uploaded statement by id')
+        parser.add_argument('--format', choices=[choice.lower() for choice in BankStatement.StatementFormat.values],
+                            help='Statement format (default: guessed from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['statement']:
+            statement = BankStatement.objects.filter(pk=options['statement']).first()
+            if statement is None:
+                raise CommandError(f"Bank statement {options['statement']} does not exist")
+        elif options['path']:
+            path = Path(options['path'])
+            if not path.is_file():
+                raise CommandError(f"{path} is not a file")
+            statement_format = (options['format'] or (
+                'mt940' if path.suffix.lower() in MT940_SUFFIXES else 'csv'
+            )).upper()
+            statement = BankStatement(statement_format=statement_format)
+            with path.open('rb') as fileobj:
+                statement.file.save(path.name, File(fileobj), save=True)
+        else:
+            raise CommandError("Give a statement file or --statement")
+
+        statement = reconcile_statement(statement, batch_size=options['batch_size'])
+        if statement.status == BankStatement.StatementStatus.FAILED:
+            raise CommandError(f"Statement {statement.pk} failed: {statement.error}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Statement {statement.pk}: {statement.lines_matched} of {statement.lines_total} lines posted '
+            f'({statement.amount_matched}), {statement.lines_unmatched} queued for review'
+        ))
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import AcademicYear
+from finance.billing import BillingError, preview_billing, run_billing
+
+
+def month(value):
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+class Command(BaseCommand):
+    help = 'Generate fee invoices for one month from the fee structures, transport and hostel fees'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', type=int, help='AcademicYear id (default: every current academic year)')
+        parser.add_argument('--period', type=month, required=True, help='Month to bill, YYYY-MM')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be billed without writing')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Students per transaction')
+        parser.add_argument('--force', action='store_true', help='Take over a run left RUNNING by a crashed process')
+        parser.add_argument(
+            '--top-up', action='store_true',
+            help='Re-open a completed run and bill only students without an invoice for the month'
+        )
+
+    def handle(self, *args, **options):
+        years = AcademicYear.objects.select_related('campus')
+        if options['academic_year']:
+            years = years.filter(pk=options['academic_year'])
+        else:
+            years = years.filter(is_current=True)
+        if not years:
+            raise CommandError('No matching academic year')
+
+        for academic_year in years:
+            self.stdout.write(f"{academic_year} - {options['period']:%B %Y}")
+            try:
+                if options['dry_run']:
+                    result = preview_billing(academic_year, options['period'], options['chunk_size'])
+                    for name, amount in sorted(result.by_fee_type.items()):
+                        self.stdout.write(f'   {name}: {amount}')
+                    self.stdout.write(self.style.SUCCESS(
+                        f'   Would create {result.invoices} invoices totalling {result.total} '
+                        f'(discounts {result.discount})'
+                    ))
+                    continue
+
+                run = run_billing(
+                    academic_year, options['period'],
+                    chunk_size=options['chunk_size'],
+                    force=options['force'],
+                    top_up=options['top_up'],
+                    progress=lambda run: self.stdout.write(
+                        f'   ... {run.invoices_created} invoices, up to student #{run.last_student_id}'
+                    ),
+                )
+            except BillingError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(
+                f'   {run.get_status_display()}: {run.invoices_created} invoices totalling {run.total_billed}'
+            ))
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Campus
+from finance.models import Salary
+from finance.payroll import run_payroll, write_bank_file
+
+
+def month(value):
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+class Command(BaseCommand):
+    help = 'Generate the PENDING salaries for one month; re-running refreshes them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', type=month, required=True, help='Payroll month, YYYY-MM')
+        parser.add_argument('--campus', help='Campus code (default: every campus)')
+        parser.add_argument('--dry-run', action='store_true', help='Report the payroll without writing it')
+        parser.add_argument('--bank-file', help='Also write the bank transfer CSV to this path')
+
+    def handle(self, *args, **options):
+        campus = None
+        if options['campus']:
+            campus = Campus.objects.filter(code=options['campus']).first()
+            if campus is None:
+                raise CommandError(f"Unknown campus {options['campus']!r}")
+
+        result = run_payroll(options['month'], campus=campus, dry_run=options['dry_run'])
+        if options['verbosity'] >= 2:
+            for salary in result.salaries:
+                self.stdout.write(f'   staff #{salary.staff_id}: {salary.net_salary} ({salary.remarks or "no deductions"})')
+        prefix = 'Would write' if options['dry_run'] else 'Wrote'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix} {result.created} new and {result.updated} refreshed salaries for {result.month:%B %Y}: '
+            f'net {result.total_net}, deductions {result.total_deductions} ({result.skipped} already paid or cancelled)'
+        ))
+
+        if options['bank_file'] and not options['dry_run']:
+            salaries = Salary.objects.filter(month=result.month.month, year=result.month.year)
+            if campus is not None:
+                salaries = salaries.filter(staff__campus=campus)
+            with open(options['bank_file'], 'w', newline='', encoding='utf-8') as fileobj:
+                count = write_bank_file(fileobj, salaries)
+            self.stdout.write(self.style.SUCCESS(f'Bank transfer file {options["bank_file"]}: {count} transfers'))
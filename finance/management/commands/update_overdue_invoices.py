@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from finance.overdue import run_nightly
+
+
+class Command(BaseCommand):
+    help = 'Apply late fees and move invoices to PAID/PARTIAL/OVERDUE/PENDING (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='Evaluate as of this date (default: today)')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them')
+
+    def handle(self, *args, **options):
+        late_fees, statuses = run_nightly(options['date'], dry_run=options['dry_run'])
+        prefix = 'Would change' if options['dry_run'] else 'Changed'
+
+        if options['verbosity'] >= 2:
+            for number, old, new in late_fees:
+                self.stdout.write(f'   {number}: late fee {old} -> {new}')
+            for number, old, new in statuses:
+                self.stdout.write(f'   {number}: {old} -> {new}')
+
+        transitions = {}
+        for _number, old, new in statuses:
+            transitions[(old, new)] = transitions.get((old, new), 0) + 1
+        for (old, new), count in sorted(transitions.items()):
+            self.stdout.write(f'   {old} -> {new}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix} late fees on {len(late_fees)} invoices and status on {len(statuses)} invoices'
+        ))
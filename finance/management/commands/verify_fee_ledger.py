@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from finance.ledger import find_drift, rebuild_ledgers
+
+
+class Command(BaseCommand):
+    help = 'Recompute the student fee ledger from the invoices and report rows that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rebuild the ledger when drift is found')
+
+    def handle(self, *args, **options):
+        drift = find_drift()
+        for student_id, academic_year_id, stored, expected in drift[:50]:
+            if stored is None:
+                self.stdout.write(f'   student {student_id}, year {academic_year_id}: missing (expected balance {expected["balance"]})')
+            elif expected is None:
+                self.stdout.write(f'   student {student_id}, year {academic_year_id}: stale row (balance {stored["balance"]})')
+            else:
+                changed = ', '.join(
+                    f'{field} {stored[field]} != {expected[field]}'
+                    for field in stored if stored[field] != expected[field]
+                )
+                self.stdout.write(f'   student {student_id}, year {academic_year_id}: {changed}')
+        if len(drift) > 50:
+            self.stdout.write(f'   ... and {len(drift) - 50} more')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Fee ledger matches the invoices'))
+            return
+        if options['fix']:
+            created = rebuild_ledgers()
+            self.stdout.write(self.style.SUCCESS(f'{len(drift)} rows drifted; rebuilt {created} ledger rows'))
+        else:
+            self.stdout.write(self.style.ERROR(f'{len(drift)} ledger rows drifted; run with --fix to rebuild'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('finance', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillingRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(help_text='First day of the billed month')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('last_student_id', models.BigIntegerField(default=0, help_text='Checkpoint: students up to this id have been billed')),
+                ('invoices_created', models.IntegerField(default=0)),
+                ('total_billed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='billing_runs', to='accounts.academicyear')),
+                ('started_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='billing_runs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Billing Run',
+                'verbose_name_plural': 'Billing Runs',
+                'db_table': 'billing_runs',
+                'ordering': ['-period'],
+                'unique_together': {('academic_year', 'period')},
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_billingrun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='bank_statements/')),
+                ('statement_format', models.CharField(choices=[('CSV', 'CSV'), ('MT940', 'MT940')], default='CSV', max_length=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('lines_total', models.IntegerField(default=0)),
+                ('lines_matched', models.IntegerField(default=0)),
+                ('lines_unmatched', models.IntegerField(default=0)),
+                ('amount_matched', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('uploaded_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bank_statements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Bank Statement',
+                'verbose_name_plural': 'Bank Statements',
+                'db_table': 'bank_statements',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line_number', models.IntegerField()),
+                ('value_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reference', models.CharField(blank=True, max_length=100, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('reason', models.CharField(max_length=200)),
+                ('status', models.CharField(choices=[('UNMATCHED', 'Unmatched'), ('POSTED', 'Posted'), ('IGNORED', 'Ignored')], default='UNMATCHED', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('invoice', models.ForeignKey(blank=True, help_text='Set by the reviewer before posting', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='finance.feeinvoice')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='finance.payment')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_lines', to='finance.bankstatement')),
+            ],
+            options={
+                'verbose_name': 'Statement Line',
+                'verbose_name_plural': 'Statement Review Queue',
+                'db_table': 'bank_statement_lines',
+                'ordering': ['statement', 'line_number'],
+            },
+        ),
+    ]
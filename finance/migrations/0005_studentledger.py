@@ -0,0 +1,56 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_ledgers(apps, schema_editor):
+    FeeInvoice = apps.get_model('finance', 'FeeInvoice')
+    StudentLedger = apps.get_model('finance', 'StudentLedger')
+    amounts = ['total_amount', 'late_fee', 'discount_amount', 'paid_amount']
+    rows = FeeInvoice.objects.exclude(status='CANCELLED').order_by().values(
+        'student_id', 'academic_year_id'
+    ).annotate(invoice_count=Count('id'), **{field: Sum(field) for field in amounts})
+    ledgers = []
+    for row in rows:
+        ledgers.append(StudentLedger(
+            balance=row['total_amount'] + row['late_fee'] - row['discount_amount'] - row['paid_amount'],
+            **row
+        ))
+    StudentLedger.objects.bulk_create(ledgers, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('finance', '0004_bankstatement_statementline'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invoice_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('late_fee', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_ledgers', to='accounts.academicyear')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_ledgers', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Student Ledger',
+                'verbose_name_plural': 'Student Ledgers',
+                'db_table': 'student_fee_ledgers',
+                'indexes': [models.Index(fields=['academic_year', 'balance'], name='student_fee_academi_12bed4_idx')],
+                'unique_together': {('student', 'academic_year')},
+            },
+        ),
+        migrations.RunPython(build_ledgers, migrations.RunPython.noop),
+    ]
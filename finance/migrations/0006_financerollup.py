@@ -0,0 +1,77 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def build_rollups(apps, schema_editor):
+    FeeInvoice = apps.get_model('finance', 'FeeInvoice')
+    Payment = apps.get_model('finance', 'Payment')
+    Expense = apps.get_model('finance', 'Expense')
+    FinanceRollup = apps.get_model('finance', 'FinanceRollup')
+    sources = [
+        ('BILLED', FeeInvoice.objects.exclude(status='CANCELLED'), 'invoice_date', None,
+         F('total_amount') + F('late_fee') - F('discount_amount')),
+        ('COLLECTED', Payment.objects.filter(payment_status='COMPLETED'), 'payment_date', 'payment_method', F('amount')),
+        ('EXPENSE', Expense.objects.all(), 'date', 'category', F('amount')),
+    ]
+    rollups = []
+    for metric, queryset, date_field, category_field, amount in sources:
+        group = [date_field] + ([category_field] if category_field else [])
+        for row in queryset.order_by().values(*group).annotate(total=Sum(amount), n=Count('pk')):
+            rollups.append(FinanceRollup(
+                date=row[date_field],
+                metric=metric,
+                category=row[category_field] if category_field else '',
+                amount=row['total'] or 0,
+                count=row['n'],
+            ))
+    FinanceRollup.objects.bulk_create(rollups, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('finance', '0005_studentledger'),
+        ('students', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('metric', models.CharField(choices=[('BILLED', 'Billed'), ('COLLECTED', 'Collected'), ('EXPENSE', 'Expense')], max_length=20)),
+                ('category', models.CharField(blank=True, default='', max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Finance Rollup',
+                'verbose_name_plural': 'Finance Rollups',
+                'db_table': 'finance_rollups',
+                'ordering': ['date', 'metric', 'category'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['date'], name='expenses_date_a77b87_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feeinvoice',
+            index=models.Index(fields=['invoice_date'], name='fee_invoice_invoice_69b37d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_date'], name='payments_payment_aebcb7_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='financerollup',
+            unique_together={('metric', 'date', 'category')},
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
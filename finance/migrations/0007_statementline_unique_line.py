@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:38
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_financerollup'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='statementline',
+            unique_together={('statement', 'line_number')},
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from accounts.models import User, AcademicYear
 from decimal import Decimal
@@ -117,6 +118,7 @@ class FeeInvoice(models.Model):
         verbose_name = _('Fee Invoice')
         verbose_name_plural = _('Fee Invoices')
         ordering = ['-invoice_date']
+        indexes = [models.Index(fields=['invoice_date'])]
     
     def __str__(self):
         return f"{self.invoice_number} - {self.student.admission_number}"
@@ -131,7 +133,7 @@ class FeeInvoice(models.Model):
             self.status = self.InvoiceStatus.PAID
         elif self.paid_amount > 0:
             self.status = self.InvoiceStatus.PARTIAL
-        elif self.due_date < models.DateField().today():
+        elif self.due_date < timezone.localdate():
             self.status = self.InvoiceStatus.OVERDUE
         else:
             self.status = self.InvoiceStatus.PENDING
@@ -162,6 +164,54 @@ class FeeInvoiceItem(models.Model):
         return f"{self.invoice.invoice_number} - {self.fee_type.name}"
 
 
+class BillingRun(models.Model):
+    """Monthly Billing Run with a resumable checkpoint (see finance/billing.py)"""
+    
+    class RunStatus(models.TextChoices):
+        PENDING = 'PENDING', _('Pending')
+        RUNNING = 'RUNNING', _('Running')
+        COMPLETED = 'COMPLETED', _('Completed')
+        FAILED = 'FAILED', _('Failed')
+    
+    academic_year = models.ForeignKey(
+        AcademicYear,
+        on_delete=models.CASCADE,
+        related_name='billing_runs'
+    )
+    period = models.DateField(help_text="First day of the billed month")
+    status = models.CharField(
+        max_length=20,
+        choices=RunStatus.choices,
+        default=RunStatus.PENDING
+    )
+    last_student_id = models.BigIntegerField(
+        default=0,
+        help_text="Checkpoint: students up to this id have been billed"
+    )
+    invoices_created = models.IntegerField(default=0)
+    total_billed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    error = models.TextField(blank=True, null=True)
+    started_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='billing_runs'
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'billing_runs'
+        verbose_name = _('Billing Run')
+        verbose_name_plural = _('Billing Runs')
+        unique_together = ['academic_year', 'period']
+        ordering = ['-period']
+    
+    def __str__(self):
+        return f"{self.academic_year.name} - {self.period:%B %Y} ({self.status})"
+
+
 class Payment(models.Model):
     """Payment Records"""
     
@@ -214,19 +264,180 @@ class Payment(models.Model):
         verbose_name = _('Payment')
         verbose_name_plural = _('Payments')
         ordering = ['-payment_date']
+        indexes = [models.Index(fields=['payment_date'])]
     
     def __str__(self):
         return f"{self.receipt_number} - {self.amount}"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update invoice paid amount
-        if self.payment_status == self.PaymentStatus.COMPLETED:
-            invoice = self.invoice
-            invoice.paid_amount = invoice.payments.filter(
-                payment_status=self.PaymentStatus.COMPLETED
-            ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
-            invoice.update_status()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Update invoice paid amount
+            if self.payment_status == self.PaymentStatus.COMPLETED:
+                invoice = self.invoice
+                invoice.paid_amount = invoice.payments.filter(
+                    payment_status=self.PaymentStatus.COMPLETED
+                ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
+                invoice.update_status()
+
+
+class StudentLedger(models.Model):
+    """Per-Student Fee Balance for an Academic Year (see finance/ledger.py)"""
+    
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.CASCADE,
+        related_name='fee_ledgers'
+    )
+    academic_year = models.ForeignKey(
+        AcademicYear,
+        on_delete=models.CASCADE,
+        related_name='fee_ledgers'
+    )
+    invoice_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    late_fee = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    discount_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'student_fee_ledgers'
+        verbose_name = _('Student Ledger')
+        verbose_name_plural = _('Student Ledgers')
+        unique_together = ['student', 'academic_year']
+        indexes = [models.Index(fields=['academic_year', 'balance'])]
+    
+    def __str__(self):
+        return f"{self.student.admission_number} - {self.academic_year.name}: {self.balance}"
+
+
+class FinanceRollup(models.Model):
+    """Daily Finance Totals per Metric and Category (see finance/analytics.py)"""
+    
+    class Metric(models.TextChoices):
+        BILLED = 'BILLED', _('Billed')
+        COLLECTED = 'COLLECTED', _('Collected')
+        EXPENSE = 'EXPENSE', _('Expense')
+    
+    date = models.DateField()
+    metric = models.CharField(max_length=20, choices=Metric.choices)
+    category = models.CharField(max_length=20, blank=True, default='')
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'finance_rollups'
+        verbose_name = _('Finance Rollup')
+        verbose_name_plural = _('Finance Rollups')
+        unique_together = ['metric', 'date', 'category']
+        ordering = ['date', 'metric', 'category']
+    
+    def __str__(self):
+        return f"{self.date} {self.metric} {self.category}: {self.amount}"
+
+
+class BankStatement(models.Model):
+    """Uploaded Bank Statement for Reconciliation (see finance/reconciliation.py)"""
+    
+    class StatementFormat(models.TextChoices):
+        CSV = 'CSV', _('CSV')
+        MT940 = 'MT940', _('MT940')
+    
+    class StatementStatus(models.TextChoices):
+        PENDING = 'PENDING', _('Pending')
+        PROCESSING = 'PROCESSING', _('Processing')
+        COMPLETED = 'COMPLETED', _('Completed')
+        FAILED = 'FAILED', _('Failed')
+    
+    file = models.FileField(upload_to='bank_statements/')
+    statement_format = models.CharField(
+        max_length=10,
+        choices=StatementFormat.choices,
+        default=StatementFormat.CSV
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=StatementStatus.choices,
+        default=StatementStatus.PENDING
+    )
+    lines_total = models.IntegerField(default=0)
+    lines_matched = models.IntegerField(default=0)
+    lines_unmatched = models.IntegerField(default=0)
+    amount_matched = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    error = models.TextField(blank=True, null=True)
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='bank_statements'
+    )
+    processed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'bank_statements'
+        verbose_name = _('Bank Statement')
+        verbose_name_plural = _('Bank Statements')
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.file.name} ({self.get_status_display()})"
+
+
+class StatementLine(models.Model):
+    """Bank Statement Line awaiting Manual Review"""
+    
+    class LineStatus(models.TextChoices):
+        UNMATCHED = 'UNMATCHED', _('Unmatched')
+        POSTED = 'POSTED', _('Posted')
+        IGNORED = 'IGNORED', _('Ignored')
+    
+    statement = models.ForeignKey(
+        BankStatement,
+        on_delete=models.CASCADE,
+        related_name='review_lines'
+    )
+    line_number = models.IntegerField()
+    value_date = models.DateField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    reference = models.CharField(max_length=100, blank=True, null=True)
+    description = models.TextField(blank=True, null=True)
+    reason = models.CharField(max_length=200)
+    status = models.CharField(
+        max_length=20,
+        choices=LineStatus.choices,
+        default=LineStatus.UNMATCHED
+    )
+    invoice = models.ForeignKey(
+        FeeInvoice,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='statement_lines',
+        help_text="Set by the reviewer before posting"
+    )
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='statement_lines'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'bank_statement_lines'
+        verbose_name = _('Statement Line')
+        verbose_name_plural = _('Statement Review Queue')
+        unique_together = ['statement', 'line_number']
+        ordering = ['statement', 'line_number']
+    
+    def __str__(self):
+        return f"Line {self.line_number}: {self.amount} {self.reference or ''}"
 
 
 class Discount(models.Model):
@@ -344,6 +555,7 @@ class Expense(models.Model):
         verbose_name = _('Expense')
         verbose_name_plural = _('Expenses')
         ordering = ['-date']
+        indexes = [models.Index(fields=['date'])]
     
     def __str__(self):
         return f"{self.title} - {self.amount}"
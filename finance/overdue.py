@@ -0,0 +1,102 @@
+"""
+Nightly invoice maintenance as set-based UPDATEs.
+
+* Late fees: an open invoice owes the late_fee_amount of each of its fee
+  structures once it is more than that structure's late_fee_after_days
+  past due. The owed amount is computed in SQL (one CASE branch per
+  distinct grace period) and written where it exceeds the stored fee.
+* Status: PAID / PARTIAL / OVERDUE / PENDING follow from the balance,
+  the paid amount and the due date, as in FeeInvoice.update_status().
+
+Both steps first read the rows they are about to change (for the log)
+and then change them with a single UPDATE ... CASE statement.
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .analytics import refresh_rollups
+from .ledger import refresh_ledgers
+from .models import FeeInvoice, FeeInvoiceItem, FeeStructure, FinanceRollup
+
+logger = logging.getLogger(__name__)
+
+Status = FeeInvoice.InvoiceStatus
+OPEN_STATUSES = [Status.PENDING, Status.PARTIAL, Status.OVERDUE]
+MONEY = DecimalField(max_digits=10, decimal_places=2)
+
+BALANCE = F('total_amount') + F('late_fee') - F('discount_amount') - F('paid_amount')
+
+
+def status_expression(today):
+    """The status an invoice should have on `today`, as a SQL CASE"""
+    return Case(
+        When(Q(paid_amount__gte=F('total_amount') + F('late_fee') - F('discount_amount')), then=Value(Status.PAID)),
+        When(paid_amount__gt=0, then=Value(Status.PARTIAL)),
+        When(due_date__lt=today, then=Value(Status.OVERDUE)),
+        default=Value(Status.PENDING),
+    )
+
+
+def late_fee_expression(today):
+    """Late fee an invoice owes on `today`, summed over its fee structures"""
+    graces = sorted(set(FeeStructure.objects.filter(
+        late_fee_amount__gt=0
+    ).values_list('late_fee_after_days', flat=True)))
+    owed = Value(Decimal('0.00'), output_field=MONEY)
+    for days in graces:
+        structures = FeeStructure.objects.filter(
+            academic_year=OuterRef('academic_year'),
+            class_name__current_students=OuterRef('student'),
+            fee_type__in=FeeInvoiceItem.objects.filter(invoice=OuterRef(OuterRef('pk'))).values('fee_type'),
+            late_fee_after_days=days,
+        ).order_by().values('late_fee_after_days').annotate(total=Sum('late_fee_amount')).values('total')
+        owed = owed + Case(
+            When(due_date__lt=today - timedelta(days=days), then=Coalesce(Subquery(structures), Value(Decimal('0.00')))),
+            default=Value(Decimal('0.00')),
+            output_field=MONEY,
+        )
+    return owed
+
+
+def apply_late_fees(today, dry_run=False):
+    """Raise late_fee on open, unpaid invoices past their grace periods"""
+    owed = late_fee_expression(today)
+    due = FeeInvoice.objects.filter(status__in=OPEN_STATUSES).alias(
+        balance=BALANCE, owed=owed
+    ).filter(balance__gt=0, late_fee__lt=F('owed'))
+    changes = list(due.annotate(new_late_fee=owed).values_list('invoice_number', 'late_fee', 'new_late_fee'))
+    if changes and not dry_run:
+        affected = list(due.values_list('student_id', 'invoice_date'))
+        due.update(late_fee=owed, updated_at=timezone.now())
+        refresh_ledgers({student_id for student_id, _day in affected})
+        refresh_rollups(FinanceRollup.Metric.BILLED, {day for _student_id, day in affected})
+    for number, old, new in changes:
+        logger.info("Late fee %s: %s -> %s", number, old, new)
+    return changes
+
+
+def update_statuses(today, dry_run=False):
+    """Move every non-cancelled invoice to the status its amounts imply"""
+    target = status_expression(today)
+    stale = FeeInvoice.objects.exclude(status=Status.CANCELLED).alias(target=target).exclude(status=F('target'))
+    changes = list(stale.annotate(new_status=target).values_list('invoice_number', 'status', 'new_status'))
+    if changes and not dry_run:
+        stale.update(status=target, updated_at=timezone.now())
+    for number, old, new in changes:
+        logger.info("Status %s: %s -> %s", number, old, new)
+    return changes
+
+
+def run_nightly(today=None, dry_run=False):
+    """Late fees first, so invoices they reopen get the right status"""
+    today = today or timezone.localdate()
+    with transaction.atomic():
+        late_fees = apply_late_fees(today, dry_run=dry_run)
+        statuses = update_statuses(today, dry_run=dry_run)
+    return late_fees, statuses
@@ -0,0 +1,230 @@
+"""
+Monthly payroll run.
+
+Salary.save() computes net pay one row at a time, so month-end payroll
+used to be an admin edit per employee. run_payroll() builds every
+Salary row for a month in memory and writes them with a single
+bulk_create:
+
+    1 query   active staff employed during the month
+    1 query   salaries already recorded for the month
+    1 query   ABSENT / HALF_DAY staff attendance in the month
+    1 query   approved unpaid leave overlapping the month
+    1 query   INSERT ... ON CONFLICT (staff, month, year) DO UPDATE
+
+Deductions are a day rate (basic salary / days in the month) times the
+unpaid days: ABSENT attendance (HALF_DAY counts half), approved leave of
+a LeaveType with is_paid=False, and days before joining or after
+leaving. A day that is both absent and on unpaid leave is counted once.
+
+Re-running a month recomputes PENDING salaries in place and keeps their
+allowances and bonus; PAID and CANCELLED salaries are never touched.
+run_payroll() reads the month's salaries with select_for_update() and
+upserts in the same transaction, so a salary marked PAID while the run
+is computing is not overwritten.
+"""
+import calendar
+import csv
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Q
+
+from staff.models import Leave, Staff, StaffAttendance
+from .models import Payment, Salary
+
+CENT = Decimal('0.01')
+HALF = Decimal('0.5')
+ABSENCE_WEIGHT = {
+    StaffAttendance.AttendanceStatus.ABSENT: Decimal('1'),
+    StaffAttendance.AttendanceStatus.HALF_DAY: HALF,
+}
+
+
+@dataclass
+class PayrollResult:
+    month: date
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    total_net: Decimal = Decimal('0.00')
+    total_deductions: Decimal = Decimal('0.00')
+    salaries: list = field(default_factory=list)
+
+
+def month_bounds(month):
+    first = month.replace(day=1)
+    return first, first.replace(day=calendar.monthrange(first.year, first.month)[1])
+
+
+def _days(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def unpaid_days(staff_ids, first, last):
+    """{staff_id: {date: weight}} of the month's unpaid days per employee"""
+    unpaid = {}
+    absences = StaffAttendance.objects.filter(
+        staff_id__in=staff_ids,
+        date__range=(first, last),
+        status__in=list(ABSENCE_WEIGHT),
+    ).values_list('staff_id', 'date', 'status')
+    for staff_id, day, status in absences:
+        unpaid.setdefault(staff_id, {})[day] = ABSENCE_WEIGHT[status]
+
+    leaves = Leave.objects.filter(
+        staff_id__in=staff_ids,
+        status=Leave.LeaveStatus.APPROVED,
+        leave_type__is_paid=False,
+        start_date__lte=last,
+        end_date__gte=first,
+    ).values_list('staff_id', 'start_date', 'end_date')
+    for staff_id, start, end in leaves:
+        days = unpaid.setdefault(staff_id, {})
+        for day in _days(max(start, first), min(end, last)):
+            days[day] = Decimal('1')
+    return unpaid
+
+
+def _remarks(absent, not_employed):
+    parts = []
+    if absent:
+        parts.append(f"absent/unpaid leave {absent.normalize()}d")
+    if not_employed:
+        parts.append(f"not employed {not_employed}d")
+    return "Payroll deductions: " + ", ".join(parts) if parts else None
+
+
+def build_payroll(month, campus=None, user=None, lock=False):
+    """
+    PayrollResult holding the unsaved Salary rows for `month` (any date
+    in it). Employees whose salary is already PAID or CANCELLED are
+    counted as skipped. With `lock`, the month's existing salaries stay
+    locked until the caller's transaction ends.
+    """
+    first, last = month_bounds(month)
+    days_in_month = Decimal(last.day)
+
+    staff = Staff.objects.filter(
+        Q(leaving_date__isnull=True) | Q(leaving_date__gte=first),
+        is_active=True,
+        joining_date__lte=last,
+    )
+    if campus is not None:
+        staff = staff.filter(campus=campus)
+    staff = list(staff.order_by('pk').values_list(
+        'pk', 'basic_salary', 'joining_date', 'leaving_date', 'bank_account_number'
+    ))
+    staff_ids = [row[0] for row in staff]
+
+    salaries = Salary.objects.filter(staff_id__in=staff_ids, month=first.month, year=first.year)
+    if lock:
+        salaries = salaries.select_for_update()
+    existing = {
+        staff_id: (status, allowances, bonus)
+        for staff_id, status, allowances, bonus in salaries.values_list('staff_id', 'status', 'allowances', 'bonus')
+    }
+    unpaid = unpaid_days(staff_ids, first, last)
+
+    result = PayrollResult(month=first)
+    for staff_id, basic, joined, left, account in staff:
+        status, allowances, bonus = existing.get(staff_id, (None, Decimal('0'), Decimal('0')))
+        if status in (Salary.SalaryStatus.PAID, Salary.SalaryStatus.CANCELLED):
+            result.skipped += 1
+            continue
+
+        employed_from = max(joined, first)
+        employed_to = min(left, last) if left else last
+        days = {day: weight for day, weight in unpaid.get(staff_id, {}).items() if employed_from <= day <= employed_to}
+        absent = sum(days.values(), Decimal('0'))
+        not_employed = (employed_from - first).days + (last - employed_to).days
+
+        day_rate = basic / days_in_month
+        deductions = min(((absent + not_employed) * day_rate).quantize(CENT, ROUND_HALF_UP), basic)
+        salary = Salary(
+            staff_id=staff_id,
+            month=first.month,
+            year=first.year,
+            basic_salary=basic,
+            allowances=allowances,
+            bonus=bonus,
+            deductions=deductions,
+            # bulk_create skips Salary.save(), which computes this
+            net_salary=basic + allowances + bonus - deductions,
+            payment_method=Payment.PaymentMethod.BANK_TRANSFER if account else Payment.PaymentMethod.CASH,
+            status=Salary.SalaryStatus.PENDING,
+            remarks=_remarks(absent, not_employed),
+            processed_by=user,
+        )
+        result.salaries.append(salary)
+        if staff_id in existing:
+            result.updated += 1
+        else:
+            result.created += 1
+        result.total_net += salary.net_salary
+        result.total_deductions += deductions
+    return result
+
+
+def run_payroll(month, campus=None, user=None, dry_run=False):
+    """Create or refresh the month's PENDING salaries in one statement"""
+    with transaction.atomic():
+        result = build_payroll(month, campus, user, lock=not dry_run)
+        if result.salaries and not dry_run:
+            Salary.objects.bulk_create(
+                result.salaries,
+                update_conflicts=True,
+                unique_fields=['staff', 'month', 'year'],
+                update_fields=[
+                    'basic_salary', 'deductions', 'net_salary', 'payment_method',
+                    'remarks', 'processed_by', 'updated_at'
+                ],
+                batch_size=1000,
+            )
+    return result
+
+
+BANK_FILE_HEADERS = ['Employee ID', 'Account Title', 'Bank', 'Account Number', 'Branch Code', 'Amount', 'Reference']
+
+
+def bank_transfer_rows(salaries):
+    """
+    Rows of the bank transfer file for `salaries` (a queryset). Only
+    PENDING bank-transfer salaries with an account number are included.
+    """
+    rows = salaries.filter(
+        status=Salary.SalaryStatus.PENDING,
+        payment_method=Payment.PaymentMethod.BANK_TRANSFER,
+        net_salary__gt=0,
+    ).exclude(staff__bank_account_number__isnull=True).exclude(staff__bank_account_number='').order_by(
+        'staff__employee_id'
+    ).values_list(
+        'staff__employee_id', 'staff__user__first_name', 'staff__user__last_name', 'staff__bank_name',
+        'staff__bank_account_number', 'staff__bank_ifsc_code', 'net_salary', 'month', 'year'
+    )
+    for employee_id, first_name, last_name, bank, account, branch, amount, month, year in rows.iterator():
+        yield [
+            employee_id,
+            f"{first_name} {last_name}".strip(),
+            bank or '',
+            account,
+            branch or '',
+            f"{amount:.2f}",
+            f"SAL-{year}{month:02d}-{employee_id}",
+        ]
+
+
+def write_bank_file(fileobj, salaries):
+    """Write the bank transfer CSV for `salaries` to a text file object"""
+    writer = csv.writer(fileobj)
+    writer.writerow(BANK_FILE_HEADERS)
+    count = 0
+    for row in bank_transfer_rows(salaries):
+        writer.writerow(row)
+        count += 1
+    return count
@@ -0,0 +1,157 @@
+"""
+Payment posting.
+
+Payment.save() recomputes an invoice's paid amount from all of its
+payments and then saves the whole invoice again. Posting through this
+module instead writes the payment with one UPDATE and one INSERT:
+
+    UPDATE fee_invoices
+       SET paid_amount = paid_amount + %s,
+           status = CASE WHEN paid_amount + %s >= <amount due> THEN 'PAID' ELSE 'PARTIAL' END
+     WHERE id = %s AND status <> 'CANCELLED'
+
+and then, in the same transaction, brings the read models up to date:
+
+    3 queries   refresh_ledgers(): the student's StudentLedger rows
+                (aggregate, upsert, delete emptied years)
+    3 queries   refresh_rollups(): the COLLECTED FinanceRollup rows of
+                the payment date (delete, aggregate, insert)
+
+so one payment costs eight statements. post_payments() writes a batch
+with the same statements plus a SELECT ... FOR UPDATE, each repeated per
+`batch_size` rows rather than per payment.
+
+The UPDATE takes the invoice's row lock before the payment row is
+written, so concurrent postings to one invoice queue behind each other
+and neither increment is lost. post_payments() does the same for a
+batch, locking the invoices in primary-key order so two batches cannot
+deadlock on each other.
+"""
+import secrets
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .analytics import refresh_rollups
+from .ledger import refresh_ledgers
+from .models import FeeInvoice, FinanceRollup, Payment
+
+Status = FeeInvoice.InvoiceStatus
+AMOUNT_DUE = F('total_amount') + F('late_fee') - F('discount_amount')
+
+
+class PostingError(Exception):
+    pass
+
+
+@dataclass
+class PaymentEntry:
+    """One payment to post in bulk, e.g. a line of a bank statement"""
+    invoice_id: int
+    amount: Decimal
+    payment_method: str = Payment.PaymentMethod.BANK_TRANSFER
+    payment_date: object = None
+    transaction_id: str = None
+    remarks: str = None
+
+
+def receipt_number(payment_date):
+    return f"RCP-{payment_date:%Y%m%d}-{secrets.token_hex(4).upper()}"
+
+
+def _status_after(increment):
+    return Case(
+        When(paid_amount__gte=AMOUNT_DUE - increment, then=Value(Status.PAID)),
+        default=Value(Status.PARTIAL),
+    )
+
+
+def post_payment(invoice, amount, payment_method=Payment.PaymentMethod.CASH, payment_date=None,
+                 received_by=None, **fields):
+    """Record one completed payment against `invoice` (an instance or id)"""
+    invoice_id = getattr(invoice, 'pk', invoice)
+    amount = Decimal(amount)
+    if amount <= 0:
+        raise PostingError("Payment amount must be positive")
+    payment_date = payment_date or timezone.localdate()
+
+    with transaction.atomic():
+        updated = FeeInvoice.objects.filter(pk=invoice_id).exclude(status=Status.CANCELLED).update(
+            paid_amount=F('paid_amount') + amount,
+            status=_status_after(amount),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            raise PostingError(f"Invoice {invoice_id} does not exist or is cancelled")
+        payment = Payment(
+            receipt_number=fields.pop('receipt_number', None) or receipt_number(payment_date),
+            invoice_id=invoice_id,
+            amount=amount,
+            payment_date=payment_date,
+            payment_method=payment_method,
+            payment_status=Payment.PaymentStatus.COMPLETED,
+            received_by=received_by,
+            **fields
+        )
+        # bulk_create skips Payment.save(), which would re-aggregate.
+        Payment.objects.bulk_create([payment])
+        refresh_ledgers(FeeInvoice.objects.filter(pk=invoice_id).values('student_id'))
+        refresh_rollups(FinanceRollup.Metric.COLLECTED, [payment_date])
+    return payment
+
+
+def post_payments(entries, received_by=None, batch_size=500):
+    """
+    Post many PaymentEntry objects in one transaction. Returns
+    (payments, rejected) where rejected entries point at missing or
+    cancelled invoices or carry a non-positive amount.
+    """
+    today = timezone.localdate()
+    entries = list(entries)
+    rejected = [entry for entry in entries if Decimal(entry.amount) <= 0]
+    entries = [entry for entry in entries if Decimal(entry.amount) > 0]
+
+    payments = []
+    with transaction.atomic():
+        invoice_ids = sorted({entry.invoice_id for entry in entries})
+        open_ids = set()
+        for start in range(0, len(invoice_ids), batch_size):
+            open_ids.update(FeeInvoice.objects.select_for_update().filter(
+                pk__in=invoice_ids[start:start + batch_size]
+            ).exclude(status=Status.CANCELLED).order_by('pk').values_list('pk', flat=True))
+        rejected += [entry for entry in entries if entry.invoice_id not in open_ids]
+        entries = [entry for entry in entries if entry.invoice_id in open_ids]
+
+        totals = {}
+        for entry in entries:
+            totals[entry.invoice_id] = totals.get(entry.invoice_id, Decimal('0')) + Decimal(entry.amount)
+        ids = sorted(totals)
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            increment = Case(*(When(pk=pk, then=Value(totals[pk])) for pk in chunk), default=Value(Decimal('0')))
+            FeeInvoice.objects.filter(pk__in=chunk).update(
+                paid_amount=F('paid_amount') + increment,
+                status=_status_after(increment),
+                updated_at=timezone.now(),
+            )
+
+        for entry in entries:
+            payment_date = entry.payment_date or today
+            payments.append(Payment(
+                receipt_number=receipt_number(payment_date),
+                invoice_id=entry.invoice_id,
+                amount=Decimal(entry.amount),
+                payment_date=payment_date,
+                payment_method=entry.payment_method,
+                payment_status=Payment.PaymentStatus.COMPLETED,
+                transaction_id=entry.transaction_id,
+                remarks=entry.remarks,
+                received_by=received_by,
+            ))
+        Payment.objects.bulk_create(payments, batch_size=batch_size)
+        refresh_ledgers(FeeInvoice.objects.filter(pk__in=ids).values_list('student_id', flat=True))
+        refresh_rollups(FinanceRollup.Metric.COLLECTED, {payment.payment_date for payment in payments})
+    return payments, rejected
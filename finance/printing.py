@@ -0,0 +1,327 @@
+"""
+Batch printing of fee challans and payment receipts.
+
+A batch is loaded from the database in chunks of plain dicts (two
+queries per chunk) and drawn with ReportLab's canvas:
+
+    fmt='zip'   one PDF per invoice/payment, rendered in a pool of forked
+                worker processes and written into the ZIP in order as
+                each chunk comes back
+    fmt='pdf'   one combined PDF drawn page by page in this process; a
+                PDF can only be assembled by one writer, so this mode
+                trades the pool for a single file to send to the printer
+
+At most `workers * 2` chunks are in flight, so memory stays bounded by
+the chunk size rather than the batch size. Campus logos and fonts are
+cached per process by utils/pdf.py.
+"""
+import io
+import multiprocessing
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Prefetch
+from reportlab.lib.pagesizes import A4, A5, landscape
+from reportlab.pdfgen import canvas
+
+from utils.pdf import campus_details, draw_header, fit, fonts
+from .models import FeeInvoice, FeeInvoiceItem, Payment
+
+CHALLAN = 'challan'
+RECEIPT = 'receipt'
+FORMATS = ('pdf', 'zip')
+CHALLAN_COPIES = ('Bank Copy', 'School Copy', 'Student Copy')
+MARGIN = 18
+GUTTER = 12
+# Print order of each kind; print_batch() chunks the ids in this order
+# so a combined PDF runs class by class across chunks, not just within one.
+ORDERING = {
+    CHALLAN: ('student__current_class__numeric_value', 'student__section__name', 'student__admission_number', 'pk'),
+    RECEIPT: ('payment_date', 'pk'),
+}
+
+
+# Loading ----------------------------------------------------------------
+
+def load_challans(invoice_ids, campuses=None):
+    """Plain dicts (picklable for the worker processes) for `invoice_ids`"""
+    campuses = {} if campuses is None else campuses
+    invoices = FeeInvoice.objects.filter(pk__in=invoice_ids).select_related(
+        'student__user', 'student__current_class', 'student__section', 'student__campus', 'academic_year'
+    ).prefetch_related(
+        Prefetch('items', queryset=FeeInvoiceItem.objects.select_related('fee_type').order_by('pk'))
+    ).order_by(*ORDERING[CHALLAN])
+    documents = []
+    for invoice in invoices:
+        student = invoice.student
+        documents.append({
+            'filename': f"{invoice.invoice_number}.pdf",
+            'campus': campus_details(student.campus, campuses),
+            'invoice_number': invoice.invoice_number,
+            'invoice_date': invoice.invoice_date,
+            'due_date': invoice.due_date,
+            'academic_year': invoice.academic_year.name,
+            'student_name': student.user.get_full_name(),
+            'admission_number': student.admission_number,
+            'father_name': student.father_name,
+            'class_name': student.current_class.name if student.current_class else '-',
+            'section': student.section.name if student.section else '-',
+            'items': [(item.description or item.fee_type.name, item.amount) for item in invoice.items.all()],
+            'total_amount': invoice.total_amount,
+            'discount_amount': invoice.discount_amount,
+            'late_fee': invoice.late_fee,
+            'paid_amount': invoice.paid_amount,
+            'balance': invoice.balance_amount,
+        })
+    return documents
+
+
+def load_receipts(payment_ids, campuses=None):
+    campuses = {} if campuses is None else campuses
+    payments = Payment.objects.filter(pk__in=payment_ids).select_related(
+        'invoice__student__user', 'invoice__student__current_class', 'invoice__student__section',
+        'invoice__student__campus', 'received_by'
+    ).order_by(*ORDERING[RECEIPT])
+    documents = []
+    for payment in payments:
+        invoice = payment.invoice
+        student = invoice.student
+        documents.append({
+            'filename': f"{payment.receipt_number}.pdf",
+            'campus': campus_details(student.campus, campuses),
+            'receipt_number': payment.receipt_number,
+            'payment_date': payment.payment_date,
+            'amount': payment.amount,
+            'payment_method': payment.get_payment_method_display(),
+            'transaction_id': payment.transaction_id or payment.cheque_number or '',
+            'invoice_number': invoice.invoice_number,
+            'student_name': student.user.get_full_name(),
+            'admission_number': student.admission_number,
+            'class_name': student.current_class.name if student.current_class else '-',
+            'section': student.section.name if student.section else '-',
+            'balance': invoice.balance_amount,
+            'received_by': payment.received_by.get_full_name() if payment.received_by else '',
+        })
+    return documents
+
+
+LOADERS = {CHALLAN: load_challans, RECEIPT: load_receipts}
+
+
+# Drawing ----------------------------------------------------------------
+
+def money(value):
+    return f"{value:,.2f}"
+
+
+def _row(pdf, x, y, width, label, value, font, size=7.5):
+    pdf.setFont(font, size)
+    pdf.drawString(x, y, fit(label, font, size, width * 0.65))
+    pdf.drawRightString(x + width, y, value)
+
+
+def draw_challan_copy(pdf, doc, copy, x, top, width):
+    regular, bold = fonts()
+    y = draw_header(pdf, doc['campus'], x, top, width)
+
+    pdf.setFillGray(0.9)
+    pdf.rect(x, y - 14, width, 14, stroke=0, fill=1)
+    pdf.setFillGray(0)
+    pdf.setFont(bold, 8.5)
+    pdf.drawString(x + 4, y - 10, "FEE CHALLAN")
+    pdf.drawRightString(x + width - 4, y - 10, copy.upper())
+    y -= 28
+
+    details = [
+        ("Challan No", doc['invoice_number']),
+        ("Issue Date", f"{doc['invoice_date']:%d %b %Y}"),
+        ("Due Date", f"{doc['due_date']:%d %b %Y}"),
+        ("Academic Year", doc['academic_year']),
+        ("Student", doc['student_name']),
+        ("Admission No", doc['admission_number']),
+        ("Father Name", doc['father_name']),
+        ("Class / Section", f"{doc['class_name']} / {doc['section']}"),
+    ]
+    for label, value in details:
+        pdf.setFont(regular, 7.5)
+        pdf.drawString(x, y, label)
+        pdf.setFont(bold, 7.5)
+        pdf.drawString(x + 72, y, fit(value, bold, 7.5, width - 72))
+        y -= 11
+
+    y -= 4
+    pdf.line(x, y + 8, x + width, y + 8)
+    pdf.setFont(bold, 7.5)
+    pdf.drawString(x, y, "Particulars")
+    pdf.drawRightString(x + width, y, "Amount (PKR)")
+    y -= 4
+    pdf.line(x, y, x + width, y)
+    y -= 10
+    for label, amount in doc['items']:
+        _row(pdf, x, y, width, label, money(amount), regular)
+        y -= 10
+    y -= 2
+    pdf.line(x, y + 7, x + width, y + 7)
+    _row(pdf, x, y - 2, width, "Total", money(doc['total_amount']), bold)
+    y -= 12
+    for label, key in (("Discount", 'discount_amount'), ("Late Fee", 'late_fee'), ("Paid", 'paid_amount')):
+        if doc[key]:
+            sign = '-' if key != 'late_fee' else '+'
+            _row(pdf, x, y - 2, width, label, f"{sign} {money(doc[key])}", regular)
+            y -= 10
+    pdf.setFillGray(0.9)
+    pdf.rect(x, y - 8, width, 14, stroke=0, fill=1)
+    pdf.setFillGray(0)
+    _row(pdf, x + 4, y - 4, width - 8, "Payable", money(doc['balance']), bold, 9)
+
+    pdf.setFont(regular, 6.5)
+    pdf.drawString(x, MARGIN + 34, fit(
+        f"Please pay by {doc['due_date']:%d %b %Y}; late fee applies after the due date.", regular, 6.5, width
+    ))
+    pdf.line(x, MARGIN + 12, x + width * 0.42, MARGIN + 12)
+    pdf.line(x + width * 0.58, MARGIN + 12, x + width, MARGIN + 12)
+    pdf.drawString(x, MARGIN + 3, "Cashier")
+    pdf.drawRightString(x + width, MARGIN + 3, "Bank Stamp")
+
+
+def draw_challan(pdf, doc):
+    page_width, page_height = landscape(A4)
+    width = (page_width - 2 * MARGIN - 2 * GUTTER * 2) / len(CHALLAN_COPIES)
+    for index, copy in enumerate(CHALLAN_COPIES):
+        x = MARGIN + index * (width + GUTTER * 2)
+        draw_challan_copy(pdf, doc, copy, x, page_height - MARGIN, width)
+        if index:
+            pdf.saveState()
+            pdf.setDash(3, 3)
+            pdf.setStrokeGray(0.6)
+            pdf.line(x - GUTTER, MARGIN, x - GUTTER, page_height - MARGIN)
+            pdf.restoreState()
+    pdf.showPage()
+
+
+def draw_receipt(pdf, doc):
+    regular, bold = fonts()
+    page_width, page_height = landscape(A5)
+    x, width = MARGIN * 2, page_width - MARGIN * 4
+    y = draw_header(pdf, doc['campus'], x, page_height - MARGIN * 2, width)
+
+    pdf.setFont(bold, 14)
+    pdf.drawCentredString(page_width / 2, y - 8, "FEE RECEIPT")
+    y -= 34
+    rows = [
+        ("Receipt No", doc['receipt_number']),
+        ("Date", f"{doc['payment_date']:%d %b %Y}"),
+        ("Student", f"{doc['student_name']} ({doc['admission_number']})"),
+        ("Class / Section", f"{doc['class_name']} / {doc['section']}"),
+        ("Challan No", doc['invoice_number']),
+        ("Payment Method", doc['payment_method']),
+        ("Reference", doc['transaction_id'] or '-'),
+        ("Amount Received", f"PKR {money(doc['amount'])}"),
+        ("Balance Remaining", f"PKR {money(doc['balance'])}"),
+    ]
+    for label, value in rows:
+        pdf.setFont(regular, 10)
+        pdf.drawString(x, y, label)
+        pdf.setFont(bold, 10)
+        pdf.drawString(x + 120, y, fit(value, bold, 10, width - 120))
+        y -= 18
+
+    pdf.setFont(regular, 9)
+    pdf.line(page_width - MARGIN * 2 - 150, MARGIN * 2 + 12, page_width - MARGIN * 2, MARGIN * 2 + 12)
+    pdf.drawRightString(page_width - MARGIN * 2, MARGIN * 2, doc['received_by'] or "Received by")
+    pdf.showPage()
+
+
+PAGES = {
+    CHALLAN: (landscape(A4), draw_challan),
+    RECEIPT: (landscape(A5), draw_receipt),
+}
+
+
+def new_canvas(target, kind):
+    pagesize, _draw = PAGES[kind]
+    pdf = canvas.Canvas(target, pagesize=pagesize, pageCompression=1)
+    pdf.setTitle("Fee Challans" if kind == CHALLAN else "Fee Receipts")
+    return pdf
+
+
+def render_document(kind, doc):
+    """One challan or receipt as PDF bytes"""
+    buffer = io.BytesIO()
+    pdf = new_canvas(buffer, kind)
+    PAGES[kind][1](pdf, doc)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _render_chunk(kind, documents):
+    # Runs in a worker process
+    return [(doc['filename'], render_document(kind, doc)) for doc in documents]
+
+
+# Batches ----------------------------------------------------------------
+
+def _chunks(kind, ids, chunk_size):
+    campuses = {}
+    for start in range(0, len(ids), chunk_size):
+        yield LOADERS[kind](ids[start:start + chunk_size], campuses)
+
+
+def print_batch(kind, queryset, output, fmt='pdf', workers=None, chunk_size=100):
+    """
+    Render every invoice (CHALLAN) or payment (RECEIPT) in `queryset`
+    into `output`, a path or binary file object. Returns the number of
+    documents written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {FORMATS}")
+    ids = list(queryset.order_by(*ORDERING[kind]).values_list('pk', flat=True))
+    if fmt == 'pdf':
+        return _print_combined(kind, ids, output, chunk_size)
+    return _print_zip(kind, ids, output, workers or settings.CHALLAN_PRINT_WORKERS, chunk_size)
+
+
+def _print_combined(kind, ids, output, chunk_size):
+    pdf = new_canvas(output, kind)
+    draw = PAGES[kind][1]
+    count = 0
+    for documents in _chunks(kind, ids, chunk_size):
+        for doc in documents:
+            draw(pdf, doc)
+            count += 1
+    if not count:
+        pdf.showPage()
+    pdf.save()
+    return count
+
+
+def _print_zip(kind, ids, output, workers, chunk_size):
+    count = 0
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        def write(files):
+            nonlocal count
+            for filename, content in files:
+                archive.writestr(filename, content)
+                count += 1
+
+        if workers <= 1:
+            for documents in _chunks(kind, ids, chunk_size):
+                write(_render_chunk(kind, documents))
+            return count
+
+        # Forked workers inherit the app registry but must not share the
+        # parent's database connection; only the parent queries.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            pending = deque()
+            for documents in _chunks(kind, ids, chunk_size):
+                pending.append(pool.submit(_render_chunk, kind, documents))
+                if len(pending) >= workers * 2:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    return count
@@ -0,0 +1,382 @@
+"""
+Bank statement reconciliation.
+
+A statement is read as a stream (CSV export or MT940), one credit line at
+a time, so a 50k-line file never sits in memory. Matching runs against an
+in-memory index of the open invoices built with a single query up front:
+
+    invoice number  -> invoice
+    admission number -> the student's open invoices, oldest due first
+
+Lines are matched and posted in batches through post_payments(), so a
+batch costs a handful of queries whatever its size. Anything that cannot
+be matched with confidence is written to the review queue
+(StatementLine) for a person to resolve from the admin. Lines posted
+automatically are recorded there too, in the same transaction as their
+payment, so running a statement again never pays a line twice.
+"""
+import csv
+import io
+import logging
+import re
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BankStatement, FeeInvoice, Payment, StatementLine
+from .posting import AMOUNT_DUE, PaymentEntry, post_payments
+
+logger = logging.getLogger(__name__)
+
+Status = FeeInvoice.InvoiceStatus
+OPEN_STATUSES = [Status.PENDING, Status.PARTIAL, Status.OVERDUE]
+
+StatementRecord = namedtuple('StatementRecord', 'line_number value_date amount reference description')
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d-%b-%Y', '%d %b %Y', '%y%m%d')
+CSV_COLUMNS = {
+    'value_date': ('value date', 'date', 'transaction date', 'posting date', 'txn date'),
+    'amount': ('credit', 'amount', 'deposit', 'credit amount'),
+    'debit': ('debit', 'withdrawal', 'debit amount'),
+    'reference': ('reference', 'ref', 'ref no', 'transaction id', 'cheque no'),
+    'description': ('description', 'narration', 'details', 'particulars', 'remarks'),
+}
+TOKEN = re.compile(r'[A-Z0-9][A-Z0-9/_-]*[A-Z0-9]|[A-Z0-9]')
+LINE_REMARKS = re.compile(r'(\d+)\b')
+
+
+class StatementError(Exception):
+    pass
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise StatementError(f"Unrecognised date {value!r}")
+
+
+def parse_amount(value):
+    value = re.sub(r'[^\d.,-]', '', value or '')
+    if not value:
+        return Decimal('0')
+    try:
+        return Decimal(value.replace(',', ''))
+    except InvalidOperation:
+        raise StatementError(f"Unrecognised amount {value!r}")
+
+
+def _text_stream(fileobj):
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    return io.TextIOWrapper(fileobj, encoding='utf-8-sig', errors='replace', newline='')
+
+
+def parse_csv(fileobj):
+    """Yield the credit lines of a CSV statement export"""
+    reader = csv.DictReader(_text_stream(fileobj))
+    headers = {name.strip().lower(): name for name in reader.fieldnames or []}
+    columns = {}
+    for key, candidates in CSV_COLUMNS.items():
+        columns[key] = next((headers[name] for name in candidates if name in headers), None)
+    if not columns['value_date'] or not columns['amount']:
+        raise StatementError("CSV needs a date column and an amount or credit column")
+
+    for row in reader:
+        amount = parse_amount(row.get(columns['amount']))
+        if columns['debit'] and parse_amount(row.get(columns['debit'])) > 0 and amount <= 0:
+            continue
+        if amount <= 0:
+            continue
+        yield StatementRecord(
+            line_number=reader.line_num,
+            value_date=parse_date(row.get(columns['value_date'])),
+            amount=amount,
+            reference=(row.get(columns['reference']) or '').strip() if columns['reference'] else '',
+            description=(row.get(columns['description']) or '').strip() if columns['description'] else '',
+        )
+
+
+MT940_ENTRY = re.compile(
+    r'^:61:(?P<date>\d{6})(?:\d{4})?(?P<mark>R?[CD])[A-Z]?(?P<amount>\d+,\d{0,2})'
+    r'[A-Z]\w{3}(?P<reference>[^/]*)(?://(?P<bank_reference>.*))?'
+)
+
+
+def parse_mt940(fileobj):
+    """
+    Yield the credit lines of an MT940 statement. Each :61: statement
+    line is paired with the :86: narrative that follows it, which may
+    run over several lines.
+    """
+    pending = None
+    description = []
+    in_narrative = False
+
+    def emit():
+        match, line_number = pending
+        if match['mark'] not in ('C', 'RD'):
+            return None
+        return StatementRecord(
+            line_number=line_number,
+            value_date=parse_date(match['date']),
+            amount=Decimal(match['amount'].replace(',', '.')),
+            reference=(match['reference'] or match['bank_reference'] or '').strip(),
+            description=' '.join(description).strip(),
+        )
+
+    for line_number, line in enumerate(_text_stream(fileobj), start=1):
+        line = line.rstrip('\r\n')
+        if line.startswith(':'):
+            in_narrative = line.startswith(':86:')
+            if line.startswith(':61:'):
+                if pending and (record := emit()):
+                    yield record
+                match = MT940_ENTRY.match(line)
+                if not match:
+                    raise StatementError(f"Line {line_number}: malformed :61: entry")
+                pending, description = (match, line_number), []
+            elif in_narrative and pending:
+                description.append(line[4:])
+        elif in_narrative and pending:
+            description.append(line)
+    if pending and (record := emit()):
+        yield record
+
+
+PARSERS = {
+    BankStatement.StatementFormat.CSV: parse_csv,
+    BankStatement.StatementFormat.MT940: parse_mt940,
+}
+
+
+class OpenInvoice:
+    __slots__ = ('pk', 'number', 'balance')
+
+    def __init__(self, pk, number, balance):
+        self.pk = pk
+        self.number = number
+        self.balance = balance
+
+
+class InvoiceIndex:
+    """In-memory lookup of open invoices by invoice and admission number"""
+
+    def __init__(self, campus_id=None):
+        invoices = FeeInvoice.objects.filter(status__in=OPEN_STATUSES)
+        if campus_id:
+            invoices = invoices.filter(student__campus_id=campus_id)
+        rows = invoices.annotate(balance=AMOUNT_DUE - F('paid_amount')).order_by(
+            'due_date', 'pk'
+        ).values_list('pk', 'invoice_number', 'student__admission_number', 'balance')
+
+        self.by_number = {}
+        self.by_admission = {}
+        for pk, number, admission, balance in rows.iterator(chunk_size=5000):
+            invoice = OpenInvoice(pk, number, Decimal(balance))
+            self.by_number[number.upper()] = invoice
+            self.by_admission.setdefault(admission.upper(), []).append(invoice)
+
+    def match(self, record):
+        """Return (invoice, None) for a confident match or (None, reason)"""
+        tokens = TOKEN.findall(f"{record.reference} {record.description}".upper())
+
+        invoice = next((self.by_number[token] for token in tokens if token in self.by_number), None)
+        if invoice is None:
+            for token in tokens:
+                candidates = [inv for inv in self.by_admission.get(token, ()) if inv.balance > 0]
+                if not candidates:
+                    continue
+                exact = [inv for inv in candidates if inv.balance == record.amount]
+                if exact:
+                    invoice = exact[0]
+                elif len(candidates) == 1:
+                    invoice = candidates[0]
+                else:
+                    return None, f"Admission {token} has {len(candidates)} open invoices and none match the amount"
+                break
+        if invoice is None:
+            return None, "No open invoice or admission number found in the reference"
+        if record.amount > invoice.balance:
+            return None, f"Amount exceeds the balance of {invoice.number} ({invoice.balance})"
+        invoice.balance -= record.amount
+        return invoice, None
+
+
+def _review_line(statement, record, reason, status=StatementLine.LineStatus.UNMATCHED):
+    return StatementLine(
+        statement=statement,
+        line_number=record.line_number,
+        value_date=record.value_date,
+        amount=record.amount,
+        reference=record.reference[:100] or None,
+        description=record.description or None,
+        reason=reason[:200],
+        status=status,
+    )
+
+
+def posted_lines(statement):
+    """
+    Line numbers of `statement` that already have a payment: lines
+    recorded as posted, plus any payment whose remarks name one of its
+    lines (statements reconciled before posted lines were recorded).
+    """
+    posted = set(statement.review_lines.filter(
+        status=StatementLine.LineStatus.POSTED
+    ).values_list('line_number', flat=True))
+    prefix = f"Bank statement {statement.pk}, line "
+    for remarks in Payment.objects.filter(remarks__startswith=prefix).values_list('remarks', flat=True):
+        match = LINE_REMARKS.match(remarks[len(prefix):])
+        if match:
+            posted.add(int(match[1]))
+    return posted
+
+
+def _reconcile_batch(statement, records, index, seen_references, posted):
+    """Post one batch; returns (lines matched, amount matched, lines unmatched)"""
+    references = {record.reference for record in records if record.reference}
+    posted_references = set(Payment.objects.filter(
+        transaction_id__in=references
+    ).values_list('transaction_id', flat=True)) if references else set()
+
+    lines = []
+    matched = []
+    already = Decimal('0')
+    already_count = 0
+    for record in records:
+        if record.line_number in posted:
+            # Paid by an earlier run of this statement (or a reviewer)
+            already += record.amount
+            already_count += 1
+            continue
+        if record.reference and (record.reference in posted_references or record.reference in seen_references):
+            lines.append(_review_line(
+                statement, record, "Reference already posted", StatementLine.LineStatus.IGNORED
+            ))
+            continue
+        invoice, reason = index.match(record)
+        if invoice is None:
+            lines.append(_review_line(statement, record, reason))
+            continue
+        if record.reference:
+            seen_references.add(record.reference)
+        matched.append((record, PaymentEntry(
+            invoice_id=invoice.pk,
+            amount=record.amount,
+            payment_date=record.value_date,
+            transaction_id=record.reference[:100] or None,
+            remarks=f"Bank statement {statement.pk}, line {record.line_number}",
+        )))
+
+    with transaction.atomic():
+        payments, rejected = post_payments([entry for _record, entry in matched], received_by=statement.uploaded_by)
+        rejected = {id(entry) for entry in rejected}
+        paid = iter(payments)
+        for record, entry in matched:
+            if id(entry) in rejected:
+                lines.append(_review_line(statement, record, "Invoice is no longer open"))
+                continue
+            # Recorded in the same transaction as the payment, so a
+            # re-run skips the line instead of paying it twice.
+            line = _review_line(statement, record, "Matched automatically", StatementLine.LineStatus.POSTED)
+            line.invoice_id = entry.invoice_id
+            line.payment = next(paid)
+            lines.append(line)
+        StatementLine.objects.bulk_create(lines)
+    return (
+        already_count + len(payments),
+        already + sum((payment.amount for payment in payments), Decimal('0')),
+        sum(1 for line in lines if line.status == StatementLine.LineStatus.UNMATCHED),
+    )
+
+
+def reconcile_statement(statement, batch_size=500, campus_id=None):
+    """
+    Match and post every credit line of `statement`. Safe to run again
+    after a failure: lines of the statement that were already posted
+    are skipped (keyed on statement and line number), and lines whose
+    reference was posted elsewhere are queued as ignored instead of
+    being paid twice.
+    """
+    BankStatement.objects.filter(pk=statement.pk).update(
+        status=BankStatement.StatementStatus.PROCESSING, error=None, updated_at=timezone.now()
+    )
+    statement.review_lines.exclude(status=StatementLine.LineStatus.POSTED).delete()
+
+    index = InvoiceIndex(campus_id)
+    posted = posted_lines(statement)
+    seen_references = set()
+    totals = {'lines_total': 0, 'lines_matched': 0, 'lines_unmatched': 0, 'amount_matched': Decimal('0')}
+    parse = PARSERS[statement.statement_format]
+    try:
+        with statement.file.open('rb') as fileobj:
+            batch = []
+            for record in parse(fileobj):
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    _tally(totals, batch, *_reconcile_batch(statement, batch, index, seen_references, posted))
+                    batch = []
+            if batch:
+                _tally(totals, batch, *_reconcile_batch(statement, batch, index, seen_references, posted))
+    except Exception as exc:
+        logger.exception("Reconciling bank statement %s failed", statement.pk)
+        statement.status = BankStatement.StatementStatus.FAILED
+        statement.error = str(exc)
+    else:
+        statement.status = BankStatement.StatementStatus.COMPLETED
+        statement.processed_at = timezone.now()
+
+    for field, value in totals.items():
+        setattr(statement, field, value)
+    statement.save(update_fields=[
+        'status', 'error', 'processed_at', 'lines_total', 'lines_matched',
+        'lines_unmatched', 'amount_matched', 'updated_at'
+    ])
+    return statement
+
+
+def _tally(totals, batch, matched, amount, unmatched):
+    totals['lines_total'] += len(batch)
+    totals['lines_matched'] += matched
+    totals['lines_unmatched'] += unmatched
+    totals['amount_matched'] += amount
+
+
+def post_review_lines(lines, received_by=None):
+    """
+    Post queued lines that a reviewer has pointed at an invoice. Returns
+    the number posted; lines without an invoice are left in the queue.
+    """
+    lines = [line for line in lines if line.invoice_id and line.status == StatementLine.LineStatus.UNMATCHED]
+    entries = [
+        PaymentEntry(
+            invoice_id=line.invoice_id,
+            amount=line.amount,
+            payment_date=line.value_date,
+            transaction_id=line.reference,
+            remarks=f"Bank statement {line.statement_id}, line {line.line_number} (reviewed)",
+        )
+        for line in lines
+    ]
+    with transaction.atomic():
+        payments, rejected = post_payments(entries, received_by=received_by)
+        rejected = {id(entry) for entry in rejected}
+        posted = iter(payments)
+        updated = []
+        for line, entry in zip(lines, entries):
+            if id(entry) in rejected:
+                continue
+            line.payment = next(posted)
+            line.status = StatementLine.LineStatus.POSTED
+            line.updated_at = timezone.now()
+            updated.append(line)
+        StatementLine.objects.bulk_update(updated, ['payment', 'status', 'updated_at'])
+    return len(updated)
@@ -0,0 +1,68 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .analytics import refresh_rollups
+from .ledger import refresh_ledgers
+from .models import Expense, FeeInvoice, FinanceRollup, Payment
+
+Metric = FinanceRollup.Metric
+
+
+def remember_previous(instance, *fields):
+    # An edit may move a row to another student or day; the ledger and
+    # rollup rows it used to count towards need refreshing too.
+    instance._previous = None
+    if instance.pk:
+        instance._previous = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def previous(instance, field):
+    return (getattr(instance, '_previous', None) or {}).get(field)
+
+
+@receiver(pre_save, sender=FeeInvoice)
+def remember_previous_invoice(sender, instance, raw=False, **kwargs):
+    if not raw:
+        remember_previous(instance, 'student_id', 'invoice_date')
+
+
+@receiver(post_save, sender=FeeInvoice)
+def refresh_on_invoice_save(sender, instance, raw=False, **kwargs):
+    # Runs inside the saving transaction, so the ledger and rollups
+    # commit or roll back together with the invoice.
+    if raw:
+        return
+    refresh_ledgers({instance.student_id, previous(instance, 'student_id')} - {None})
+    refresh_rollups(Metric.BILLED, [instance.invoice_date, previous(instance, 'invoice_date')])
+
+
+@receiver(post_delete, sender=FeeInvoice)
+def refresh_on_invoice_delete(sender, instance, **kwargs):
+    refresh_ledgers([instance.student_id])
+    refresh_rollups(Metric.BILLED, [instance.invoice_date])
+
+
+@receiver(pre_save, sender=Payment)
+def remember_previous_payment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        remember_previous(instance, 'payment_date')
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def refresh_on_payment_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_rollups(Metric.COLLECTED, [instance.payment_date, previous(instance, 'payment_date')])
+
+
+@receiver(pre_save, sender=Expense)
+def remember_previous_expense(sender, instance, raw=False, **kwargs):
+    if not raw:
+        remember_previous(instance, 'date')
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+def refresh_on_expense_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_rollups(Metric.EXPENSE, [instance.date, previous(instance, 'date')])
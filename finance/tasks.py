@@ -0,0 +1,46 @@
+import tempfile
+from datetime import date, datetime
+
+from accounts.models import AcademicYear, User
+from communication.models import Notification
+from jobs.exports import save_export
+from jobs.queue import task
+from .billing import run_billing
+from .models import BankStatement, FeeInvoice, Payment
+from .printing import CHALLAN, print_batch
+from .reconciliation import reconcile_statement
+
+
+@task('finance.run_billing')
+def billing_run(academic_year_id, period, user_id=None, top_up=False):
+    """Queue-able billing run; a retry resumes from the run's checkpoint"""
+    run_billing(
+        AcademicYear.objects.select_related('campus').get(pk=academic_year_id),
+        date.fromisoformat(period),
+        user=User.objects.filter(pk=user_id).first(),
+        top_up=top_up,
+    )
+
+
+@task('finance.reconcile_statement')
+def reconcile_bank_statement(statement_id):
+    reconcile_statement(BankStatement.objects.get(pk=statement_id))
+
+
+@task('finance.print_batch')
+def print_batch_job(kind, ids, user_id, fmt='zip'):
+    """Print challans or receipts to private export storage and notify the user"""
+    model = FeeInvoice if kind == CHALLAN else Payment
+    label = 'challans' if kind == CHALLAN else 'receipts'
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    with tempfile.TemporaryFile() as handle:
+        count = print_batch(kind, model.objects.filter(pk__in=ids), handle, fmt=fmt)
+        handle.seek(0)
+        saved = save_export(user_id, f'fee_{label}_{timestamp}.{fmt}', handle)
+    Notification.objects.create(
+        user_id=user_id,
+        title=f'Fee {label} ready',
+        message=f'{count} fee {label} have been printed.',
+        notification_type=Notification.NotificationType.SUCCESS,
+        link=saved.get_absolute_url(),
+    )
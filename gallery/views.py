@@ -1,7 +1,6 @@
 from django.shortcuts import render
 from django.views.generic import ListView
 from gallery.models import Gallery, ImageType
-from utils import utils
 def gallery_page(request):
     return render(request, 'gallery.html')
 
@@ -20,6 +19,5 @@ class GalleryListView(ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context.update(utils.get_context())
         context['image_types'] = ImageType.objects.all()
         return context
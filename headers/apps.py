@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HeadersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'headers'
+
+    def ready(self):
+        from headers import signals  # noqa: F401
@@ -0,0 +1,76 @@
+import time
+
+from django.core.cache import cache
+
+from headers.models import SocialLink, MobileNumber, Phonenumber, SchoolTiming, LogoImage, WeeklyschoolTiming
+
+VERSION_KEY = "headers:site_context:version"
+CONTEXT_KEY = "headers:site_context:{version}"
+
+# Models whose rows make up the header/footer chrome of every public page.
+CHROME_MODELS = (SocialLink, MobileNumber, Phonenumber, SchoolTiming, LogoImage, WeeklyschoolTiming)
+
+CONTEXT_TIMEOUT = 60 * 60 * 24
+
+# Per-process (version, context) pair for the last context we built or fetched.
+_local = (None, None)
+
+
+def _new_version():
+    # Time based so a version key evicted from the shared cache never
+    # comes back with a value an older process still holds.
+    return time.time_ns()
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Invalidate every cached copy of the site context"""
+    global _local
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _new_version(), timeout=None)
+    _local = (None, None)
+
+
+def build_site_context():
+    """Load the header/footer rows straight from the database"""
+    return {
+        "social_links": list(SocialLink.objects.all()),
+        "mobile_numbers": MobileNumber.objects.filter(id=1).first(),
+        "phone_number": Phonenumber.objects.filter(id=1).first(),
+        "school_timing": SchoolTiming.objects.filter(id=1).first(),
+        "logo_image": LogoImage.objects.filter(id=1).first(),
+        "weekly_school_timings": list(WeeklyschoolTiming.objects.all()),
+    }
+
+
+def get_site_context():
+    """
+    Header/footer context for public pages.
+
+    Served from process memory while the shared version key is unchanged,
+    then from the shared cache, and only rebuilt from the database after
+    one of the header models has been saved or deleted.
+    """
+    global _local
+    version = get_version()
+    local_version, local_context = _local
+    if local_version == version:
+        return dict(local_context)
+
+    key = CONTEXT_KEY.format(version=version)
+    context = cache.get(key)
+    if context is None:
+        context = build_site_context()
+        cache.set(key, context, CONTEXT_TIMEOUT)
+
+    _local = (version, context)
+    return dict(context)
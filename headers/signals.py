@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from headers.cache import CHROME_MODELS, bump_version
+from headers.models import LogoImage
+from images.derivatives import derivatives_ready
+
+
+def invalidate_site_context(sender, **kwargs):
+    """Drop the cached header/footer context once an admin edit commits"""
+    transaction.on_commit(bump_version)
+
+
+for model in CHROME_MODELS:
+    post_save.connect(invalidate_site_context, sender=model, dispatch_uid=f"headers_site_context_save_{model.__name__}")
+    post_delete.connect(invalidate_site_context, sender=model, dispatch_uid=f"headers_site_context_delete_{model.__name__}")
+
+
+def refresh_logo(sender, name, **kwargs):
+    """New derivatives of the logo on show change its srcset in the header"""
+    if sender is LogoImage and LogoImage.objects.filter(id=1, logo=name).exists():
+        bump_version()
+
+
+derivatives_ready.connect(refresh_logo, dispatch_uid="headers_image_derivatives_ready")
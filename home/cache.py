@@ -0,0 +1,76 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+from sliders.models import Slider1, Slider2, Slider3
+from about.models import AboutModel
+from courses.models import CoursePage
+from teachers.models import Teacher
+from gallery.models import Gallery, ImageType
+from events.models import Event
+from blogs.models import Blog
+from headers import cache as headers_cache
+
+SECTION_KEY = "home:section:{name}:version"
+PAGE_KEY = "home:page:{etag}"
+PAGE_TIMEOUT = 60 * 60 * 24
+
+# Home page sections and the models each one is rendered from.
+SECTIONS = {
+    "slider": (Slider1, Slider2, Slider3),
+    "about": (AboutModel,),
+    "courses": (CoursePage,),
+    "teachers": (Teacher,),
+    "gallery": (Gallery, ImageType),
+    "events": (Event,),
+    "blogs": (Blog,),
+}
+
+
+def get_section_versions():
+    """Current version of every home page section, keyed by section name"""
+    keys = {SECTION_KEY.format(name=name): name for name in SECTIONS}
+    found = cache.get_many(keys)
+    versions = {}
+    for key, name in keys.items():
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+        versions[name] = found[key]
+    return versions
+
+
+def bump_section(name):
+    # Versions are nanosecond timestamps so they double as Last-Modified.
+    cache.set(SECTION_KEY.format(name=name), time.time_ns(), timeout=None)
+
+
+def get_page_state(request):
+    """
+    Section versions, ETag and Last-Modified for the home page.
+
+    Worked out once per request, since the conditional GET checks and
+    the page cache lookup all need it.
+    """
+    state = getattr(request, "_home_page_state", None)
+    if state is None:
+        versions = get_section_versions()
+        versions["headers"] = headers_cache.get_version()
+        signature = ":".join(f"{name}={versions[name]}" for name in sorted(versions))
+        state = {
+            "versions": versions,
+            "etag": hashlib.md5(signature.encode()).hexdigest(),
+            "last_modified": datetime.fromtimestamp(max(versions.values()) / 1e9, tz=timezone.utc),
+        }
+        request._home_page_state = state
+    return state
+
+
+def get_page(etag):
+    return cache.get(PAGE_KEY.format(etag=etag))
+
+
+def set_page(etag, content):
+    cache.set(PAGE_KEY.format(etag=etag), content, PAGE_TIMEOUT)
@@ -0,0 +1,37 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from gallery.models import Gallery
+from home.cache import SECTIONS, bump_section
+from images.derivatives import derivatives_ready
+
+
+def invalidate_section(sender, section, **kwargs):
+    """Re-render a home page section once the edit behind it commits"""
+    transaction.on_commit(partial(bump_section, section))
+
+
+for section, models in SECTIONS.items():
+    for model in models:
+        receiver = partial(invalidate_section, section=section)
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f"home_{section}_save_{model.__name__}")
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f"home_{section}_delete_{model.__name__}")
+
+m2m_changed.connect(
+    partial(invalidate_section, section="gallery"),
+    sender=Gallery.image_type.through,
+    weak=False,
+    dispatch_uid="home_gallery_image_type_changed",
+)
+
+
+def refresh_image_sections(sender, name, **kwargs):
+    """New derivatives of an image change the srcset markup of its own section"""
+    for section, models in SECTIONS.items():
+        if name and sender in models:
+            bump_section(section)
+
+
+derivatives_ready.connect(refresh_image_sections, dispatch_uid="home_image_derivatives_ready")
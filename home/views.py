@@ -1,4 +1,7 @@
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
 from sliders.models import Slider2, Slider1, Slider3
 from about.models import AboutModel
 from courses.models import CoursePage
@@ -6,9 +9,26 @@ from teachers.models import Teacher
 from gallery.models import Gallery, ImageType
 from events.models import Event
 from blogs.models import Blog
-from utils import utils
+from home import cache as home_cache
 
-def home_page(request):
+
+def _is_cacheable(request):
+    return request.method in ("GET", "HEAD") and not request.user.is_authenticated
+
+
+def home_etag(request):
+    if _is_cacheable(request):
+        return home_cache.get_page_state(request)["etag"]
+    return None
+
+
+def home_last_modified(request):
+    if _is_cacheable(request):
+        return home_cache.get_page_state(request)["last_modified"]
+    return None
+
+
+def render_home_page(request):
     slider1 = Slider1.objects.all()
     slider2 = Slider2.objects.all()
     slider3 = Slider3.objects.all()
@@ -16,11 +36,12 @@ def home_page(request):
     #about
     about = AboutModel.objects.all()
     course = CoursePage.objects.all()
-    teacher = Teacher.objects.all()
+    teacher = Teacher.objects.defer('description')
     gallery = Gallery.objects.prefetch_related('image_type')
     image_type = ImageType.objects.all()
-    events= Event.objects.all()
-    blogs=Blog.objects.all()
+    events= Event.objects.defer('description')
+    blogs=Blog.objects.defer('description')
+    # Querysets stay lazy so sections served from the fragment cache never hit the database
     return render(request, 'home.html', {
         "slider1": slider1,
         "slider2": slider2,
@@ -32,5 +53,22 @@ def home_page(request):
         "gallery_list": gallery,
         "events":events,
         "blogs":blogs,
-        **utils.get_context()
-    })
\ No newline at end of file
+        "section_versions": home_cache.get_page_state(request)["versions"],
+        "fragment_timeout": home_cache.PAGE_TIMEOUT,
+    })
+
+
+@condition(etag_func=home_etag, last_modified_func=home_last_modified)
+def home_page(request):
+    if not _is_cacheable(request):
+        return render_home_page(request)
+
+    state = home_cache.get_page_state(request)
+    content = home_cache.get_page(state["etag"])
+    if content is None:
+        response = render_home_page(request)
+        home_cache.set_page(state["etag"], response.content)
+    else:
+        response = HttpResponse(content)
+    patch_vary_headers(response, ["Cookie"])
+    return response
\ No newline at end of file
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_CACHE_KEY = "images:manifest:{name}"
+MANIFEST_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Image fields of the public apps that get responsive derivatives.
+IMAGE_FIELDS = {
+    "gallery.Gallery": ["image"],
+    "sliders.Slider1": ["image", "image2"],
+    "sliders.Slider2": ["image", "image2"],
+    "sliders.Slider3": ["image", "image2"],
+    "teachers.Teacher": ["image"],
+    "blogs.Blog": ["image"],
+    "events.Event": ["image"],
+    "courses.CoursePage": ["image"],
+    "about.AboutModel": ["image"],
+    "headers.LogoImage": ["logo"],
+}
+
+FORMATS = {
+    "webp": {"extension": "webp", "format": "WEBP", "options": {"quality": 75, "method": 4}},
+    "jpeg": {"extension": "jpg", "format": "JPEG", "options": {"quality": 80, "optimize": True, "progressive": True}},
+}
+
+# Sent with `name` once derivatives for a stored image have been written,
+# so pages that cache rendered HTML can pick up the new srcset. The sender
+# is the model the image belongs to (None when not known).
+derivatives_ready = Signal()
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+            thread_name_prefix="image-derivatives",
+        )
+    return _executor
+
+
+def derivative_name(name, width, fmt):
+    """gallery/photo.jpg -> gallery/photo_w640.webp, beside the original"""
+    root, _ext = os.path.splitext(name)
+    return f"{root}_w{width}.{FORMATS[fmt]['extension']}"
+
+
+def manifest_name(name):
+    root, _ext = os.path.splitext(name)
+    return f"{root}.derivatives.json"
+
+
+def _flatten(image):
+    # JPEG has no alpha channel, so transparent logos/PNGs go onto white.
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _save(name, content):
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(content))
+
+
+def generate_derivatives(name, force=False, sender=None):
+    """
+    Write fixed-width WebP/JPEG copies of the stored image `name` and a
+    JSON manifest describing them. Widths wider than the original are
+    skipped, so small images simply keep serving the original. `sender`,
+    the model the image belongs to, is passed on to derivatives_ready.
+    """
+    if not name:
+        return None
+    manifest_path = manifest_name(name)
+    if not force and default_storage.exists(manifest_path):
+        return None
+
+    with default_storage.open(name, "rb") as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image = _flatten(image)
+
+    manifest = {"width": image.width, "height": image.height, "derivatives": {fmt: {} for fmt in FORMATS}}
+    for width in settings.IMAGE_DERIVATIVE_WIDTHS:
+        if width >= image.width:
+            continue
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for fmt, spec in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, spec["format"], **spec["options"])
+            stored = _save(derivative_name(name, width, fmt), buffer.getvalue())
+            manifest["derivatives"][fmt][str(width)] = stored
+
+    _save(manifest_path, json.dumps(manifest).encode())
+    cache.set(MANIFEST_CACHE_KEY.format(name=name), manifest, MANIFEST_CACHE_TIMEOUT)
+    derivatives_ready.send(sender=sender, name=name)
+    return manifest
+
+
+def _generate_logged(name, force=False, sender=None):
+    try:
+        return generate_derivatives(name, force=force, sender=sender)
+    except Exception:
+        logger.exception("Could not build image derivatives for %s", name)
+        return None
+
+
+def schedule_derivatives(name, force=False, sender=None):
+    """Build derivatives for `name` on the background worker pool"""
+    return get_executor().submit(_generate_logged, name, force, sender)
+
+
+def get_manifest(name):
+    """Manifest for a stored image, or None until its derivatives exist"""
+    if not name:
+        return None
+    key = MANIFEST_CACHE_KEY.format(name=name)
+    manifest = cache.get(key)
+    if manifest is None:
+        try:
+            with default_storage.open(manifest_name(name), "rb") as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            # Not generated yet; remember that briefly instead of
+            # touching storage on every render.
+            cache.set(key, {}, 60)
+            return None
+        cache.set(key, manifest, MANIFEST_CACHE_TIMEOUT)
+    return manifest or None
+
+
+def srcset(name, fmt="jpeg"):
+    manifest = get_manifest(name)
+    if not manifest:
+        return ""
+    entries = [
+        f"{default_storage.url(path)} {width}w"
+        for width, path in sorted(manifest["derivatives"].get(fmt, {}).items(), key=lambda item: int(item[0]))
+    ]
+    if entries:
+        # The original closes the set so wide viewports still get full resolution.
+        entries.append(f"{default_storage.url(name)} {manifest['width']}w")
+    return ", ".join(entries)
@@ -0,0 +1,34 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from images.derivatives import IMAGE_FIELDS, generate_derivatives, get_executor
+
+
+class Command(BaseCommand):
+    help = 'Build responsive WebP/JPEG derivatives for every uploaded public image'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild derivatives that already exist')
+
+    def handle(self, *args, **options):
+        names = {}
+        for label, fields in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for row in model.objects.values_list(*fields):
+                names.update((name, model) for name in row if name)
+
+        self.stdout.write(f'Building derivatives for {len(names)} images...')
+        executor = get_executor()
+        futures = {
+            executor.submit(generate_derivatives, name, options['force'], names[name]): name
+            for name in sorted(names)
+        }
+        built = failed = 0
+        for future, name in futures.items():
+            try:
+                if future.result():
+                    built += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'   {name}: {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Built {built}, skipped {len(names) - built - failed}, failed {failed}'))
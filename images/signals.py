@@ -0,0 +1,25 @@
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from images.derivatives import IMAGE_FIELDS, schedule_derivatives
+
+
+def build_image_derivatives(sender, instance, fields, **kwargs):
+    """Queue derivative generation for uploaded images once the row commits"""
+    for field in fields:
+        name = getattr(instance, field).name
+        if name:
+            transaction.on_commit(partial(schedule_derivatives, name, sender=sender))
+
+
+for label, fields in IMAGE_FIELDS.items():
+    model = apps.get_model(label)
+    post_save.connect(
+        partial(build_image_derivatives, fields=fields),
+        sender=model,
+        weak=False,
+        dispatch_uid=f"images_derivatives_{label}",
+    )
@@ -0,0 +1,26 @@
+from django import template
+
+from images.derivatives import srcset as build_srcset
+
+register = template.Library()
+
+
+@register.filter
+def srcset(fieldfile, fmt="jpeg"):
+    """srcset value for an ImageField, e.g. {{ blog.image|srcset:"webp" }}"""
+    if not fieldfile:
+        return ""
+    return build_srcset(fieldfile.name, fmt)
+
+
+@register.inclusion_tag("images/picture.html")
+def picture(fieldfile, sizes="100vw", css_class="", alt=""):
+    """<picture> serving WebP/JPEG derivatives with the original as fallback"""
+    return {
+        "image": fieldfile,
+        "webp_srcset": srcset(fieldfile, "webp"),
+        "jpeg_srcset": srcset(fieldfile, "jpeg"),
+        "sizes": sizes,
+        "css_class": css_class,
+        "alt": alt,
+    }
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import Export, Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'attempts', 'run_after', 'locked_by', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'dedup_key')
+    readonly_fields = ('created_at', 'updated_at', 'locked_at', 'locked_by', 'finished_at', 'last_error')
+
+
+@admin.register(Export)
+class ExportAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'user', 'created_at')
+    search_fields = ('filename', 'user__username')
+    readonly_fields = ('user', 'token', 'name', 'filename', 'created_at')
+    
+    def has_add_permission(self, request):
+        return False
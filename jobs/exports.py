@@ -0,0 +1,25 @@
+"""
+Private storage for files produced by background jobs.
+
+Exports carry personal data (student contacts, fee balances), so they
+are written to settings.EXPORTS_ROOT, outside MEDIA_ROOT, under a
+random directory. Each file gets an Export row with an unguessable
+token, and jobs.views.export_download serves it only to the user it
+was made for.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+from .models import Export
+
+
+export_storage = FileSystemStorage(location=settings.EXPORTS_ROOT)
+
+
+def save_export(user_id, filename, handle):
+    """Store the open file `handle` for `user_id`; returns its Export"""
+    name = export_storage.save(f'{uuid.uuid4().hex}/{filename}', File(handle))
+    return Export.objects.create(user_id=user_id, name=name, filename=filename)
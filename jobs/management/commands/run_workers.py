@@ -0,0 +1,78 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import claim_next, release_stale, run_job, worker_id
+
+
+def work(poll_interval, once, stop):
+    """Worker process loop: claim a due job, run it, repeat"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker = worker_id()
+    while not stop.is_set():
+        job = claim_next(worker)
+        if job is not None:
+            run_job(job)
+            continue
+        if once:
+            break
+        stop.wait(poll_interval)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers against the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.JOB_WORKER_PROCESSES,
+            help='Number of worker processes'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL,
+            help='Seconds to sleep when the queue is empty'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the jobs that are due now, then exit'
+        )
+
+    def handle(self, *args, **options):
+        released = release_stale(settings.JOB_STALE_AFTER)
+        if released:
+            self.stdout.write(self.style.WARNING(f'Requeued {released} stale jobs'))
+
+        processes = max(1, options['processes'])
+        if processes == 1:
+            work(options['poll_interval'], options['once'], multiprocessing.Event())
+            return
+
+        # Forked children inherit the configured Django app registry but
+        # must not share the parent's database connection.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        pool = [
+            context.Process(
+                target=work,
+                args=(options['poll_interval'], options['once'], stop),
+                name=f'job-worker-{n}',
+            )
+            for n in range(processes)
+        ]
+        for process in pool:
+            process.start()
+        self.stdout.write(self.style.SUCCESS(f'Started {processes} job workers'))
+
+        try:
+            while any(process.is_alive() for process in pool):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping workers after their current job...')
+            stop.set()
+        for process in pool:
+            process.join()
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:37
+
+import django.db.models.deletion
+import jobs.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Export',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=jobs.models.export_token, max_length=64, unique=True)),
+                ('name', models.CharField(help_text='Path in the export storage', max_length=300)),
+                ('filename', models.CharField(help_text='File name offered on download', max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Export',
+                'verbose_name_plural': 'Exports',
+                'db_table': 'job_exports',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+import secrets
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
+
+
+class Job(models.Model):
+    """Background Job Queue"""
+    
+    class JobStatus(models.TextChoices):
+        PENDING = 'PENDING', _('Pending')
+        RUNNING = 'RUNNING', _('Running')
+        DONE = 'DONE', _('Done')
+        FAILED = 'FAILED', _('Failed')
+    
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=JobStatus.choices,
+        default=JobStatus.PENDING
+    )
+    dedup_key = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+        help_text="Only one pending/running job may hold the same key"
+    )
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, null=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'jobs'
+        verbose_name = _('Job')
+        verbose_name_plural = _('Jobs')
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=Q(status__in=['PENDING', 'RUNNING']),
+                name='jobs_unique_active_dedup_key',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+
+def export_token():
+    return secrets.token_urlsafe(32)
+
+
+class Export(models.Model):
+    """Generated Export File (private; see jobs/exports.py)"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='exports'
+    )
+    token = models.CharField(max_length=64, unique=True, default=export_token)
+    name = models.CharField(max_length=300, help_text="Path in the export storage")
+    filename = models.CharField(max_length=200, help_text="File name offered on download")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'job_exports'
+        verbose_name = _('Export')
+        verbose_name_plural = _('Exports')
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.user})"
+    
+    def get_absolute_url(self):
+        return reverse('jobs:export_download', args=[self.token])
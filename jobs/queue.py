@@ -0,0 +1,138 @@
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class PermanentFailure(Exception):
+    """Raised by a task when retrying cannot help; the job fails at once"""
+
+
+def task(name):
+    """Register a function as a background task under `name`"""
+    def decorator(func):
+        _registry[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _registry[name]
+
+
+def enqueue(name, payload=None, dedup_key=None, delay=0, max_attempts=None):
+    """
+    Queue `name` to run in a worker with `payload` as keyword arguments.
+
+    When `dedup_key` is given and a pending or running job already holds
+    it, that job is returned instead of creating a duplicate.
+    """
+    if name not in _registry:
+        raise KeyError(f"Unknown task {name!r}")
+    job = Job(
+        task=name,
+        payload=payload or {},
+        dedup_key=dedup_key,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    if not dedup_key:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+        return job
+    except IntegrityError:
+        existing = Job.objects.filter(
+            dedup_key=dedup_key,
+            status__in=[Job.JobStatus.PENDING, Job.JobStatus.RUNNING]
+        ).first()
+        if existing is None:
+            raise
+        return existing
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next(worker):
+    """
+    Take the next due job for `worker`, or return None.
+
+    The claim is a conditional UPDATE on the row's status, so two workers
+    can race for the same job and only one of them wins, on SQLite as well
+    as Postgres and without a broker.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.JobStatus.PENDING,
+        run_after__lte=now
+    ).order_by('run_after', 'id').values_list('id', flat=True)[:10]
+    for job_id in candidates:
+        claimed = Job.objects.filter(pk=job_id, status=Job.JobStatus.PENDING).update(
+            status=Job.JobStatus.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ... capped at an hour"""
+    return min(settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1), 60 * 60)
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome"""
+    job.attempts += 1
+    now = timezone.now()
+    try:
+        if job.task not in _registry:
+            raise PermanentFailure(f"Unknown task {job.task!r}")
+        get_task(job.task)(**job.payload)
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.task)
+        job.last_error = traceback.format_exc()
+        if isinstance(exc, PermanentFailure) or job.attempts >= job.max_attempts:
+            job.status = Job.JobStatus.FAILED
+            job.finished_at = now
+        else:
+            job.status = Job.JobStatus.PENDING
+            job.run_after = now + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        job.status = Job.JobStatus.DONE
+        job.finished_at = now
+        job.last_error = None
+    job.locked_by = None
+    job.locked_at = None
+    job.save(update_fields=[
+        'attempts', 'status', 'run_after', 'last_error',
+        'finished_at', 'locked_by', 'locked_at', 'updated_at'
+    ])
+    return job
+
+
+def release_stale(timeout):
+    """Put jobs whose worker died mid-run back on the queue"""
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return Job.objects.filter(
+        status=Job.JobStatus.RUNNING,
+        locked_at__lt=cutoff
+    ).update(status=Job.JobStatus.PENDING, locked_by=None, locked_at=None)
@@ -0,0 +1,17 @@
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+
+from .exports import export_storage
+from .models import Export
+
+
+@login_required
+def export_download(request, token):
+    """Download a job export; only its owner (or a superuser) may"""
+    export = get_object_or_404(Export, token=token)
+    if export.user_id != request.user.pk and not request.user.is_superuser:
+        raise Http404
+    if not export_storage.exists(export.name):
+        raise Http404
+    return FileResponse(export_storage.open(export.name, 'rb'), as_attachment=True, filename=export.filename)
@@ -1,4 +1,5 @@
 from django import forms
+from accounts.models import AcademicYear
 from academics.models import Class, Section
 
 class StudentReportFilterForm(forms.Form):
@@ -30,3 +31,45 @@ class StudentReportFilterForm(forms.Form):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Optional: Dynamic filtering of sections if class is selected (requires JS mainly, but initial filtering possible)
+
+
+class DefaulterFilterForm(forms.Form):
+    SORT_CHOICES = [
+        ('-balance', 'Highest balance first'),
+        ('balance', 'Lowest balance first'),
+        ('student__admission_number', 'Admission number'),
+        ('-invoice_count', 'Most invoices'),
+    ]
+    
+    academic_year = forms.ModelChoiceField(
+        queryset=AcademicYear.objects.all().order_by('-start_date'),
+        required=False,
+        empty_label="Current Year",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    class_group = forms.ModelChoiceField(
+        queryset=Class.objects.all().order_by('numeric_value'),
+        required=False,
+        label='Class',
+        empty_label="All Classes",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    section = forms.ModelChoiceField(
+        queryset=Section.objects.all(),
+        required=False,
+        label='Section',
+        empty_label="All Sections",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    min_balance = forms.DecimalField(
+        required=False,
+        min_value=0,
+        decimal_places=2,
+        label='Minimum Balance',
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Minimum balance'})
+    )
+    sort = forms.ChoiceField(
+        choices=SORT_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
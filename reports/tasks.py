@@ -0,0 +1,26 @@
+import tempfile
+from datetime import datetime
+
+from communication.models import Notification
+from jobs.exports import save_export
+from jobs.queue import task
+from .views import filter_students, student_export
+
+
+@task('reports.export_students')
+def export_students(user_id, params, fmt='csv'):
+    """Write the filtered student report to private export storage and notify the user"""
+    _form, students = filter_students(params)
+    export = student_export(students)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    with tempfile.TemporaryFile() as handle:
+        export.write_to(handle, fmt)
+        handle.seek(0)
+        saved = save_export(user_id, f'student_report_{timestamp}.{fmt}', handle)
+    Notification.objects.create(
+        user_id=user_id,
+        title='Student report ready',
+        message='Your student report export has finished.',
+        notification_type=Notification.NotificationType.SUCCESS,
+        link=saved.get_absolute_url(),
+    )
@@ -6,4 +6,5 @@ app_name = 'reports'
 urlpatterns = [
     path('', views.index, name='index'),
     path('students/', views.student_report, name='student_report'),
+    path('fee-defaulters/', views.fee_defaulters, name='fee_defaulters'),
 ]
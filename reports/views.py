@@ -1,20 +1,25 @@
-import csv
-from datetime import datetime
-from django.http import HttpResponse
-from django.shortcuts import render
+from decimal import Decimal
+from urllib.parse import urlencode
+from django.contrib import messages
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Sum
+from accounts.models import AcademicYear
+from finance.ledger import defaulters
+from jobs.queue import enqueue
 from students.models import Student
-from .forms import StudentReportFilterForm
+from utils.pagination import CountedPaginator
+from .export import FORMATS as EXPORT_FORMATS, Column, Export
+from .forms import DefaulterFilterForm, StudentReportFilterForm
 
 @login_required
 def index(request):
     """Reports Dashboard"""
     return render(request, 'reports/index.html')
 
-@login_required
-def student_report(request):
-    """Student detailed report with filtering and export"""
-    form = StudentReportFilterForm(request.GET)
+def filter_students(params):
+    """Student report queryset for the given filter parameters"""
+    form = StudentReportFilterForm(params)
     students = Student.objects.select_related('user', 'current_class', 'section', 'campus').all().order_by('current_class__numeric_value', 'user__first_name')
     
     if form.is_valid():
@@ -26,10 +31,22 @@ def student_report(request):
             students = students.filter(user__gender=form.cleaned_data['gender'])
         if form.cleaned_data['status']:
             students = students.filter(status=form.cleaned_data['status'])
+    return form, students
+
+@login_required
+def student_report(request):
+    """Student detailed report with filtering and export"""
+    form, students = filter_students(request.GET)
             
     # Check for export
-    if request.GET.get('export') == 'csv':
-        return export_student_csv(students)
+    export_format = request.GET.get('export')
+    if export_format in EXPORT_FORMATS:
+        if request.GET.get('background'):
+            params = {key: value for key, value in request.GET.items() if key not in ('export', 'background')}
+            enqueue('reports.export_students', {'user_id': request.user.pk, 'params': params, 'fmt': export_format})
+            messages.success(request, 'Your export is being prepared. You will be notified when it is ready.')
+            return redirect(f"{request.path}?{urlencode(params)}")
+        return student_export(students).response(export_format)
         
     context = {
         'form': form,
@@ -37,36 +54,76 @@ def student_report(request):
     }
     return render(request, 'reports/student_report.html', context)
 
-def export_student_csv(queryset):
-    """Helper to export student queryset to CSV"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="student_report_{timestamp}.csv"'
+STUDENT_EXPORT_COLUMNS = [
+    Column('Admission No', 'admission_number'),
+    Column('First Name', 'user__first_name'),
+    Column('Last Name', 'user__last_name'),
+    Column('Gender', 'user__gender', display=True),
+    Column('Date of Birth', 'user__date_of_birth'),
+    Column('Class', 'current_class__name', default='-'),
+    Column('Section', 'section__name', default='-'),
+    Column('Roll No', 'roll_number'),
+    Column('Father Name', 'father_name'),
+    Column('Father Phone', 'father_phone'),
+    Column('Mother Name', 'mother_name'),
+    Column('Address', 'user__address'),
+    Column('Status', 'status', display=True),
+    Column('Admission Date', 'admission_date'),
+]
+
+def student_export(queryset):
+    """Streaming CSV/XLSX export of a student queryset"""
+    return Export(queryset, STUDENT_EXPORT_COLUMNS, filename='student_report', sheet_name='Students')
+
+DEFAULTER_EXPORT_COLUMNS = [
+    Column('Admission No', 'student__admission_number'),
+    Column('First Name', 'student__user__first_name'),
+    Column('Last Name', 'student__user__last_name'),
+    Column('Class', 'student__current_class__name', default='-'),
+    Column('Section', 'student__section__name', default='-'),
+    Column('Father Phone', 'student__father_phone'),
+    Column('Invoices', 'invoice_count'),
+    Column('Billed', 'total_amount'),
+    Column('Late Fee', 'late_fee'),
+    Column('Discount', 'discount_amount'),
+    Column('Paid', 'paid_amount'),
+    Column('Balance', 'balance'),
+]
+
+@login_required
+def fee_defaulters(request):
+    """Students with an outstanding fee balance, from the fee ledger"""
+    form = DefaulterFilterForm(request.GET)
+    filters = form.cleaned_data if form.is_valid() else {}
+    academic_year = filters.get('academic_year') or AcademicYear.objects.filter(is_current=True).first()
     
-    writer = csv.writer(response)
-    writer.writerow([
-        'Admission No', 'First Name', 'Last Name', 'Gender', 
-        'Date of Birth', 'Class', 'Section', 'Roll No',
-        'Father Name', 'Father Phone', 'Mother Name', 
-        'Address', 'Status', 'Admission Date'
-    ])
+    ledgers = defaulters(
+        academic_year,
+        min_balance=filters.get('min_balance') or Decimal('0.01'),
+        order=filters.get('sort') or '-balance',
+    )
+    if filters.get('class_group'):
+        ledgers = ledgers.filter(student__current_class=filters['class_group'])
+    if filters.get('section'):
+        ledgers = ledgers.filter(student__section=filters['section'])
     
-    for student in queryset:
-        writer.writerow([
-            student.admission_number,
-            student.user.first_name,
-            student.user.last_name,
-            student.user.get_gender_display(),
-            student.user.date_of_birth,
-            student.current_class.name if student.current_class else '-',
-            student.section.name if student.section else '-',
-            student.roll_number,
-            student.father_name,
-            student.father_phone,
-            student.mother_name,
-            student.user.address,
-            student.get_status_display(),
-            student.admission_date
-        ])
-        
-    return response
+    export_format = request.GET.get('export')
+    if export_format in EXPORT_FORMATS:
+        export = Export(ledgers, DEFAULTER_EXPORT_COLUMNS, filename='fee_defaulters', sheet_name='Defaulters')
+        return export.response(export_format)
+    
+    totals = ledgers.order_by().aggregate(count=Count('id'), outstanding=Sum('balance'))
+    paginator = CountedPaginator(ledgers, 25, count=totals['count'])
+    page_obj = paginator.get_page(request.GET.get('page'))
+    query = request.GET.copy()
+    query.pop('page', None)
+    
+    context = {
+        'form': form,
+        'academic_year': academic_year,
+        'ledgers': page_obj,
+        'defaulter_count': totals['count'],
+        'outstanding': totals['outstanding'] or Decimal('0.00'),
+        'query': query.urlencode(),
+    }
+    return render(request, 'school/reports/fee_defaulters.html', context)
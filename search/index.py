@@ -0,0 +1,218 @@
+"""
+Full-text search over students and staff.
+
+Each Student/Staff row has a SearchDocument holding its searchable text.
+The documents table is mirrored into a full-text index by the database
+itself (see migrations/0002_fulltext_index.py):
+
+* SQLite - an external-content FTS5 table, search_documents_fts, kept in
+  step with search_documents by triggers and ranked with bm25();
+* PostgreSQL - a generated tsvector column with a GIN index, ranked with
+  ts_rank().
+
+Other backends, or SQLite builds without FTS5, fall back to LIKE matching
+on the documents table so search keeps working, just without ranking.
+
+The index matches words by prefix, so identifiers (admission, roll and
+employee numbers) are also matched as substrings: "0001" still finds
+admission number A0001, as the old icontains filter did.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Q, When
+
+from staff.models import Staff
+from students.models import Student
+from .models import SearchDocument
+
+Kind = SearchDocument.DocumentKind
+FTS_TABLE = 'search_documents_fts'
+TOKEN_RE = re.compile(r'\w+')
+
+
+def _text(*values):
+    return ' '.join(str(value) for value in values if value)
+
+
+def _phones(*numbers):
+    # "0300-1234567" is stored as typed and as digits only, so both
+    # forms of the number find the record.
+    numbers = [number for number in numbers if number]
+    return _text(*numbers, *(re.sub(r'\D', '', number) for number in numbers))
+
+
+def student_document(student):
+    user = student.user
+    return SearchDocument(
+        kind=Kind.STUDENT,
+        object_id=student.pk,
+        campus_id=student.campus_id,
+        title=user.get_full_name() or user.username,
+        identifier=_text(student.admission_number, student.roll_number),
+        body=_text(
+            student.father_name, student.mother_name, student.guardian_name,
+            _phones(student.father_phone, student.mother_phone, student.guardian_phone,
+                    student.emergency_contact_phone, user.phone_number),
+            user.email, student.father_email, student.mother_email,
+        ),
+    )
+
+
+def staff_document(staff):
+    user = staff.user
+    return SearchDocument(
+        kind=Kind.STAFF,
+        object_id=staff.pk,
+        campus_id=staff.campus_id,
+        title=user.get_full_name() or user.username,
+        identifier=staff.employee_id,
+        body=_text(
+            staff.designation.name if staff.designation else None,
+            staff.department.name if staff.department else None,
+            staff.emergency_contact_name,
+            _phones(user.phone_number, staff.emergency_contact_phone),
+            user.email,
+        ),
+    )
+
+
+SOURCES = {
+    Kind.STUDENT: (Student.objects.select_related('user'), student_document),
+    Kind.STAFF: (Staff.objects.select_related('user', 'designation', 'department'), staff_document),
+}
+
+
+def index_objects(kind, ids, batch_size=500):
+    """(Re)build the documents for the given Student/Staff ids"""
+    queryset, build = SOURCES[kind]
+    ids = set(ids)
+    documents = [build(obj) for obj in queryset.filter(pk__in=ids)]
+    SearchDocument.objects.bulk_create(
+        documents,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['campus', 'title', 'identifier', 'body', 'updated_at'],
+    )
+    missing = ids - {document.object_id for document in documents}
+    if missing:
+        remove_objects(kind, missing)
+
+
+def remove_objects(kind, ids):
+    SearchDocument.objects.filter(kind=kind, object_id__in=ids).delete()
+
+
+def rebuild_index(batch_size=500):
+    """Recreate every document from scratch; returns the number indexed"""
+    SearchDocument.objects.all().delete()
+    total = 0
+    for kind, (queryset, build) in SOURCES.items():
+        batch = []
+        for obj in queryset.order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(build(obj))
+            if len(batch) >= batch_size:
+                total += len(SearchDocument.objects.bulk_create(batch))
+                batch = []
+        total += len(SearchDocument.objects.bulk_create(batch))
+    if _backend() == 'fts5':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+@lru_cache(maxsize=None)
+def _backend():
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        return 'fts5'
+    return 'like'
+
+
+def _tokens(query):
+    return TOKEN_RE.findall(query.lower())[:8]
+
+
+def _documents(kind, campus_id=None):
+    documents = SearchDocument.objects.filter(kind=kind)
+    if campus_id is not None:
+        documents = documents.filter(campus_id=campus_id)
+    return documents
+
+
+def search_ids(query, kind, campus_id=None, limit=None):
+    """
+    Ids of `kind` objects matching `query`, best match first: every word
+    as a prefix of the indexed text ("ali 0300" finds Ali Khan whose
+    father's phone is 0300-1234567), then every word anywhere in the
+    identifier. All hits unless `limit` is given.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+    backend = _backend()
+
+    if backend == 'like':
+        documents = _documents(kind, campus_id)
+        for token in tokens:
+            documents = documents.filter(
+                Q(title__icontains=token) | Q(identifier__icontains=token) | Q(body__icontains=token)
+            )
+        return list(documents.order_by('title').values_list('object_id', flat=True)[:limit])
+
+    params = []
+    if backend == 'fts5':
+        # Each token quoted (so FTS syntax in user input is inert) and
+        # prefix-matched; names and IDs weigh more than the body.
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        sql = (
+            f"SELECT d.object_id FROM {FTS_TABLE} f JOIN search_documents d ON d.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND d.kind = %s"
+        )
+        params += [match, kind]
+        order = f"bm25({FTS_TABLE}, 10.0, 5.0, 1.0)"
+    else:
+        match = ' & '.join(f'{token}:*' for token in tokens)
+        sql = (
+            "SELECT d.object_id FROM search_documents d "
+            "WHERE d.search_vector @@ to_tsquery('simple', %s) AND d.kind = %s"
+        )
+        params += [match, kind]
+        order = "ts_rank(d.search_vector, to_tsquery('simple', %s)) DESC"
+    if campus_id is not None:
+        sql += " AND d.campus_id = %s"
+        params.append(campus_id)
+    sql += f" ORDER BY {order}"
+    if backend == 'postgres':
+        params.append(match)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        ids = [row[0] for row in cursor.fetchall()]
+
+    # The index only matches prefixes; identifiers keep substring matching.
+    identifiers = _documents(kind, campus_id).filter(
+        *(Q(identifier__icontains=token) for token in tokens)
+    ).order_by('identifier').values_list('object_id', flat=True)
+    found = set(ids)
+    ids += [pk for pk in identifiers if pk not in found]
+    return ids[:limit] if limit else ids
+
+
+def search_queryset(queryset, query, kind, campus_id=None):
+    """
+    Narrow a Student/Staff queryset to every search hit. The best
+    settings.SEARCH_RANKED_RESULTS hits come first in rank order, the
+    rest follow in the queryset's own order, so long result lists are
+    paged rather than cut off.
+    """
+    ids = search_ids(query, kind, campus_id=campus_id)
+    if not ids:
+        return queryset.none()
+    ranked = ids[:settings.SEARCH_RANKED_RESULTS]
+    rank = Case(*(When(pk=pk, then=position) for position, pk in enumerate(ranked)), default=len(ranked))
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    return queryset.filter(pk__in=ids).order_by(rank, *ordering, 'pk')
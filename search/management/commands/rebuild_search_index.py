@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from search.index import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the student/staff full-text search documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} search documents'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('STUDENT', 'Student'), ('STAFF', 'Staff')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(help_text='Full name', max_length=300)),
+                ('identifier', models.CharField(help_text='Admission number / employee ID', max_length=200)),
+                ('body', models.TextField(help_text='Parent names, phone numbers, emails')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('campus', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='accounts.campus')),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'db_table': 'search_documents',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_documents_fts USING fts5(
+        title, identifier, body,
+        content='search_documents', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_documents_fts(rowid, title, identifier, body)
+        VALUES (new.id, new.title, new.identifier, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, title, identifier, body)
+        VALUES ('delete', old.id, old.title, old.identifier, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, title, identifier, body)
+        VALUES ('delete', old.id, old.title, old.identifier, old.body);
+        INSERT INTO search_documents_fts(rowid, title, identifier, body)
+        VALUES (new.id, new.title, new.identifier, new.body);
+    END
+    """,
+    "INSERT INTO search_documents_fts(search_documents_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS search_documents_au",
+    "DROP TRIGGER IF EXISTS search_documents_ad",
+    "DROP TRIGGER IF EXISTS search_documents_ai",
+    "DROP TABLE IF EXISTS search_documents_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE search_documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(identifier, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX search_documents_vector_idx ON search_documents USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS search_documents_vector_idx",
+    "ALTER TABLE search_documents DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor not in statements:
+            return
+        with schema_editor.connection.cursor() as cursor:
+            if vendor == 'sqlite':
+                # Some SQLite builds ship without FTS5; search then falls
+                # back to LIKE matching (see search/index.py).
+                try:
+                    cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+                    cursor.execute("DROP TABLE temp.fts5_probe")
+                except Exception:
+                    return
+            for statement in statements[vendor]:
+                cursor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,72 @@
+import re
+
+from django.db import migrations
+
+
+def _text(*values):
+    return ' '.join(str(value) for value in values if value)
+
+
+def _phones(*numbers):
+    numbers = [number for number in numbers if number]
+    return _text(*numbers, *(re.sub(r'\D', '', number) for number in numbers))
+
+
+def _name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+def build_documents(apps, schema_editor):
+    # Mirrors search/index.py student_document() / staff_document() so
+    # existing students and staff are searchable straight after deploy.
+    Student = apps.get_model('students', 'Student')
+    Staff = apps.get_model('staff', 'Staff')
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+
+    documents = []
+    for student in Student.objects.select_related('user').order_by('pk').iterator(chunk_size=2000):
+        user = student.user
+        documents.append(SearchDocument(
+            kind='STUDENT',
+            object_id=student.pk,
+            campus_id=student.campus_id,
+            title=_name(user),
+            identifier=_text(student.admission_number, student.roll_number),
+            body=_text(
+                student.father_name, student.mother_name, student.guardian_name,
+                _phones(student.father_phone, student.mother_phone, student.guardian_phone,
+                        student.emergency_contact_phone, user.phone_number),
+                user.email, student.father_email, student.mother_email,
+            ),
+        ))
+    staff_members = Staff.objects.select_related('user', 'designation', 'department').order_by('pk')
+    for staff in staff_members.iterator(chunk_size=2000):
+        user = staff.user
+        documents.append(SearchDocument(
+            kind='STAFF',
+            object_id=staff.pk,
+            campus_id=staff.campus_id,
+            title=_name(user),
+            identifier=staff.employee_id,
+            body=_text(
+                staff.designation.name if staff.designation else None,
+                staff.department.name if staff.department else None,
+                staff.emergency_contact_name,
+                _phones(user.phone_number, staff.emergency_contact_phone),
+                user.email,
+            ),
+        ))
+    SearchDocument.objects.bulk_create(documents, batch_size=2000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_fulltext_index'),
+        ('staff', '0001_initial'),
+        ('students', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
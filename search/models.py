@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from accounts.models import Campus
+
+
+class SearchDocument(models.Model):
+    """Denormalized Search Document (indexed by search_documents_fts / search_vector)"""
+    
+    class DocumentKind(models.TextChoices):
+        STUDENT = 'STUDENT', _('Student')
+        STAFF = 'STAFF', _('Staff')
+    
+    kind = models.CharField(max_length=20, choices=DocumentKind.choices)
+    object_id = models.PositiveBigIntegerField()
+    campus = models.ForeignKey(
+        Campus,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='search_documents'
+    )
+    title = models.CharField(max_length=300, help_text="Full name")
+    identifier = models.CharField(max_length=200, help_text="Admission number / employee ID")
+    body = models.TextField(help_text="Parent names, phone numbers, emails")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'search_documents'
+        verbose_name = _('Search Document')
+        verbose_name_plural = _('Search Documents')
+        unique_together = ['kind', 'object_id']
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
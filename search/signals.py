@@ -0,0 +1,50 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from staff.models import Staff
+from students.models import Student
+from .index import Kind, index_objects, remove_objects
+
+
+@receiver(post_save, sender=Student)
+def index_student(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(partial(index_objects, Kind.STUDENT, [instance.pk]))
+
+
+@receiver(post_save, sender=Staff)
+def index_staff(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(partial(index_objects, Kind.STAFF, [instance.pk]))
+
+
+@receiver(post_save, sender=User)
+def index_user_profiles(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Names, phone and email live on the user, so a profile's document
+    # goes stale when only the user row changes. Logins only touch
+    # last_login and are skipped.
+    if raw or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+
+    def reindex():
+        student_ids = list(Student.objects.filter(user=instance).values_list('pk', flat=True))
+        staff_ids = list(Staff.objects.filter(user=instance).values_list('pk', flat=True))
+        if student_ids:
+            index_objects(Kind.STUDENT, student_ids)
+        if staff_ids:
+            index_objects(Kind.STAFF, staff_ids)
+    transaction.on_commit(reindex)
+
+
+@receiver(post_delete, sender=Student)
+def unindex_student(sender, instance, **kwargs):
+    transaction.on_commit(partial(remove_objects, Kind.STUDENT, [instance.pk]))
+
+
+@receiver(post_delete, sender=Staff)
+def unindex_staff(sender, instance, **kwargs):
+    transaction.on_commit(partial(remove_objects, Kind.STAFF, [instance.pk]))
@@ -44,8 +44,8 @@ class StaffAttendanceAdmin(admin.ModelAdmin):
 
 @admin.register(LeaveType)
 class LeaveTypeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'code', 'days_allowed', 'is_active')
-    list_filter = ('is_active',)
+    list_display = ('name', 'code', 'days_allowed', 'is_paid', 'is_active')
+    list_filter = ('is_paid', 'is_active')
     search_fields = ('name', 'code')
 
 
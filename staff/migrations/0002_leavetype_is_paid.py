@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leavetype',
+            name='is_paid',
+            field=models.BooleanField(default=True, help_text='Unpaid leave days are deducted in payroll'),
+        ),
+    ]
@@ -188,6 +188,7 @@ class LeaveType(models.Model):
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=20, unique=True)
     days_allowed = models.IntegerField(default=0)
+    is_paid = models.BooleanField(default=True, help_text="Unpaid leave days are deducted in payroll")
     description = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
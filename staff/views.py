@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from search.index import Kind, search_queryset
 from .models import Staff, Leave
 from .forms import StaffForm, LeaveForm
 
@@ -16,13 +17,7 @@ def staff_list(request):
     # Search functionality
     search_query = request.GET.get('search', '')
     if search_query:
-        staff = staff.filter(
-            user__first_name__icontains=search_query
-        ) | staff.filter(
-            user__last_name__icontains=search_query
-        ) | staff.filter(
-            employee_id__icontains=search_query
-        )
+        staff = search_queryset(staff, search_query, Kind.STAFF)
     
     paginator = Paginator(staff, 10)
     page_number = request.GET.get('page')
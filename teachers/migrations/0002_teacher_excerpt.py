@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+from utils.utils import plain_text_excerpt
+
+
+def fill_excerpts(apps, schema_editor):
+    Teacher = apps.get_model('teachers', 'Teacher')
+    rows = list(Teacher.objects.only('id', 'description'))
+    for row in rows:
+        row.excerpt = plain_text_excerpt(row.description)
+    Teacher.objects.bulk_update(rows, ['excerpt'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacher',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
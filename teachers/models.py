@@ -1,5 +1,6 @@
 from django.db import models
 from ckeditor_uploader.fields import RichTextUploadingField
+from utils.utils import EXCERPT_LENGTH, plain_text_excerpt
 
 class Teacher(models.Model):
     image = models.ImageField(upload_to="teachers/")
@@ -7,4 +8,9 @@ class Teacher(models.Model):
     designation = models.CharField(max_length=255, null=True, blank=True)
     qualification = models.CharField(max_length=255, null=True, blank=True)
     description = RichTextUploadingField()
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        self.excerpt = plain_text_excerpt(self.description)
+        super().save(*args, **kwargs)
 
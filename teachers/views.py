@@ -1,20 +1,24 @@
 from django.shortcuts import render
 from django.views.generic import ListView, DetailView
 from teachers.models import Teacher
-from utils import utils
+from utils.pagination import KeysetPaginator
 
 
 class TeacherListView(ListView):
     model = Teacher
     template_name = 'teachers.html'
     context_object_name = 'teachers'
+    per_page = 12
+
+    def get_queryset(self):
+        # The list only shows the excerpt, so leave the rich-text body in the database
+        return Teacher.objects.defer('description')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context={
-            'teachers': self.get_queryset(),
-            **utils.get_context()
-        }
+        context['teachers'] = KeysetPaginator(self.object_list, ('id',), self.per_page).get_page(
+            after=self.request.GET.get('after'), before=self.request.GET.get('before')
+        )
         return context
 
 
@@ -22,8 +26,3 @@ class TecaherDetailsView(DetailView):
     model = Teacher
     template_name = 'teacher_details.html'
     context_object_name = 'teacher'
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context.update(utils.get_context())
-        return context
\ No newline at end of file
@@ -0,0 +1,124 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator, iterable like a Paginator page"""
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a fixed ordering, e.g. ('-date', '-id').
+
+    Each page is a single indexed range query seeking past the cursor, so
+    page cost does not grow with the size of the table the way OFFSET and
+    the COUNT(*) of django's Paginator do. The last ordering field must be
+    unique (normally the primary key) so every row has a distinct cursor.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, field) for field in self.fields]
+        raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Return the ordering values held in cursor, or None when it is not valid"""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.fields):
+                return None
+            opts = self.queryset.model._meta
+            return [
+                (opts.pk if field == 'pk' else opts.get_field(field)).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (ValueError, TypeError, ValidationError, FieldDoesNotExist):
+            return None
+
+    def _seek(self, values, forward):
+        # Row-value comparison (f1, f2, ...) > (v1, v2, ...) spelled out as
+        # f1 > v1 OR (f1 = v1 AND f2 > v2) OR ... with per-field direction.
+        condition = Q()
+        equal = {}
+        for field, descending, value in zip(self.fields, self.descending, values):
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def get_page(self, after=None, before=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        values = None
+        forward = True
+        if after:
+            values = self.decode_cursor(after)
+        elif before:
+            values = self.decode_cursor(before)
+            forward = values is None
+
+        if not forward:
+            reverse = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+            queryset = queryset.order_by(*reverse)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+
+        return KeysetPage(
+            rows,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=self.encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0]) if rows and has_previous else None,
+        )
+
+
+class CountedPaginator(Paginator):
+    """
+    A django Paginator that is told its row count instead of running
+    COUNT(*) itself, for pages that already computed the total (e.g. in a
+    statistics query over the same queryset).
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        return self._known_count
@@ -0,0 +1,77 @@
+"""
+Shared ReportLab helpers for the printed documents (fee challans,
+receipts, report cards). Campus logos and the optional CHALLAN_FONT are
+loaded once per process and reused for every page.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+
+@lru_cache(maxsize=None)
+def fonts():
+    """(regular, bold) font names; CHALLAN_FONT is a TTF path or None"""
+    path = getattr(settings, 'CHALLAN_FONT', None)
+    if not path:
+        return 'Helvetica', 'Helvetica-Bold'
+    pdfmetrics.registerFont(TTFont('ChallanFont', path))
+    return 'ChallanFont', 'ChallanFont'
+
+
+@lru_cache(maxsize=32)
+def logo(path):
+    if not path:
+        return None
+    try:
+        return ImageReader(path)
+    except OSError:
+        return None
+
+
+def logo_path(campus):
+    if not campus.logo:
+        return None
+    try:
+        return campus.logo.path
+    except NotImplementedError:
+        # Remote storage: no local file for ReportLab to read.
+        return None
+
+
+def campus_details(campus, cache):
+    """Picklable header details of `campus`, memoized in `cache`"""
+    if campus.pk not in cache:
+        cache[campus.pk] = {
+            'name': campus.name,
+            'address': f"{campus.address}, {campus.city}",
+            'phone': campus.phone,
+            'logo': logo_path(campus),
+        }
+    return cache[campus.pk]
+
+
+def fit(text, font, size, width):
+    """`text` shortened with an ellipsis to at most `width` points"""
+    text = str(text or '')
+    while text and pdfmetrics.stringWidth(text, font, size) > width:
+        text = text[:-2] + '…' if len(text) > 2 else ''
+    return text
+
+
+def draw_header(pdf, campus, x, top, width):
+    """Logo, name, address and phone of `campus`; returns the y below it"""
+    regular, bold = fonts()
+    image = logo(campus['logo'])
+    text_x = x
+    if image is not None:
+        pdf.drawImage(image, x, top - 34, width=34, height=34, preserveAspectRatio=True, mask='auto')
+        text_x = x + 40
+    pdf.setFont(bold, 10)
+    pdf.drawString(text_x, top - 12, fit(campus['name'], bold, 10, x + width - text_x))
+    pdf.setFont(regular, 6.5)
+    pdf.drawString(text_x, top - 22, fit(campus['address'], regular, 6.5, x + width - text_x))
+    pdf.drawString(text_x, top - 30, fit(f"Phone: {campus['phone']}", regular, 6.5, x + width - text_x))
+    return top - 44
@@ -1,5 +1,8 @@
+from html import unescape
+
 from django import forms
-from headers.models import SocialLink, MobileNumber, Phonenumber, SchoolTiming, LogoImage, WeeklyschoolTiming
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 
 
 def allowed_one(model, instance,cleaned_data,  massage=None):
@@ -9,18 +12,9 @@ def allowed_one(model, instance,cleaned_data,  massage=None):
         raise forms.ValidationError("Not allowed")
     return cleaned_data
 
-def get_context():
-    social_links = SocialLink.objects.all()
-    mobile_numbers = MobileNumber.objects.get(id=1) if MobileNumber.objects.all().exists() else None
-    phone_numbers = Phonenumber.objects.get(id=1) if Phonenumber.objects.all().exists() else None
-    school_timings = SchoolTiming.objects.get(id=1) if  SchoolTiming.objects.all().exists() else None
-    logo_image = LogoImage.objects.get(id=1) if LogoImage.objects.all() else None
-    weekly_school_timings = WeeklyschoolTiming.objects.all()
-    return {
-        "social_links": social_links,
-        "mobile_numbers": mobile_numbers,
-        "phone_number": phone_numbers,
-        "school_timing": school_timings,
-        "logo_image": logo_image,
-        "weekly_school_timings": weekly_school_timings,
-        }
\ No newline at end of file
+EXCERPT_LENGTH = 300
+
+def plain_text_excerpt(html, length=EXCERPT_LENGTH):
+    """Plain-text summary of rich-text (CKEditor) content for list pages"""
+    text = " ".join(unescape(strip_tags(html or "")).split())
+    return Truncator(text).chars(length)